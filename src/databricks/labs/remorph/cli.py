@@ -1,5 +1,6 @@
 import json
 import os
+import sys
 from pathlib import Path
 
 from databricks.labs.blueprint.cli import App
@@ -7,16 +8,18 @@ from databricks.labs.blueprint.entrypoint import get_logger
 from databricks.labs.remorph.config import TranspileConfig
 from databricks.labs.remorph.contexts.application import ApplicationContext
 from databricks.labs.remorph.helpers.recon_config_utils import ReconConfigPrompts
-from databricks.labs.remorph.reconcile.runner import ReconcileRunner
-from databricks.labs.remorph.lineage import lineage_generator
-from databricks.labs.remorph.transpiler.execute import transpile as do_transpile
-from databricks.labs.remorph.reconcile.execute import RECONCILE_OPERATION_NAME, AGG_RECONCILE_OPERATION_NAME
+from databricks.labs.remorph.helpers.watchdog import Budget
+from databricks.labs.remorph.transpiler import daemon_client
 from databricks.labs.remorph.jvmproxy import proxy_command
 
 from databricks.sdk import WorkspaceClient
 
 from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
 
+# The modules loading the transpiler, the dialects or Spark are imported by the commands needing them, so that
+# every command does not pay for all of them on startup, see tests/unit/test_cli_import_time.py.
+# pylint: disable=import-outside-toplevel
+
 remorph = App(__file__)
 logger = get_logger(__file__)
 
@@ -33,7 +36,7 @@ proxy_command(remorph, "debug-bundle")
 
 
 @remorph.command
-def transpile(
+def transpile(  # pylint: disable=too-many-arguments,too-many-locals
     w: WorkspaceClient,
     transpiler_config_path: str,
     source_dialect: str,
@@ -43,8 +46,19 @@ def transpile(
     catalog_name: str,
     schema_name: str,
     mode: str,
+    workers: str | None = None,
+    cache_folder: str | None = None,
+    validation_concurrency: str | None = None,
+    streaming_threshold_mb: str | None = None,
+    trace_file: str | None = None,
+    statement_timeout_seconds: str | None = None,
+    statement_memory_mb: str | None = None,
+    file_timeout_seconds: str | None = None,
+    statement_templates: str | None = None,
 ):
     """Transpiles source dialect to databricks dialect"""
+    from databricks.labs.remorph.transpiler.execute import transpile as do_transpile
+
     ctx = ApplicationContext(w)
     logger.debug(f"User: {ctx.current_user}")
     default_config = ctx.transpile_config
@@ -64,6 +78,18 @@ def transpile(
         )
     if mode.lower() not in {"current", "experimental"}:
         raise_validation_exception(f"Invalid value for '--mode': '{mode}' " f"is not one of 'current', 'experimental'.")
+    workers = workers if workers else "1"
+    if not workers.isdigit() or int(workers) < 1:
+        raise_validation_exception(f"Invalid value for '--workers': '{workers}' is not a positive integer.")
+    validation_concurrency = validation_concurrency if validation_concurrency else "1"
+    if not validation_concurrency.isdigit() or int(validation_concurrency) < 1:
+        raise_validation_exception(
+            f"Invalid value for '--validation-concurrency': '{validation_concurrency}' is not a positive integer."
+        )
+    if streaming_threshold_mb and not streaming_threshold_mb.isdigit():
+        raise_validation_exception(
+            f"Invalid value for '--streaming-threshold-mb': '{streaming_threshold_mb}' is not a non-negative integer."
+        )
 
     sdk_config = default_config.sdk_config if default_config.sdk_config else None
     catalog_name = catalog_name if catalog_name else default_config.catalog_name
@@ -79,6 +105,13 @@ def transpile(
         schema_name=schema_name,
         mode=mode,
         sdk_config=sdk_config,
+        workers=int(workers),
+        cache_folder=cache_folder if cache_folder else None,
+        validation_concurrency=int(validation_concurrency),
+        streaming_threshold_mb=int(streaming_threshold_mb) if streaming_threshold_mb else None,
+        trace_file=trace_file if trace_file else None,
+        budget=_budget(statement_timeout_seconds, statement_memory_mb, file_timeout_seconds),
+        statement_templates=_statement_templates(statement_templates),
     )
 
     status = do_transpile(ctx.workspace_client, engine, config)
@@ -86,6 +119,141 @@ def transpile(
     print(json.dumps(status))
 
 
+def _budget(
+    statement_timeout_seconds: str | None, statement_memory_mb: str | None, file_timeout_seconds: str | None
+) -> Budget | None:
+    """Parses the budget flags, None when none is set: budgets only apply when asked for"""
+    budget = Budget(
+        _limit("statement-timeout-seconds", statement_timeout_seconds),
+        _limit("statement-memory-mb", statement_memory_mb),
+        _limit("file-timeout-seconds", file_timeout_seconds),
+    )
+    return None if budget.unlimited else budget
+
+
+def _limit(flag: str, value: str | None) -> int | None:
+    """Parses the value of a budget flag, None when it is not set or zero, for no limit"""
+    if not value:
+        return None
+    if not value.isdigit():
+        raise_validation_exception(f"Invalid value for '--{flag}': '{value}' is not a non-negative integer.")
+    return int(value) or None
+
+
+def _statement_templates(value: str | None) -> int:
+    """Parses the value of the statement-templates flag, 0 when it is not set, for no templates"""
+    if not value:
+        return 0
+    if not value.isdigit():
+        raise_validation_exception(
+            f"Invalid value for '--statement-templates': '{value}' is not a non-negative integer."
+        )
+    return int(value)
+
+
+@remorph.command(is_unauthenticated=True)
+def transpile_daemon(transpiler_config_path: str = "sqlglot", socket_path: str | None = None):
+    """Serves transpile and lineage requests from a warm process, over a Unix socket or stdin/stdout"""
+    from databricks.labs.remorph.transpiler.daemon import TranspileDaemon, serve_socket, serve_stream
+
+    daemon = TranspileDaemon((transpiler_config_path,))
+    daemon.warm_up()
+    if socket_path:
+        serve_socket(daemon, Path(socket_path))
+    else:
+        serve_stream(daemon, sys.stdin, sys.stdout)
+
+
+@remorph.command(is_unauthenticated=True)
+def transpile_file(
+    source_dialect: str,
+    input_source: str,
+    transpiler_config_path: str = "sqlglot",
+    socket_path: str | None = None,
+    output_file: str | None = None,
+):
+    """Transpiles a single SQL file through the transpile daemon, or in-process when no daemon answers"""
+    argv = ["transpile", input_source, "--source-dialect", source_dialect]
+    argv += ["--transpiler-config-path", transpiler_config_path]
+    if socket_path:
+        argv += ["--socket-path", socket_path]
+    if output_file:
+        argv += ["--output-file", output_file]
+    exit_code = daemon_client.main(argv)
+    if exit_code:
+        raise SystemExit(exit_code)
+
+
+@remorph.command(is_unauthenticated=True)
+def triage(source_dialect: str, input_source: str, output_file: str):
+    """Sizes SQL files without transpiling them: statements, procedural code, dynamic SQL and other risks"""
+    from databricks.labs.remorph.transpiler.triage import triage as do_triage
+
+    if not input_source or not os.path.exists(input_source):
+        raise_validation_exception(f"Invalid value for '--input-source': Path '{input_source}' does not exist.")
+    if not output_file:
+        raise_validation_exception("Invalid value for '--output-file': a path is required.")
+
+    status = do_triage(source_dialect.lower(), input_source, output_file)
+
+    print(json.dumps(status))
+
+
+@remorph.command(is_unauthenticated=True)
+def transpile_query_history(
+    source_dialect: str,
+    input_source: str,
+    output_file: str | None = None,
+    id_column: str = "query_id",
+    sql_column: str = "query_text",
+    batch_size: str | None = None,
+    workers: str | None = None,
+    statement_templates: str | None = None,
+):
+    """Transpiles the queries of a query history export, a CSV, JSON Lines or Parquet file, in batches"""
+    try:
+        from databricks.labs.remorph.transpiler import query_history
+    except ImportError as e:
+        raise_validation_exception(f"Transpiling a query history requires pyarrow, install it first: {e}")
+
+    if not input_source or not os.path.isfile(input_source):
+        raise_validation_exception(f"Invalid value for '--input-source': File '{input_source}' does not exist.")
+    if query_history.query_history_format(input_source) is None:
+        raise_validation_exception(
+            f"Invalid value for '--input-source': '{input_source}' is not a {', '.join(query_history.FORMATS)} file."
+        )
+    if not output_file:
+        input_path = Path(input_source)
+        output_file = str(input_path.with_name(f"{input_path.stem}_transpiled{input_path.suffix}"))
+    elif query_history.query_history_format(output_file) is None:
+        raise_validation_exception(
+            f"Invalid value for '--output-file': '{output_file}' is not a {', '.join(query_history.FORMATS)} file."
+        )
+    batch_size = batch_size if batch_size else str(query_history.DEFAULT_BATCH_SIZE)
+    if not batch_size.isdigit() or int(batch_size) < 1:
+        raise_validation_exception(f"Invalid value for '--batch-size': '{batch_size}' is not a positive integer.")
+    workers = workers if workers else "1"
+    if not workers.isdigit() or int(workers) < 1:
+        raise_validation_exception(f"Invalid value for '--workers': '{workers}' is not a positive integer.")
+
+    config = TranspileConfig(
+        transpiler_config_path="sqlglot",
+        source_dialect=source_dialect.lower(),
+        workers=int(workers),
+        statement_templates=_statement_templates(statement_templates),
+    )
+    status = query_history.transpile_query_history(
+        config,
+        input_source,
+        output_file,
+        id_column,
+        sql_column,
+        int(batch_size),
+    )
+
+    print(json.dumps(status))
+
+
 def _override_workspace_client_config(ctx: ApplicationContext, overrides: dict[str, str] | None):
     """
     Override the Workspace client's SDK config with the user provided SDK config.
@@ -107,6 +275,9 @@ def _override_workspace_client_config(ctx: ApplicationContext, overrides: dict[s
 @remorph.command
 def reconcile(w: WorkspaceClient):
     """[EXPERIMENTAL] Reconciles source to Databricks datasets"""
+    from databricks.labs.remorph.reconcile.execute import RECONCILE_OPERATION_NAME
+    from databricks.labs.remorph.reconcile.runner import ReconcileRunner
+
     ctx = ApplicationContext(w)
     logger.debug(f"User: {ctx.current_user}")
     recon_runner = ReconcileRunner(
@@ -121,6 +292,9 @@ def reconcile(w: WorkspaceClient):
 @remorph.command
 def aggregates_reconcile(w: WorkspaceClient):
     """[EXPERIMENTAL] Reconciles Aggregated source to Databricks datasets"""
+    from databricks.labs.remorph.reconcile.execute import AGG_RECONCILE_OPERATION_NAME
+    from databricks.labs.remorph.reconcile.runner import ReconcileRunner
+
     ctx = ApplicationContext(w)
     logger.debug(f"User: {ctx.current_user}")
     recon_runner = ReconcileRunner(
@@ -136,6 +310,8 @@ def aggregates_reconcile(w: WorkspaceClient):
 @remorph.command
 def generate_lineage(w: WorkspaceClient, transpiler: str, source_dialect: str, input_source: str, output_folder: str):
     """[Experimental] Generates a lineage of source SQL files or folder"""
+    from databricks.labs.remorph.lineage import lineage_generator
+
     ctx = ApplicationContext(w)
     logger.debug(f"User: {ctx.current_user}")
     engine = TranspileEngine.load_engine(Path(transpiler))
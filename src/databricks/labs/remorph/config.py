@@ -2,6 +2,7 @@ import logging
 from dataclasses import dataclass
 from pathlib import Path
 
+from databricks.labs.remorph.helpers.watchdog import Budget
 from databricks.labs.remorph.transpiler.transpile_status import TranspileError
 from databricks.labs.remorph.reconcile.recon_config import Table
 
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 
 @dataclass
-class TranspileConfig:
+class TranspileConfig:  # pylint: disable=too-many-instance-attributes
     __file__ = "config.yml"
     __version__ = 2
 
@@ -23,6 +24,15 @@ class TranspileConfig:
     catalog_name: str = "remorph"
     schema_name: str = "transpiler"
     mode: str = "current"
+    workers: int = 1
+    cache_folder: str | None = None
+    validation_concurrency: int = 1
+    streaming_threshold_mb: int | None = None
+    trace_file: str | None = None
+    # fingerprints of statements differing only in their literals to keep a transpiled template of, 0 for none
+    statement_templates: int = 0
+    # wall-clock and memory budgets of parsing or generating a statement, and of transpiling a file
+    budget: Budget | None = None
 
     @property
     def transpiler_path(self):
@@ -74,6 +84,8 @@ class TranspileResult:
     transpiled_code: str
     success_count: int
     error_list: list[TranspileError]
+    # statements transpiled from the template of a statement differing only in its literals
+    statements_collapsed: int = 0
 
 
 @dataclass
@@ -0,0 +1,59 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import TypeVar
+
+_T = TypeVar("_T")
+_U = TypeVar("_U")
+
+
+def completed(value: _T) -> Future[_T]:
+    """Returns a future already holding `value`."""
+    future: Future[_T] = Future()
+    future.set_result(value)
+    return future
+
+
+def then(future: Future[_T], func: Callable[[_T], _U]) -> Future[_U]:
+    """
+    Returns a future of `func` applied to the result of `future`, holding the exception of either one if they fail.
+    `func` runs in the thread completing `future`, so it must not block.
+    """
+    chained: Future[_U] = Future()
+
+    def _done(done: Future[_T]) -> None:
+        try:
+            chained.set_result(func(done.result()))
+        except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+            chained.set_exception(e)
+
+    future.add_done_callback(_done)
+    return chained
+
+
+def gather(futures: list[Future[_T]]) -> Future[list[_T]]:
+    """
+    Returns a future of the results of `futures`, in their order, holding the exception of the first one to fail.
+    """
+    gathered: Future[list[_T]] = Future()
+    remaining = len(futures)
+    lock = threading.Lock()
+
+    def _done(done: Future[_T]) -> None:
+        nonlocal remaining
+        with lock:
+            remaining -= 1
+            last = remaining == 0
+            if gathered.done():
+                return
+            if done.exception() is not None:
+                gathered.set_exception(done.exception())
+                return
+        if last:
+            gathered.set_result([future.result() for future in futures])
+
+    if not futures:
+        gathered.set_result([])
+    for future in futures:
+        future.add_done_callback(_done)
+    return gathered
@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
+
+if TYPE_CHECKING:
+    # typing.Self needs Python 3.11, typing_extensions comes with the type checkers
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class SpanEvent:
+    name: str
+    start_ns: int
+    duration_ns: int
+    pid: int
+    tid: int
+    depth: int
+    # time spent in nested spans, to tell the time of a phase itself from the time of the phases it contains
+    children_ns: int = 0
+    args: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def self_ns(self) -> int:
+        return max(0, self.duration_ns - self.children_ns)
+
+
+@dataclass
+class PhaseSummary:
+    name: str
+    count: int
+    total_ms: float
+    self_ms: float
+    max_ms: float
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+class _Span:
+    __slots__ = ("_args", "_children_ns", "_name", "_parent", "_start_ns", "_tracer")
+
+    def __init__(self, tracer: "Tracer", name: str, args: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._args = args
+        self._start_ns = 0
+        self._children_ns = 0
+        self._parent: _Span | None = None
+
+    def __enter__(self) -> "Self":
+        self._parent = self._tracer.push(self)
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        duration_ns = time.perf_counter_ns() - self._start_ns
+        depth = self._tracer.pop(self._parent)
+        if self._parent is not None:
+            self._parent.add_child(duration_ns)
+        event = SpanEvent(
+            self._name,
+            self._start_ns,
+            duration_ns,
+            os.getpid(),
+            threading.get_ident(),
+            depth,
+            self._children_ns,
+            self._args,
+        )
+        self._tracer.record(event)
+
+    def add_child(self, duration_ns: int) -> None:
+        self._children_ns += duration_ns
+
+
+class Tracer:
+    """
+    Collects the spans opened with `span` while tracing is enabled. Spans nest per thread: the run holds the files,
+    a file holds its phases and the phases hold the statements.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events: list[SpanEvent] = []
+
+    def push(self, opened: _Span) -> _Span | None:
+        """Makes `opened` the innermost span of the current thread and returns the span it is nested in."""
+        parent = getattr(self._local, "current", None)
+        self._local.current = opened
+        self._local.depth = getattr(self._local, "depth", 0) + 1
+        return parent
+
+    def pop(self, parent: _Span | None) -> int:
+        """Closes the innermost span of the current thread and returns its depth, starting at zero."""
+        self._local.current = parent
+        self._local.depth -= 1
+        return self._local.depth
+
+    def record(self, event: SpanEvent) -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def extend(self, events: Iterable[SpanEvent]) -> None:
+        """Adds the spans recorded by another tracer, e.g. in a pool worker process."""
+        with self._lock:
+            self._events.extend(events)
+
+    def drain(self) -> list[SpanEvent]:
+        """Returns the spans recorded so far and forgets them."""
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    @property
+    def events(self) -> list[SpanEvent]:
+        with self._lock:
+            return list(self._events)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        """
+        Returns the spans in the Chrome trace event format, to be loaded in chrome://tracing or https://ui.perfetto.dev
+        """
+        events = self.events
+        origin_ns = min((event.start_ns for event in events), default=0)
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "ph": "X",
+                    "ts": (event.start_ns - origin_ns) / 1000,
+                    "dur": event.duration_ns / 1000,
+                    "pid": event.pid,
+                    "tid": event.tid,
+                    "args": event.args,
+                }
+                for event in sorted(events, key=lambda event: event.start_ns)
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()), encoding="utf-8")
+
+    def summary(self) -> list[PhaseSummary]:
+        """Aggregates the spans per name, the phases the most time was spent in first."""
+        phases: dict[str, PhaseSummary] = {}
+        for event in self.events:
+            phase = phases.setdefault(event.name, PhaseSummary(event.name, 0, 0.0, 0.0, 0.0))
+            phase.count += 1
+            phase.total_ms += event.duration_ns / 1e6
+            phase.self_ms += event.self_ns / 1e6
+            phase.max_ms = max(phase.max_ms, event.duration_ns / 1e6)
+        return sorted(phases.values(), key=lambda phase: phase.self_ms, reverse=True)
+
+    def format_summary(self) -> str:
+        lines = [f"{'phase':<24}{'count':>8}{'total ms':>12}{'self ms':>12}{'mean ms':>10}{'max ms':>10}"]
+        for phase in self.summary():
+            lines.append(
+                f"{phase.name:<24}{phase.count:>8}{phase.total_ms:>12.1f}{phase.self_ms:>12.1f}"
+                f"{phase.mean_ms:>10.2f}{phase.max_ms:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+_tracer: Tracer | None = None
+_NO_SPAN = nullcontext()
+
+
+def enable_tracing() -> Tracer:
+    """Starts recording spans in a new tracer, which is returned."""
+    global _tracer  # pylint: disable=global-statement
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable_tracing() -> Tracer | None:
+    """Stops recording spans and returns the tracer that recorded them, if tracing was enabled."""
+    global _tracer  # pylint: disable=global-statement
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Tracer | None:
+    return _tracer
+
+
+def span(name: str, **args: Any) -> AbstractContextManager:
+    """
+    Returns a context manager timing the enclosed block as a span named after the phase, with `args` shown
+    alongside it in the trace. When tracing is disabled, a shared no-op context manager is returned.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name, args)
+
+
+def traced(func: Callable[..., _T]) -> Callable[..., _T]:
+    """
+    Runs the function in a span named after it and logs how long it took.
+    """
+    name = func.__qualname__
+
+    @wraps(func)
+    def traced_wrapper(*args, **kwargs) -> _T:
+        start_time = time.perf_counter()
+        with span(name):
+            result = func(*args, **kwargs)
+        logger.info(f"{name} took {time.perf_counter() - start_time:.4f} seconds")
+        return result
+
+    return traced_wrapper
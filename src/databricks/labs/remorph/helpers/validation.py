@@ -1,20 +1,96 @@
 import logging
+from datetime import timedelta
 from io import StringIO
 
+import sqlglot
+from sqlglot.errors import ParseError, TokenError
+
 from databricks.labs.lsql.backends import SqlBackend
 from databricks.labs.remorph.config import TranspileConfig, ValidationResult
+from databricks.labs.remorph.helpers.validation_cache import ValidationCache
+from databricks.labs.remorph.transpiler.sqlglot.generator.databricks import Databricks
+from databricks.sdk.errors import ResourceExhausted, TemporarilyUnavailable, TooManyRequests
 from databricks.sdk.errors.base import DatabricksError
+from databricks.sdk.retries import retried
 
 logger = logging.getLogger(__name__)
 
 
+def _replace_variables(query: str) -> str:
+    # When variables is mentioned Explain fails we need way to replace them before explain is executed.
+    return query.replace("${", "`{").replace("}", "}`").replace("``", "`")
+
+
+class LocalValidator:
+    """
+    Pre-screens SQL for syntax errors without a warehouse round trip.
+
+    The SQL is re-parsed with the remorph Databricks dialect and, when a Spark session backed by a local JVM is
+    active, with the Spark SQL parser itself. Statements rejected here are reported as `[PARSE_SYNTAX_ERROR]`,
+    the error the warehouse would raise for them.
+    """
+
+    def __init__(self):
+        self._spark_sql_parser = self._get_spark_sql_parser()
+
+    @staticmethod
+    def _get_spark_sql_parser():
+        # pyspark is only needed when a local session is active, so it is not imported eagerly
+        try:
+            from pyspark.sql import SparkSession  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return None
+        spark = SparkSession.getActiveSession()
+        jspark = getattr(spark, "_jsparkSession", None)  # absent from Spark Connect sessions
+        if jspark is None:
+            return None
+        logger.debug("Using the Spark SQL parser for local validation")
+        return jspark.sessionState().sqlParser()
+
+    def syntax_error(self, query: str) -> str | None:
+        """
+        Returns the syntax error found in the query, or None if no error was found locally.
+        """
+        sql = _replace_variables(query)
+        try:
+            expressions = [expression for expression in sqlglot.parse(sql, read=Databricks) if expression]
+        except ParseError as e:
+            # the message of a ParseError highlights the offending SQL with terminal escape codes, so rebuild it
+            details = "; ".join(f"{err['description']}. Line {err['line']}, Col: {err['col']}" for err in e.errors)
+            return f"[PARSE_SYNTAX_ERROR] Syntax error detected locally: {details or e}"
+        except TokenError as e:
+            return f"[PARSE_SYNTAX_ERROR] Syntax error detected locally: {e}"
+        if self._spark_sql_parser is not None and len(expressions) == 1:
+            try:
+                self._spark_sql_parser.parsePlan(sql)
+            except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+                # py4j surfaces Spark's ParseException as a generic Py4JJavaError
+                if "ParseException" in str(e) or "PARSE_SYNTAX_ERROR" in str(e):
+                    return f"[PARSE_SYNTAX_ERROR] Syntax error detected locally: {e}"
+                logger.debug(f"Spark SQL parser failed, leaving validation to the warehouse: {e}")
+        return None
+
+
 class Validator:
     """
     The Validator class is used to validate SQL queries.
+
+    A single Validator can be shared by several threads; queries throttled by the warehouse are retried until
+    `retry_timeout` expires. With a `cache`, statements validated before are not explained again, and with a
+    `local_validator`, statements with syntax errors are rejected without being sent to the warehouse.
     """
 
-    def __init__(self, sql_backend: SqlBackend):
+    def __init__(
+        self,
+        sql_backend: SqlBackend,
+        retry_timeout: timedelta = timedelta(minutes=5),
+        cache: ValidationCache | None = None,
+        local_validator: LocalValidator | None = None,
+    ):
         self._sql_backend = sql_backend
+        self._retry_timeout = retry_timeout
+        self._cache = cache
+        self._local_validator = local_validator
 
     def validate_format_result(self, config: TranspileConfig, sql_text: str) -> ValidationResult:
         """
@@ -59,6 +135,31 @@ class Validator:
 
     def _query(
         self, sql_backend: SqlBackend, query: str, catalog: str, schema: str
+    ) -> tuple[bool, str | None, str | None]:
+        if self._local_validator is not None:
+            syntax_error = self._local_validator.syntax_error(query)
+            if syntax_error is not None:
+                logger.debug(f"Syntax Exception detected locally: {syntax_error}")
+                return False, "error", syntax_error
+        key = None
+        if self._cache is not None:
+            key = self._cache.key(query, catalog, schema)
+            cached = self._cache.get(key)
+            if cached is not None:
+                logger.debug("Validation result found in cache")
+                return cached
+        try:
+            result = self._explain(sql_backend, query, catalog, schema)
+        except TimeoutError as err:
+            # throttling is transient, so this result is not cached
+            logger.warning(f"Validation query kept being throttled, giving up: {err}")
+            return False, "error", f"{err}: {err.__cause__}"
+        if self._cache is not None and key is not None:
+            self._cache.put(key, result)
+        return result
+
+    def _explain(
+        self, sql_backend: SqlBackend, query: str, catalog: str, schema: str
     ) -> tuple[bool, str | None, str | None]:
         """
         Validate a given SQL query using the provided SQL backend
@@ -71,10 +172,9 @@ class Validator:
         - tuple: A tuple containing a boolean indicating whether the query is valid or not,
         and a string containing a success message or an exception message.
         """
-        # When variables is mentioned Explain fails we need way to replace them before explain is executed.
-        explain_query = f'EXPLAIN {query.replace("${", "`{").replace("}", "}`").replace("``", "`")}'
+        explain_query = f"EXPLAIN {_replace_variables(query)}"
         try:
-            rows = list(sql_backend.fetch(explain_query, catalog=catalog, schema=schema))
+            rows = self._fetch(sql_backend, explain_query, catalog, schema)
             if not rows:
                 return False, "error", "No results returned from explain query."
 
@@ -99,3 +199,10 @@ class Validator:
 
             logger.debug(f"Unknown Exception: {err_msg}")
             return False, "error", err_msg
+
+    def _fetch(self, sql_backend: SqlBackend, query: str, catalog: str, schema: str) -> list:
+        @retried(on=[TooManyRequests, ResourceExhausted, TemporarilyUnavailable], timeout=self._retry_timeout)
+        def fetch_all():
+            return list(sql_backend.fetch(query, catalog=catalog, schema=schema))
+
+        return fetch_all()
@@ -0,0 +1,115 @@
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import timedelta
+from pathlib import Path
+
+from sqlglot.dialects.databricks import Databricks
+from sqlglot.errors import TokenError
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def sql_fingerprint(sql: str) -> str:
+    """
+    Returns a fingerprint of the SQL text that ignores whitespace and comments.
+
+    The SQL is tokenized with the Databricks tokenizer, which drops whitespace and attaches comments to the tokens
+    instead of the token text; SQL that cannot be tokenized falls back to collapsing its whitespace.
+    """
+    digest = hashlib.sha256()
+    try:
+        for token in Databricks().tokenize(sql):
+            digest.update(f"{token.token_type.name}:{token.text}\0".encode("utf-8", "surrogatepass"))
+    except TokenError:
+        digest = hashlib.sha256(_WHITESPACE.sub(" ", sql).strip().encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class ValidationCache:
+    """
+    Persistent cache of validation query results, stored in a local SQLite file so that unchanged statements are
+    not explained again on later runs.
+
+    Entries are keyed by the SQL fingerprint, the catalog and the schema. They expire `ttl` after they were written
+    and the least recently used entries are evicted once the cache holds more than `max_entries`.
+    The cache can be shared by the threads of a validation pool.
+    """
+
+    _EVICT_EVERY = 256
+
+    def __init__(self, path: Path, ttl: timedelta = timedelta(days=7), max_entries: int = 100_000):
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._puts = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS validation_results (
+                    key TEXT PRIMARY KEY,
+                    is_valid INTEGER NOT NULL,
+                    exception_type TEXT,
+                    exception_msg TEXT,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS lru ON validation_results (last_used_at)")
+            self._evict(conn)
+
+    @staticmethod
+    def key(sql: str, catalog: str, schema: str) -> str:
+        return f"{catalog}\0{schema}\0{sql_fingerprint(sql)}"
+
+    def get(self, key: str) -> tuple[bool, str | None, str | None] | None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT is_valid, exception_type, exception_msg FROM validation_results "
+                "WHERE key = ? AND created_at >= ?",
+                (key, now - self._ttl.total_seconds()),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE validation_results SET last_used_at = ? WHERE key = ?", (now, key))
+        return bool(row[0]), row[1], row[2]
+
+    def put(self, key: str, result: tuple[bool, str | None, str | None]) -> None:
+        now = time.time()
+        is_valid, exception_type, exception_msg = result
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO validation_results VALUES (?, ?, ?, ?, ?, ?)",
+                (key, int(is_valid), exception_type, exception_msg, now, now),
+            )
+            self._puts += 1
+            if self._puts % self._EVICT_EVERY == 0:
+                self._evict(conn)
+
+    def evict(self) -> None:
+        with self._lock, self._connect() as conn:
+            self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "DELETE FROM validation_results WHERE created_at < ?", (time.time() - self._ttl.total_seconds(),)
+        )
+        conn.execute(
+            "DELETE FROM validation_results WHERE key IN "
+            "(SELECT key FROM validation_results ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+            (self._max_entries,),
+        )
+
+    def _connect(self) -> closing[sqlite3.Connection]:
+        # autocommit: every statement is its own transaction, so other processes see entries right away
+        return closing(sqlite3.connect(self._path, timeout=30, isolation_level=None))
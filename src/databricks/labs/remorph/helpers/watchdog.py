@@ -0,0 +1,180 @@
+"""
+Wall-clock and memory budgets for pure Python code, such as parsing a statement.
+
+Code running under `Watchdog.guard` is interrupted at its next checkpoint once over its budget: the guarded code
+calls `Watchdog.checkpoint` as it goes, directly or through the methods `Watchdog.instrument` wrapped, e.g. the
+method of a parser advancing to the next token. The interruption is raised by the guarded code itself, at points
+where it is known to hold no lock and to leave no state shared with other code half updated, and `guard` turns it
+into a `BudgetExceeded`. Code between two checkpoints, e.g. a long call into native code, runs to completion.
+
+Memory is measured as the growth of the resident set size of the process since the guard was entered, read from
+`/proc` every `_MEMORY_CHECK_INTERVAL` checkpoints, so memory budgets are only enforced on Linux. The resident set
+size counts the memory of every thread of the process: memory budgets are meant for processes transpiling one file
+at a time, such as the workers of a pool.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+# reading the resident set size costs a system call, checkpoints are much more frequent
+_MEMORY_CHECK_INTERVAL = 256
+
+
+@dataclass(frozen=True)
+class Budget:
+    """
+    The wall-clock seconds and the memory in MB that parsing or generating a statement may take, and the wall-clock
+    seconds that transpiling a file may take, None for no limit.
+    """
+
+    statement_seconds: float | None = None
+    statement_memory_mb: float | None = None
+    file_seconds: float | None = None
+
+    @property
+    def unlimited(self) -> bool:
+        return self.statement_seconds is None and self.statement_memory_mb is None and self.file_seconds is None
+
+
+class BudgetExceeded(Exception):
+    def __init__(self, resource: str, limit: float, elapsed_seconds: float, memory_mb: float | None):
+        self.resource = resource
+        self.limit = limit
+        self.elapsed_seconds = elapsed_seconds
+        # None unless a memory budget was set
+        self.memory_mb = memory_mb
+        unit = "s" if resource == "time" else "MB"
+        message = f"Exceeded the {resource} budget of {limit}{unit} after {elapsed_seconds:.2f}s"
+        if memory_mb is not None:
+            message += f", using {memory_mb:.1f}MB"
+        super().__init__(message)
+
+
+class _Interrupt(BaseException):
+    """Raised at a checkpoint, a `BaseException` so that no `except Exception` of the guarded code swallows it"""
+
+    def __init__(self, guarded: "_Guarded"):
+        super().__init__()
+        self.guarded = guarded
+
+
+def _rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class _Guarded:
+    __slots__ = (
+        "checks",
+        "deadline",
+        "elapsed_seconds",
+        "exceeded",
+        "memory_mb",
+        "seconds",
+        "start",
+        "start_rss",
+        "used_mb",
+    )
+
+    def __init__(self, seconds: float | None, memory_mb: float | None):
+        self.seconds = seconds
+        self.memory_mb = memory_mb
+        self.start = time.monotonic()
+        self.deadline = self.start + seconds if seconds is not None else None
+        self.start_rss = _rss_bytes() if memory_mb is not None else None
+        self.checks = 0
+        self.exceeded: str | None = None
+        self.elapsed_seconds = 0.0
+        # the memory used, None unless a memory budget was set
+        self.used_mb: float | None = None
+
+    def check(self, now: float) -> bool:
+        """Tells whether the guarded code is over its budget, remembering which one"""
+        if self.deadline is not None and now > self.deadline:
+            self.exceeded = "time"
+        elif self.start_rss is not None and self.memory_mb is not None:
+            self.checks += 1
+            if self.checks % _MEMORY_CHECK_INTERVAL == 0:
+                rss = _rss_bytes()
+                self.used_mb = None if rss is None else max(0, rss - self.start_rss) / _MB
+                if self.used_mb is not None and self.used_mb > self.memory_mb:
+                    self.exceeded = "memory"
+        return self.exceeded is not None
+
+    def exception(self) -> BudgetExceeded:
+        limit = self.seconds if self.exceeded == "time" else self.memory_mb
+        assert self.exceeded is not None and limit is not None
+        return BudgetExceeded(self.exceeded, limit, self.elapsed_seconds, self.used_mb)
+
+
+class Watchdog:
+    """
+    Enforces the budgets of the code running under `guard`, nested guards included, in any number of threads: each
+    thread checks its own guards at its checkpoints, and the outermost guard over its budget interrupts it.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @contextmanager
+    def guard(self, seconds: float | None, memory_mb: float | None = None) -> Iterator[None]:
+        """Runs the body of the `with` statement within its budget, raising a `BudgetExceeded` once over it"""
+        if seconds is None and memory_mb is None:
+            yield
+            return
+        guarded = _Guarded(seconds, memory_mb)
+        guards = self._guards()
+        guards.append(guarded)
+        try:
+            yield
+        except _Interrupt as e:
+            if e.guarded is not guarded:
+                # the budget of an enclosing guard was exceeded
+                raise
+            raise guarded.exception() from None
+        finally:
+            guards.remove(guarded)
+
+    def checkpoint(self) -> None:
+        """Interrupts the calling thread if it is over the budget of one of its guards"""
+        guards = self._guards()
+        if not guards:
+            return
+        now = time.monotonic()
+        for guarded in guards:
+            if guarded.check(now):
+                guarded.elapsed_seconds = now - guarded.start
+                logger.debug(f"Interrupting thread {threading.get_ident()}: over its {guarded.exceeded} budget")
+                raise _Interrupt(guarded)
+
+    def instrument(self, target: Any, method: str) -> None:
+        """Replaces `method` of the `target` instance with one running a checkpoint before each call"""
+        wrapped: Callable[..., Any] = getattr(target, method)
+        checkpoint = self.checkpoint
+
+        @functools.wraps(wrapped)
+        def checked(*args, **kwargs):
+            checkpoint()
+            return wrapped(*args, **kwargs)
+
+        setattr(target, method, checked)
+
+    def _guards(self) -> list[_Guarded]:
+        guards = getattr(self._local, "guards", None)
+        if guards is None:
+            guards = self._local.guards = []
+        return guards
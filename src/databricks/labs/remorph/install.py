@@ -24,7 +24,7 @@ from databricks.labs.remorph.contexts.application import ApplicationContext
 from databricks.labs.remorph.deployment.configurator import ResourceConfigurator
 from databricks.labs.remorph.deployment.installation import WorkspaceInstallation
 from databricks.labs.remorph.reconcile.constants import ReconReportType, ReconSourceType
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import SQLGLOT_DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 
 logger = logging.getLogger(__name__)
 
@@ -136,7 +136,7 @@ class WorkspaceInstaller:
     def _prompt_for_new_transpile_installation(self) -> TranspileConfig:
         logger.info("Please answer a few questions to configure remorph `transpile`")
         transpiler = self._prompts.question("Enter path to the transpiler configuration file", default="sqlglot")
-        source_dialect = self._prompts.choice("Select the source dialect:", list(SQLGLOT_DIALECTS.keys()))
+        source_dialect = self._prompts.choice("Select the source dialect:", DIALECTS.keys())
         input_source = self._prompts.question("Enter input SQL path (directory/file)")
         output_folder = self._prompts.question("Enter output directory", default="transpiled")
         run_validation = self._prompts.confirm(
@@ -14,7 +14,7 @@ from databricks.labs.remorph.config import (
     ReconcileConfig,
     ReconcileMetadataConfig,
 )
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.labs.remorph.reconcile.compare import (
     capture_mismatch_data_and_columns,
     reconcile_data,
@@ -185,7 +185,7 @@ def recon(
     validate_input(report_type, {"schema", "data", "row", "all"}, "Invalid report type")
 
     source, target = initialise_data_source(
-        engine=get_dialect(reconcile_config.data_source),
+        engine=DIALECTS.get(reconcile_config.data_source),
         spark=spark,
         ws=ws_client,
         secret_scope=reconcile_config.secret_scope,
@@ -199,7 +199,7 @@ def recon(
         reconcile_config.database_config,
         report_type,
         SchemaCompare(spark=spark),
-        get_dialect(reconcile_config.data_source),
+        DIALECTS.get(reconcile_config.data_source),
         spark,
         metadata_config=reconcile_config.metadata_config,
     )
@@ -209,7 +209,7 @@ def recon(
         database_config=reconcile_config.database_config,
         recon_id=recon_id,
         report_type=report_type,
-        source_dialect=get_dialect(reconcile_config.data_source),
+        source_dialect=DIALECTS.get(reconcile_config.data_source),
         ws=ws_client,
         spark=spark,
         metadata_config=reconcile_config.metadata_config,
@@ -296,7 +296,7 @@ def initialise_data_source(
     secret_scope: str,
 ):
     source = create_adapter(engine=engine, spark=spark, ws=ws, secret_scope=secret_scope)
-    target = create_adapter(engine=get_dialect("databricks"), spark=spark, ws=ws, secret_scope=secret_scope)
+    target = create_adapter(engine=DIALECTS.get("databricks"), spark=spark, ws=ws, secret_scope=secret_scope)
 
     return source, target
 
@@ -344,7 +344,7 @@ def reconcile_aggregates(
 
     # Read the reconcile_config and initialise the source and target data sources. Target is always Databricks
     source, target = initialise_data_source(
-        engine=get_dialect(reconcile_config.data_source),
+        engine=DIALECTS.get(reconcile_config.data_source),
         spark=spark,
         ws=ws_client,
         secret_scope=reconcile_config.secret_scope,
@@ -360,7 +360,7 @@ def reconcile_aggregates(
         reconcile_config.database_config,
         report_type,
         SchemaCompare(spark=spark),
-        get_dialect(reconcile_config.data_source),
+        DIALECTS.get(reconcile_config.data_source),
         spark,
         metadata_config=reconcile_config.metadata_config,
     )
@@ -370,7 +370,7 @@ def reconcile_aggregates(
         database_config=reconcile_config.database_config,
         recon_id=recon_id,
         report_type=report_type,
-        source_dialect=get_dialect(reconcile_config.data_source),
+        source_dialect=DIALECTS.get(reconcile_config.data_source),
         ws=ws_client,
         spark=spark,
         metadata_config=reconcile_config.metadata_config,
@@ -444,7 +444,7 @@ class Reconciliation:
         self._report_type = report_type
         self._database_config = database_config
         self._schema_comparator = schema_comparator
-        self._target_engine = get_dialect("databricks")
+        self._target_engine = DIALECTS.get("databricks")
         self._source_engine = source_engine
         self._spark = spark
         self._metadata_config = metadata_config
@@ -10,7 +10,7 @@ from databricks.labs.remorph.reconcile.query_builder.expression_generator import
     transform_expression,
 )
 from databricks.labs.remorph.reconcile.recon_config import Schema, Table, Aggregate
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect, SQLGLOT_DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 
 logger = logging.getLogger(__name__)
 
@@ -93,7 +93,7 @@ class QueryBuilder(ABC):
 
     def _user_transformer(self, node: exp.Expression, user_transformations: dict[str, str]) -> exp.Expression:
         if isinstance(node, exp.Column) and user_transformations:
-            dialect = self.engine if self.layer == "source" else get_dialect("databricks")
+            dialect = self.engine if self.layer == "source" else DIALECTS.get("databricks")
             column_name = node.name
             if column_name in user_transformations.keys():
                 return parse_one(user_transformations.get(column_name, column_name), read=dialect)
@@ -111,8 +111,10 @@ class QueryBuilder(ABC):
     def _default_transformer(node: exp.Expression, schema: list[Schema], source: Dialect) -> exp.Expression:
 
         def _get_transform(datatype: str):
-            source_dialects = [source_key for source_key, dialect in SQLGLOT_DIALECTS.items() if dialect == source]
-            source_dialect = source_dialects[0] if source_dialects else "universal"
+            try:
+                source_dialect = DIALECTS.key_of(source)
+            except KeyError:
+                source_dialect = "universal"
 
             source_mapping = DataType_transform_mapping.get(source_dialect, {})
 
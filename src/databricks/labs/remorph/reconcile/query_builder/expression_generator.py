@@ -5,7 +5,7 @@ from pyspark.sql.types import DataType, NumericType
 from sqlglot import Dialect
 from sqlglot import expressions as exp
 
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.labs.remorph.reconcile.recon_config import HashAlgoMapping
 
 
@@ -238,32 +238,32 @@ DataType_transform_mapping: dict[str, dict[str, list[partial[exp.Expression]]]]
     "snowflake": {exp.DataType.Type.ARRAY.value: [partial(array_to_string), partial(array_sort)]},
     "oracle": {
         exp.DataType.Type.NCHAR.value: [
-            partial(anonymous, func="NVL(TRIM(TO_CHAR({})),'_null_recon_')", dialect=get_dialect("oracle"))
+            partial(anonymous, func="NVL(TRIM(TO_CHAR({})),'_null_recon_')", dialect=DIALECTS.get("oracle"))
         ],
         exp.DataType.Type.NVARCHAR.value: [
-            partial(anonymous, func="NVL(TRIM(TO_CHAR({})),'_null_recon_')", dialect=get_dialect("oracle"))
+            partial(anonymous, func="NVL(TRIM(TO_CHAR({})),'_null_recon_')", dialect=DIALECTS.get("oracle"))
         ],
     },
     "databricks": {
         exp.DataType.Type.ARRAY.value: [
-            partial(anonymous, func="CONCAT_WS(',', SORT_ARRAY({}))", dialect=get_dialect("databricks"))
+            partial(anonymous, func="CONCAT_WS(',', SORT_ARRAY({}))", dialect=DIALECTS.get("databricks"))
         ],
     },
 }
 
 sha256_partial = partial(sha2, num_bits="256", is_expr=True)
 Dialect_hash_algo_mapping: dict[Dialect, HashAlgoMapping] = {
-    get_dialect("snowflake"): HashAlgoMapping(
+    DIALECTS.get("snowflake"): HashAlgoMapping(
         source=sha256_partial,
         target=sha256_partial,
     ),
-    get_dialect("oracle"): HashAlgoMapping(
+    DIALECTS.get("oracle"): HashAlgoMapping(
         source=partial(
-            anonymous, func="RAWTOHEX(STANDARD_HASH({}, 'SHA256'))", is_expr=True, dialect=get_dialect("oracle")
+            anonymous, func="RAWTOHEX(STANDARD_HASH({}, 'SHA256'))", is_expr=True, dialect=DIALECTS.get("oracle")
         ),
         target=sha256_partial,
     ),
-    get_dialect("databricks"): HashAlgoMapping(
+    DIALECTS.get("databricks"): HashAlgoMapping(
         source=sha256_partial,
         target=sha256_partial,
     ),
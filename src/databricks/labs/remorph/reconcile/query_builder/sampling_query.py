@@ -4,7 +4,7 @@ import sqlglot.expressions as exp
 from pyspark.sql import DataFrame
 from sqlglot import select
 
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_key_from_dialect
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.labs.remorph.reconcile.query_builder.base import QueryBuilder
 from databricks.labs.remorph.reconcile.query_builder.expression_generator import (
     build_column,
@@ -97,7 +97,7 @@ class SamplingQueryBuilder(QueryBuilder):
                 )
                 for col, value in zip(df.columns, row)
             ]
-            if get_key_from_dialect(self.engine) == "oracle":
+            if DIALECTS.key_of(self.engine) == "oracle":
                 union_res.append(select(*row_select).from_("dual"))
             else:
                 union_res.append(select(*row_select))
@@ -9,7 +9,7 @@ from pyspark.errors import PySparkException
 from sqlglot import Dialect
 
 from databricks.labs.remorph.config import DatabaseConfig, Table, ReconcileMetadataConfig
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_key_from_dialect
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.labs.remorph.reconcile.exception import (
     WriteToTableException,
     ReadAndWriteWithVolumeException,
@@ -261,7 +261,7 @@ class ReconCapture:
         recon_process_duration: ReconcileProcessDuration,
         operation_name: str = "reconcile",
     ) -> None:
-        source_dialect_key = get_key_from_dialect(self.source_dialect)
+        source_dialect_key = DIALECTS.key_of(self.source_dialect)
         df = self.spark.sql(
             f"""
                 select {recon_table_id} as recon_table_id,
@@ -3,10 +3,14 @@ from __future__ import annotations
 import logging
 from collections.abc import Callable
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from pyspark.sql import DataFrame
 from sqlglot import expressions as exp
 
+if TYPE_CHECKING:
+    # only used in annotations, importing pyspark would slow down the CLI commands loading the config
+    from pyspark.sql import DataFrame
+
 logger = logging.getLogger(__name__)
 
 _SUPPORTED_AGG_TYPES: set[str] = {
@@ -5,7 +5,7 @@ from pyspark.sql import DataFrame, SparkSession
 from pyspark.sql.types import BooleanType, StringType, StructField, StructType
 from sqlglot import Dialect, parse_one
 
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.labs.remorph.reconcile.recon_config import (
     Schema,
     SchemaMatchResult,
@@ -82,7 +82,7 @@ class SchemaCompare:
     def _parse(cls, source: Dialect, column: str, data_type: str) -> str:
         return (
             parse_one(f"create table dummy ({column} {data_type})", read=source)
-            .sql(dialect=get_dialect("databricks"))
+            .sql(dialect=DIALECTS.get("databricks"))
             .replace(", ", ",")
         )
 
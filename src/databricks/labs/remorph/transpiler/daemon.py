@@ -0,0 +1,164 @@
+"""
+Long-running transpile process, for callers that transpile one file per invocation, e.g. build systems: the
+Python startup, the imports and the construction of the dialects are paid once, by the daemon, instead of on
+every call. See `daemon_client` for the client side.
+
+Requests and responses are JSON objects, one per line, read from and written to a Unix socket or the standard
+input and output of the daemon:
+
+    {"id": 1, "method": "transpile", "params": {"source_dialect": "snowflake", "source_code": "SELECT 1",
+        "file_path": "query.sql", "target_dialect": "databricks", "transpiler_config_path": "sqlglot"}}
+    {"id": 1, "result": {"transpiled_code": "SELECT\\n  1", "success_count": 1, "error_list": []}}
+
+`lineage` takes the same parameters but `target_dialect`, and returns the `[source, target]` table pairs. `ping`
+returns the version of remorph and `shutdown` stops the daemon. A failed request is answered with
+`{"id": 1, "error": {"type": "ValueError", "message": "..."}}`.
+"""
+
+import json
+import logging
+import os
+import socketserver
+import threading
+from pathlib import Path
+from typing import Any, TextIO
+
+from databricks.labs.remorph.__about__ import __version__
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSPILER = "sqlglot"
+DEFAULT_TARGET_DIALECT = "databricks"
+
+
+class TranspileDaemon:
+    """
+    Handles the requests of the daemon, with the engines loaded once per transpiler config and kept for the
+    lifetime of the process. Requests may be handled concurrently.
+    """
+
+    def __init__(self, transpiler_config_paths: tuple[str, ...] = (DEFAULT_TRANSPILER,)):
+        self._engines: dict[str, TranspileEngine] = {}
+        self._lock = threading.Lock()
+        for transpiler_config_path in transpiler_config_paths:
+            self.engine(transpiler_config_path)
+
+    def engine(self, transpiler_config_path: str) -> TranspileEngine:
+        with self._lock:
+            engine = self._engines.get(transpiler_config_path)
+            if engine is None:
+                engine = TranspileEngine.load_engine(Path(transpiler_config_path))
+                self._engines[transpiler_config_path] = engine
+            return engine
+
+    def warm_up(self) -> None:
+        """Builds every dialect and the tables of its tokenizer and parser, by transpiling a query from it."""
+        engine = self.engine(DEFAULT_TRANSPILER)
+        for dialect in DIALECTS:
+            try:
+                engine.transpile(dialect, DEFAULT_TARGET_DIALECT, "SELECT 1", Path("warm_up.sql"))
+            except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+                logger.debug(f"Could not warm up dialect {dialect}: {e}")
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        response: dict[str, Any] = {"id": request.get("id")}
+        try:
+            response["result"] = self._dispatch(request.get("method"), request.get("params") or {})
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.debug(f"Failed to handle {request.get('method')} request", exc_info=e)
+            response["error"] = {"type": type(e).__name__, "message": str(e)}
+        return response
+
+    def handle_line(self, line: str) -> tuple[str, bool]:
+        """Returns the response to the request on `line`, and whether the request asks the daemon to shut down."""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return json.dumps({"id": None, "error": {"type": type(e).__name__, "message": str(e)}}), False
+        return json.dumps(self.handle(request)), request.get("method") == "shutdown"
+
+    def _dispatch(self, method: str | None, params: dict[str, Any]) -> Any:
+        if method == "ping":
+            return {"version": __version__, "pid": os.getpid()}
+        if method == "shutdown":
+            return None
+        engine = self.engine(params.get("transpiler_config_path", DEFAULT_TRANSPILER))
+        source_dialect = params["source_dialect"]
+        engine.check_source_dialect(source_dialect)
+        file_path = Path(params.get("file_path", "inline_sql"))
+        if method == "transpile":
+            target_dialect = params.get("target_dialect", DEFAULT_TARGET_DIALECT)
+            result = engine.transpile(source_dialect, target_dialect, params["source_code"], file_path)
+            return {
+                "transpiled_code": result.transpiled_code,
+                "success_count": result.success_count,
+                "error_list": [error.as_dict() for error in result.error_list],
+            }
+        if method == "lineage":
+            lineage = engine.analyse_table_lineage(source_dialect, params["source_code"], file_path)
+            return [list(edge) for edge in lineage]
+        raise ValueError(f"Unknown method: {method}")
+
+
+def serve_stream(daemon: TranspileDaemon, reader: TextIO, writer: TextIO) -> None:
+    """Handles the requests read from `reader` one at a time, until a `shutdown` request or the end of the input."""
+    for line in reader:
+        if not line.strip():
+            continue
+        response, shutdown = daemon.handle_line(line)
+        writer.write(response + "\n")
+        writer.flush()
+        if shutdown:
+            return
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "_DaemonServer"
+
+    def handle(self) -> None:
+        for raw_line in self.rfile:
+            line = raw_line.decode("utf-8")
+            if not line.strip():
+                continue
+            response, shutdown = self.server.transpile_daemon.handle_line(line)
+            self.wfile.write((response + "\n").encode("utf-8"))
+            self.wfile.flush()
+            if shutdown:
+                # shutdown() waits for serve_forever to return, which runs in another thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _DaemonServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, socket_path: Path, daemon: TranspileDaemon):
+            self.transpile_daemon = daemon
+            super().__init__(str(socket_path), _RequestHandler)
+
+
+def serve_socket(daemon: TranspileDaemon, socket_path: Path, ready: threading.Event | None = None) -> None:
+    """
+    Handles the requests of the clients connecting to the Unix socket at `socket_path`, each client in its own
+    thread, until a `shutdown` request. The socket is only accessible to the current user.
+    """
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise OSError("Unix sockets are not supported on this platform, serve the standard input and output instead")
+    socket_path.unlink(missing_ok=True)
+    previous_umask = os.umask(0o077)
+    try:
+        server = _DaemonServer(socket_path, daemon)
+    finally:
+        os.umask(previous_umask)
+    logger.info(f"Transpile daemon {os.getpid()} listening on {socket_path}")
+    try:
+        with server:
+            if ready is not None:
+                ready.set()
+            server.serve_forever()
+    finally:
+        socket_path.unlink(missing_ok=True)
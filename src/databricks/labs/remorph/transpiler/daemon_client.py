@@ -0,0 +1,130 @@
+"""
+Thin client of the transpile daemon, see `daemon`. It only imports the standard library, so that a call costs
+little more than the Python startup when a daemon answers; otherwise the request is handled in-process, at the
+cost of loading the transpiler.
+
+    python -m databricks.labs.remorph.transpiler.daemon_client transpile query.sql --source-dialect snowflake \\
+        --socket-path /tmp/remorph.sock
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import socket
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    # typing.Self needs Python 3.11, typing_extensions comes with the type checkers
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonError(Exception):
+    """A request failed in the daemon, or in-process."""
+
+    def __init__(self, error: dict[str, Any]):
+        super().__init__(f"{error.get('type')}: {error.get('message')}")
+        self.type = error.get("type")
+
+
+class DaemonClient:
+    """Connection to a transpile daemon listening on a Unix socket, sending one request at a time."""
+
+    def __init__(self, socket_path: Path, timeout: float | None = 300.0):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        try:
+            self._socket.connect(str(socket_path))
+        except OSError:
+            self._socket.close()
+            raise
+        self._file = self._socket.makefile("rwb")
+        self._ids = itertools.count(1)
+
+    def request(self, method: str, params: dict[str, Any] | None = None) -> Any:
+        message = {"id": next(self._ids), "method": method, "params": params or {}}
+        self._file.write((json.dumps(message) + "\n").encode("utf-8"))
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("The transpile daemon closed the connection")
+        return _result(json.loads(line))
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _result(response: dict[str, Any]) -> Any:
+    if "error" in response:
+        raise DaemonError(response["error"])
+    return response.get("result")
+
+
+def request(method: str, params: dict[str, Any], socket_path: Path | None = None) -> Any:
+    """
+    Sends the request to the daemon listening on `socket_path`, or handles it in-process when there is no
+    socket path or no daemon answers on it.
+    """
+    if socket_path is not None:
+        try:
+            with DaemonClient(socket_path) as client:
+                return client.request(method, params)
+        except OSError as e:
+            logger.debug(f"No transpile daemon on {socket_path}, handling the request in-process: {e}")
+    # pylint: disable=import-outside-toplevel, cyclic-import
+    from databricks.labs.remorph.transpiler.daemon import TranspileDaemon
+
+    daemon = TranspileDaemon(transpiler_config_paths=())
+    return _result(daemon.handle({"method": method, "params": params}))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("method", choices=["transpile", "lineage"])
+    parser.add_argument("input_file", type=Path)
+    parser.add_argument("--source-dialect", required=True)
+    parser.add_argument("--target-dialect", default="databricks")
+    parser.add_argument("--transpiler-config-path", default="sqlglot")
+    parser.add_argument("--socket-path", type=Path, help="Unix socket of the daemon, in-process if omitted")
+    parser.add_argument("--output-file", type=Path, help="file to write the transpiled code to, stdout if omitted")
+    args = parser.parse_args(argv)
+
+    params = {
+        "transpiler_config_path": args.transpiler_config_path,
+        "source_dialect": args.source_dialect,
+        "source_code": args.input_file.read_text(encoding="utf-8"),
+        "file_path": str(args.input_file),
+    }
+    if args.method == "transpile":
+        params["target_dialect"] = args.target_dialect
+    try:
+        result = request(args.method, params, args.socket_path)
+    except DaemonError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.method == "lineage":
+        output = "".join(f"{source}\t{target}\n" for source, target in result)
+    else:
+        output = result["transpiled_code"] + "\n"
+        for error in result["error_list"]:
+            print(f"{error['type']}: {error['error_msg']}", file=sys.stderr)
+    if args.output_file:
+        args.output_file.write_text(output, encoding="utf-8")
+    else:
+        sys.stdout.write(output)
+    return 1 if args.method == "transpile" and result["error_list"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
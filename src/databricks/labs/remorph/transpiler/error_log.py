@@ -0,0 +1,56 @@
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+
+from databricks.labs.remorph.transpiler.transpile_status import TranspileError
+
+if TYPE_CHECKING:
+    # typing.Self needs Python 3.11, typing_extensions comes with the type checkers
+    from typing_extensions import Self
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorLog:
+    """
+    Append-only log of transpile errors, one JSON object per line, written as the errors occur so that nothing
+    is held in memory and the errors found before a crash are kept. The file is only created on the first error.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file: TextIO | None = None
+        self.count = 0
+
+    def write(self, errors: Iterable[TranspileError]) -> None:
+        for error in errors:
+            if self._file is None:
+                # line buffered: every error reaches the file as soon as it is written
+                self._file = self.path.open("a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(error.as_dict()) + "\n")
+            self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Self":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_error_log(path: Path) -> Iterator[TranspileError]:
+    """Reads the errors back from an error log, skipping the lines that cannot be parsed, e.g. cut by a crash."""
+    with path.open("r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield TranspileError.from_dict(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable line {line_number} of error log {path}: {e}")
@@ -1,5 +1,12 @@
 import logging
 import os
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
 from pathlib import Path
 
 from databricks.labs.remorph.__about__ import __version__
@@ -9,97 +16,372 @@ from databricks.labs.remorph.config import (
     ValidationResult,
 )
 from databricks.labs.remorph.helpers import db_sql
-from databricks.labs.remorph.helpers.execution_time import timeit
 from databricks.labs.remorph.helpers.file_utils import (
     dir_walk,
     is_sql_file,
     make_dir,
 )
-from databricks.labs.remorph.reconcile.exception import InvalidInputException
+from databricks.labs.remorph.helpers.futures import completed, then
+from databricks.labs.remorph.transpiler.error_log import ErrorLog
+from databricks.labs.remorph.transpiler.statement_splitter import split_statements
+from databricks.labs.remorph.transpiler.transpile_cache import TranspileCache
 from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
 from databricks.labs.remorph.transpiler.transpile_status import (
+    ResourceLimitError,
     TranspileStatus,
     ValidationError,
     TranspileError,
-    ParserError,
 )
 from databricks.labs.remorph.helpers.string_utils import remove_bom
-from databricks.labs.remorph.helpers.validation import Validator
+from databricks.labs.remorph.helpers.tracing import (
+    SpanEvent,
+    Tracer,
+    disable_tracing,
+    enable_tracing,
+    get_tracer,
+    span,
+    traced,
+)
+from databricks.labs.remorph.helpers.validation import LocalValidator, Validator
+from databricks.labs.remorph.helpers.validation_cache import ValidationCache
 from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
 from databricks.sdk import WorkspaceClient
 
-# pylint: disable=unspecified-encoding
-
 logger = logging.getLogger(__name__)
 
 
-def _process_file(
-    config: TranspileConfig,
-    validator: Validator | None,
-    transpiler: TranspileEngine,
-    input_file: Path,
-    output_file: Path,
-) -> tuple[int, list[TranspileError]]:
-    logger.info(f"started processing for the file ${input_file}")
-    error_list: list[TranspileError] = []
-
-    with input_file.open("r") as f:
-        source_sql = remove_bom(f.read())
+def _read_source(input_file: Path) -> str:
+    with span("read"), input_file.open("r") as f:
+        return remove_bom(f.read())
 
-    transpile_result = _transpile(
-        transpiler, config.source_dialect or "", config.target_dialect, source_sql, input_file
-    )
-    error_list.extend(transpile_result.error_list)
 
-    with output_file.open("w") as w:
-        if validator:
-            validation_result = _validation(validator, config, transpile_result.transpiled_code)
+def _write_output(
+    input_file: Path,
+    output_file: Path,
+    transpile_result: TranspileResult,
+    validation_result: ValidationResult | None,
+) -> list[TranspileError]:
+    error_list: list[TranspileError] = list(transpile_result.error_list)
+    with span("write"), output_file.open("w") as w:
+        if validation_result:
             w.write(validation_result.validated_sql)
             if validation_result.exception_msg is not None:
                 error_list.append(ValidationError(input_file, validation_result.exception_msg))
         else:
             w.write(transpile_result.transpiled_code)
             w.write("\n;\n")
+    return error_list
+
 
-    return transpile_result.success_count, error_list
+@dataclass
+class _TranspiledFile:
+    transpile_result: TranspileResult
+    cache_key: str | None = None
+    cache_hit: bool = False
+    # spans recorded by a pool worker, handed back to the tracer of the main process
+    spans: list[SpanEvent] = field(default_factory=list)
 
 
-def _process_directory(
+def _submit_file(
+    transpiler: TranspileEngine,
     config: TranspileConfig,
-    validator: Validator | None,
+    cache: TranspileCache | None,
+    input_file: Path,
+) -> Future[_TranspiledFile]:
+    logger.info(f"started processing for the file ${input_file}")
+    with span("file", path=str(input_file)):
+        source_dialect = config.source_dialect or ""
+        source_sql = _read_source(input_file)
+        if cache is None:
+            submitted = transpiler.submit(source_dialect, config.target_dialect, source_sql, input_file)
+            return then(submitted, _TranspiledFile)
+        with span("cache_lookup"):
+            cache_key = cache.key(source_dialect, config.target_dialect, source_sql, input_file)
+            cached_result = cache.get(cache_key)
+        if cached_result is not None:
+            return completed(_TranspiledFile(cached_result, cache_key, cache_hit=True))
+        submitted = transpiler.submit(source_dialect, config.target_dialect, source_sql, input_file)
+        return then(submitted, lambda transpile_result: _TranspiledFile(transpile_result, cache_key))
+
+
+def _file_result(cache: TranspileCache | None, submitted: Future[_TranspiledFile]) -> _TranspiledFile:
+    """
+    Waits for a file submitted by `_submit_file` and caches its result, on the calling thread rather than on the one
+    completing the future, e.g. the reader of a language server.
+    """
+    transpiled = submitted.result()
+    if cache is None or transpiled.cache_key is None or transpiled.cache_hit:
+        return transpiled
+    # running over a budget depends on the machine and its load, the file is transpiled again next time
+    if not any(isinstance(error, ResourceLimitError) for error in transpiled.transpile_result.error_list):
+        cache.put(transpiled.cache_key, transpiled.transpile_result)
+    return transpiled
+
+
+def _transpile_file(
+    transpiler: TranspileEngine,
+    config: TranspileConfig,
+    cache: TranspileCache | None,
+    input_file: Path,
+) -> _TranspiledFile:
+    return _file_result(cache, _submit_file(transpiler, config, cache, input_file))
+
+
+def _submit_files(
     transpiler: TranspileEngine,
+    config: TranspileConfig,
+    cache: TranspileCache | None,
+    input_files: list[Path],
+) -> Iterator[_TranspiledFile]:
+    """
+    Yields the transpile result of each input file, in order, keeping up to `transpiler.max_in_flight` files
+    submitted to the engine ahead of the one being yielded.
+    """
+    in_flight: deque[Future[_TranspiledFile]] = deque()
+    for input_file in input_files:
+        if len(in_flight) >= transpiler.max_in_flight:
+            yield _file_result(cache, in_flight.popleft())
+        in_flight.append(_submit_file(transpiler, config, cache, input_file))
+    while in_flight:
+        yield _file_result(cache, in_flight.popleft())
+
+
+def _has_memory_budget(config: TranspileConfig) -> bool:
+    """
+    Tells whether `config` sets a memory budget. The memory of a process counts all its threads, e.g. the ones
+    validating, so a memory budget is enforced in pool workers, even with a single worker.
+    """
+    return config.budget is not None and config.budget.statement_memory_mb is not None
+
+
+# Each pool worker holds its own engine and cache, handed over once by the pool initializer
+_worker_transpiler: TranspileEngine | None = None
+_worker_cache: TranspileCache | None = None
+
+
+def _init_worker(transpiler: TranspileEngine, cache: TranspileCache | None, tracing: bool) -> None:
+    global _worker_transpiler, _worker_cache  # pylint: disable=global-statement
+    _worker_transpiler = transpiler
+    _worker_cache = cache
+    if tracing:
+        enable_tracing()
+    else:
+        # a forked worker inherits the tracer of the main process
+        disable_tracing()
+
+
+def _transpile_in_worker(config: TranspileConfig, input_file: Path) -> _TranspiledFile:
+    if _worker_transpiler is None:
+        raise RuntimeError("Transpile worker was not initialized.")
+    transpiled = _transpile_file(_worker_transpiler, config, _worker_cache, input_file)
+    tracer = get_tracer()
+    if tracer is not None:
+        transpiled.spans = tracer.drain()
+    return transpiled
+
+
+def _transpile_files(
+    config: TranspileConfig,
+    transpiler: TranspileEngine,
+    cache: TranspileCache | None,
+    input_files: list[Path],
+) -> Iterator[_TranspiledFile]:
+    """
+    Yields the transpile result of each input file, in the order of `input_files`.
+    With more than one worker, or a memory budget, the files are fanned out across a process pool.
+    """
+    if not input_files or (not _has_memory_budget(config) and (config.workers <= 1 or len(input_files) <= 1)):
+        yield from _submit_files(transpiler, config, cache, input_files)
+        return
+    workers = max(1, min(config.workers, len(input_files)))
+    chunk_size = max(1, len(input_files) // (workers * 4))
+    tracer = get_tracer()
+    initargs = (transpiler, cache, tracer is not None)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        for transpiled in executor.map(partial(_transpile_in_worker, config), input_files, chunksize=chunk_size):
+            if tracer is not None:
+                tracer.extend(transpiled.spans)
+                transpiled.spans = []
+            yield transpiled
+
+
+def _validate_files(
+    config: TranspileConfig,
+    validator: Validator | None,
+    transpiled_files: Iterable[_TranspiledFile],
+) -> Iterator[tuple[_TranspiledFile, ValidationResult | None]]:
+    """
+    Yields each transpiled file with its validation result, in the order of `transpiled_files`.
+    Up to `config.validation_concurrency` validation queries are in flight at once, the next file is only
+    pulled from `transpiled_files` once the oldest query in flight has completed.
+    """
+    if validator is None:
+        for transpiled in transpiled_files:
+            yield transpiled, None
+        return
+    if config.validation_concurrency <= 1:
+        for transpiled in transpiled_files:
+            yield transpiled, _validation(validator, config, transpiled.transpile_result.transpiled_code)
+        return
+    in_flight: deque[tuple[_TranspiledFile, Future[ValidationResult]]] = deque()
+    with ThreadPoolExecutor(max_workers=config.validation_concurrency, thread_name_prefix="validation") as executor:
+        for transpiled in transpiled_files:
+            if len(in_flight) >= config.validation_concurrency:
+                done, future = in_flight.popleft()
+                yield done, future.result()
+            sql = transpiled.transpile_result.transpiled_code
+            in_flight.append((transpiled, executor.submit(_validation, validator, config, sql)))
+        while in_flight:
+            done, future = in_flight.popleft()
+            yield done, future.result()
+
+
+def _collect_directory(
+    config: TranspileConfig,
     root: Path,
     base_root: Path,
     files: list[Path],
-):
+) -> list[tuple[Path, Path]]:
     output_folder = config.output_folder
     output_folder_base = root / ("transpiled" if output_folder is None else base_root)
     make_dir(output_folder_base)
 
-    parse_error_list: list[ParserError] = []
-    validate_error_list: list[ValidationError] = []
-    counter = 0
-
+    tasks: list[tuple[Path, Path]] = []
     for file in files:
         logger.info(f"Processing file :{file}")
         if not is_sql_file(file):
             continue
+        tasks.append((file, output_folder_base / file.name))
+    return tasks
 
-        output_file_name = output_folder_base / file.name
-        success_count, error_list = _process_file(config, validator, transpiler, file, output_file_name)
-        counter = counter + success_count
-        parse_error_list.extend([error for error in error_list if isinstance(error, ParserError)])
-        validate_error_list.extend([error for error in error_list if isinstance(error, ValidationError)])
 
-    return counter, parse_error_list, validate_error_list
+def _is_streamed(config: TranspileConfig, input_file: Path) -> bool:
+    if config.streaming_threshold_mb is None:
+        return False
+    return input_file.stat().st_size >= config.streaming_threshold_mb * 1024 * 1024
 
 
-def _process_input_dir(config: TranspileConfig, validator: Validator | None, transpiler: TranspileEngine):
-    parse_error_list = []
-    validate_error_list = []
+def _stream_file(
+    config: TranspileConfig,
+    validator: Validator | None,
+    transpiler: TranspileEngine,
+    input_file: Path,
+    output_file: Path,
+) -> TranspileResult:
+    """
+    Transpiles, validates and writes the statements of `input_file` one at a time, so that memory stays bounded
+    by the largest statement instead of the file size. The returned result holds no transpiled code.
+    """
+    logger.info(f"started streaming the file ${input_file}")
+    source_dialect = config.source_dialect or ""
+    success_count = 0
+    statements_collapsed = 0
+    error_list: list[TranspileError] = []
+    with span("stream_file", path=str(input_file)), input_file.open("r") as reader, output_file.open("w") as w:
+        statements = (
+            remove_bom(statement) if index == 0 else statement
+            for index, statement in enumerate(split_statements(reader, DIALECTS.get(source_dialect)))
+        )
+        transpiled_statements = (
+            _TranspiledFile(_transpile(transpiler, source_dialect, config.target_dialect, statement, input_file))
+            for statement in statements
+        )
+        separator = ""
+        for transpiled, validation_result in _validate_files(config, validator, transpiled_statements):
+            success_count += transpiled.transpile_result.success_count
+            statements_collapsed += transpiled.transpile_result.statements_collapsed
+            error_list.extend(transpiled.transpile_result.error_list)
+            if validation_result:
+                w.write(validation_result.validated_sql)
+                if validation_result.exception_msg is not None:
+                    error_list.append(ValidationError(input_file, validation_result.exception_msg))
+                continue
+            if transpiled.transpile_result.transpiled_code:
+                w.write(separator)
+                w.write(transpiled.transpile_result.transpiled_code)
+                separator = "\n"
+        if validator is None:
+            w.write("\n;\n")
+    return TranspileResult("", success_count, error_list, statements_collapsed)
+
+
+def _process_files(
+    config: TranspileConfig,
+    validator: Validator | None,
+    transpiler: TranspileEngine,
+    cache: TranspileCache | None,
+    tasks: list[tuple[Path, Path]],
+) -> Iterator[tuple[Path, _TranspiledFile, list[TranspileError]]]:
+    """
+    Transpiles, validates and writes each input file, yielding its outcome and the errors found.
+    Files above the streaming threshold are processed last, one statement at a time.
+    """
+    streamed = {input_file for input_file, _ in tasks if _is_streamed(config, input_file)}
+    batched_tasks = [task for task in tasks if task[0] not in streamed]
+    validated_files = _validate_files(
+        config, validator, _transpile_files(config, transpiler, cache, [input_file for input_file, _ in batched_tasks])
+    )
+    for (input_file, output_file), (transpiled, validation_result) in zip(batched_tasks, validated_files):
+        error_list = _write_output(input_file, output_file, transpiled.transpile_result, validation_result)
+        yield input_file, transpiled, error_list
+    for input_file, output_file in tasks:
+        if input_file in streamed:
+            transpile_result = _stream_file(config, validator, transpiler, input_file, output_file)
+            yield input_file, _TranspiledFile(transpile_result), transpile_result.error_list
+
+
+def _process_tasks(
+    config: TranspileConfig,
+    validator: Validator | None,
+    transpiler: TranspileEngine,
+    tasks: list[tuple[Path, Path]],
+    error_log: ErrorLog,
+    files_processed: int,
+) -> TranspileStatus:
+    """
+    Processes the tasks, writing the errors of each file to `error_log` as soon as the file is done.
+    """
+    status = TranspileStatus(files_processed, 0, 0, 0)
+    cache = None
+    if config.cache_folder:
+        transpiler_id = TranspileCache.transpiler_id(transpiler, config.transpiler_config_path)
+        cache = TranspileCache(Path(config.cache_folder), transpiler_id)
+    cache_keys: dict[Path, str] = {}
+
+    start_time = time.perf_counter()
+    for input_file, transpiled, file_errors in _process_files(config, validator, transpiler, cache, tasks):
+        status.no_of_transpiled_queries += transpiled.transpile_result.success_count
+        status.statements_collapsed += transpiled.transpile_result.statements_collapsed
+        status.add_errors(file_errors)
+        error_log.write(file_errors)
+        if transpiled.cache_key is not None:
+            cache_keys[input_file] = transpiled.cache_key
+            status.cache_hits += transpiled.cache_hit
+    elapsed = time.perf_counter() - start_time
+    if tasks and elapsed > 0:
+        logger.info(
+            f"Processed {len(tasks)} files in {elapsed:.2f} seconds "
+            f"({len(tasks) / elapsed:.1f} files/s, workers: {max(config.workers, 1)})"
+        )
+    if status.statements_collapsed:
+        logger.info(
+            f"Statements transpiled from a template of statements with other literals: {status.statements_collapsed}"
+        )
+    if status.resource_limit_error_count:
+        logger.warning(f"Statements or files over their time or memory budget: {status.resource_limit_error_count}")
+    if cache is not None:
+        status.cache_misses = len(cache_keys) - status.cache_hits
+        logger.info(f"Transpile cache hits: {status.cache_hits}, misses: {status.cache_misses}")
+        cache.evict_stale(config.input_path, cache_keys)
+    return status
+
 
-    file_list = []
-    counter = 0
+def _process_input_dir(
+    config: TranspileConfig, validator: Validator | None, transpiler: TranspileEngine, error_log: ErrorLog
+) -> TranspileStatus:
+    files_processed = 0
+    tasks: list[tuple[Path, Path]] = []
     input_source = str(config.input_source)
     input_path = Path(input_source)
     for root, _, files in dir_walk(input_path):
@@ -107,27 +389,20 @@ def _process_input_dir(config: TranspileConfig, validator: Validator | None, tra
         folder = str(input_path.resolve().joinpath(base_root))
         msg = f"Processing for sqls under this folder: {folder}"
         logger.info(msg)
-        file_list.extend(files)
-        no_of_sqls, parse_error, validation_error = _process_directory(
-            config, validator, transpiler, root, base_root, files
-        )
-        counter = counter + no_of_sqls
-        parse_error_list.extend(parse_error)
-        validate_error_list.extend(validation_error)
-
-    error_log = parse_error_list + validate_error_list
+        files_processed += len(files)
+        tasks.extend(_collect_directory(config, root, base_root, files))
 
-    return TranspileStatus(file_list, counter, len(parse_error_list), len(validate_error_list), error_log)
+    return _process_tasks(config, validator, transpiler, tasks, error_log, files_processed)
 
 
 def _process_input_file(
-    config: TranspileConfig, validator: Validator | None, transpiler: TranspileEngine
+    config: TranspileConfig, validator: Validator | None, transpiler: TranspileEngine, error_log: ErrorLog
 ) -> TranspileStatus:
     if not is_sql_file(config.input_path):
         msg = f"{config.input_source} is not a SQL file."
         logger.warning(msg)
         # silently ignore non-sql files
-        return TranspileStatus([], 0, 0, 0, [])
+        return TranspileStatus(0, 0, 0, 0)
     msg = f"Processing sql from this file: {config.input_source}"
     logger.info(msg)
     if config.output_path is None:
@@ -137,13 +412,10 @@ def _process_input_file(
 
     make_dir(output_path)
     output_file = output_path / config.input_path.name
-    no_of_sqls, error_list = _process_file(config, validator, transpiler, config.input_path, output_file)
-    parser_errors = [error for error in error_list if isinstance(error, ParserError)]
-    validation_errors = [error for error in error_list if isinstance(error, ValidationError)]
-    return TranspileStatus([config.input_path], no_of_sqls, len(parser_errors), len(validation_errors), error_list)
+    return _process_tasks(config, validator, transpiler, [(config.input_path, output_file)], error_log, 1)
 
 
-@timeit
+@traced
 def transpile(workspace_client: WorkspaceClient, engine: TranspileEngine, config: TranspileConfig):
     """
     [Experimental] Transpiles the SQL queries from one dialect to another.
@@ -156,42 +428,67 @@ def transpile(workspace_client: WorkspaceClient, engine: TranspileEngine, config
         logger.error("Input SQL path is not provided.")
         raise ValueError("Input SQL path is not provided.")
 
+    tracer = enable_tracing() if config.trace_file else None
+    try:
+        with span("run", input_source=config.input_source):
+            return _transpile_run(workspace_client, engine, config)
+    finally:
+        if tracer is not None:
+            disable_tracing()
+            _export_trace(tracer, Path(str(config.trace_file)))
+
+
+def _export_trace(tracer: Tracer, trace_file: Path) -> None:
+    tracer.write_chrome_trace(trace_file)
+    logger.info(f"Wrote trace of {len(tracer.events)} spans to {trace_file}")
+    logger.info(f"Time spent per phase:\n{tracer.format_summary()}")
+
+
+def _transpile_run(workspace_client: WorkspaceClient, engine: TranspileEngine, config: TranspileConfig):
     status = []
 
     validator = None
     if not config.skip_validation:
         sql_backend = db_sql.get_sql_backend(workspace_client)
         logger.info(f"SQL Backend used for query validation: {type(sql_backend).__name__}")
-        validator = Validator(sql_backend)
+        validation_cache = None
+        if config.cache_folder:
+            validation_cache = ValidationCache(Path(config.cache_folder) / "validation.sqlite")
+        validator = Validator(sql_backend, cache=validation_cache, local_validator=LocalValidator())
     if config.input_source is None:
+        # the reconcile exceptions import pyspark, which transpiling does not need otherwise
+        # pylint: disable-next=import-outside-toplevel
+        from databricks.labs.remorph.reconcile.exception import InvalidInputException
+
         raise InvalidInputException("Missing input source!")
-    if config.input_path.is_dir():
-        result = _process_input_dir(config, validator, engine)
-    elif config.input_path.is_file():
-        result = _process_input_file(config, validator, engine)
-    else:
+    if not config.input_path.is_dir() and not config.input_path.is_file():
         msg = f"{config.input_source} does not exist."
         logger.error(msg)
         raise FileNotFoundError(msg)
+    if isinstance(engine, SqlglotEngine):
+        engine.set_budget(config.budget)
+        engine.set_max_templates(config.statement_templates)
+    with ErrorLog(Path.cwd() / f"err_{os.getpid()}.jsonl") as error_log:
+        if config.input_path.is_dir():
+            result = _process_input_dir(config, validator, engine, error_log)
+        else:
+            result = _process_input_file(config, validator, engine, error_log)
 
-    error_list_count = result.parse_error_count + result.validate_error_count
     if not config.skip_validation:
         logger.info(f"No of Sql Failed while Validating: {result.validate_error_count}")
 
-    error_log_file = "None"
-    if error_list_count > 0:
-        error_log_file = str(Path.cwd().joinpath(f"err_{os.getpid()}.lst"))
-        if result.error_list:
-            with Path(error_log_file).open("a") as e:
-                e.writelines(f"{err!s}\n" for err in result.error_list)
-
+    error_log_file = str(error_log.path) if error_log.count > 0 else "None"
     status.append(
         {
-            "total_files_processed": len(result.file_list),
+            "total_files_processed": result.files_processed,
             "total_queries_processed": result.no_of_transpiled_queries,
             "no_of_sql_failed_while_parsing": result.parse_error_count,
             "no_of_sql_failed_while_validating": result.validate_error_count,
             "error_log_file": str(error_log_file),
+            "cache_hits": result.cache_hits,
+            "cache_misses": result.cache_misses,
+            "statements_collapsed": result.statements_collapsed,
+            "no_of_sql_over_resource_limits": result.resource_limit_error_count,
         }
     )
     return status
@@ -222,10 +519,11 @@ def _validation(
     config: TranspileConfig,
     sql: str,
 ) -> ValidationResult:
-    return validator.validate_format_result(config, sql)
+    with span("validate"):
+        return validator.validate_format_result(config, sql)
 
 
-@timeit
+@traced
 def transpile_sql(
     workspace_client: WorkspaceClient,
     config: TranspileConfig,
@@ -245,19 +543,63 @@ def transpile_sql(
 
     sql_backend = db_sql.get_sql_backend(ws_client)
     logger.info(f"SQL Backend used for query validation: {type(sql_backend).__name__}")
-    validator = Validator(sql_backend)
+    validator = Validator(sql_backend, local_validator=LocalValidator())
     return transpiler_result, _validation(validator, config, transpiler_result.transpiled_code)
 
 
-@timeit
+@traced
 def transpile_column_exp(
     workspace_client: WorkspaceClient,
     config: TranspileConfig,
     expressions: list[str],
 ) -> list[tuple[TranspileResult, ValidationResult | None]]:
     """[Experimental] Transpile a list of SQL expressions from one dialect to another."""
+    verify_workspace_client(workspace_client)
     config.skip_validation = True
-    result = []
-    for sql in expressions:
-        result.append(transpile_sql(workspace_client, config, sql))
-    return result
+    return [(result, None) for result in transpile_expressions(config, expressions)]
+
+
+def _chunks(items: Iterable[str], chunk_size: int) -> Iterator[list[str]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def _transpile_expressions_in_worker(config: TranspileConfig, expressions: list[str]) -> list[TranspileResult]:
+    if not isinstance(_worker_transpiler, SqlglotEngine):
+        raise TypeError("Transpile worker was not initialized.")
+    source_dialect = config.source_dialect or ""
+    results = _worker_transpiler.transpile_many(source_dialect, config.target_dialect, expressions, Path("inline_sql"))
+    return list(results)
+
+
+def transpile_expressions(
+    config: TranspileConfig,
+    expressions: Iterable[str],
+    chunk_size: int = 512,
+) -> Iterator[TranspileResult]:
+    """
+    [Experimental] Transpiles SQL expressions from one dialect to another, yielding the result of each expression
+    in the order of `expressions`, without validating them.
+
+    All expressions share one engine and one instance of each dialect. With more than one worker in
+    `config.workers`, chunks of `chunk_size` expressions are fanned out across a process pool. At most two chunks
+    per worker are in flight, so `expressions` is consumed lazily and memory stays bounded for any number of
+    expressions. Each expression is transpiled within the budget of `config`, as a file of its own, and in a worker
+    process when the budget limits memory.
+    """
+    engine = SqlglotEngine(config.statement_templates, budget=config.budget)
+    if config.workers <= 1 and not _has_memory_budget(config):
+        source_dialect = config.source_dialect or ""
+        yield from engine.transpile_many(source_dialect, config.target_dialect, expressions, Path("inline_sql"))
+        return
+    workers = max(1, config.workers)
+    in_flight: deque[Future[list[TranspileResult]]] = deque()
+    initargs = (engine, None, False)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        for chunk in _chunks(expressions, chunk_size):
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+            in_flight.append(executor.submit(_transpile_expressions_in_worker, config, chunk))
+        while in_flight:
+            yield from in_flight.popleft().result()
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import logging
+import os
+import queue
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pathlib import Path
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+
+class LSPError(Exception):
+    """An error response of the language server to a request."""
+
+    def __init__(self, method: str, error: dict[str, Any]):
+        super().__init__(f"{method} failed with code {error.get('code')}: {error.get('message')}")
+        self.code = error.get("code")
+        self.data = error.get("data")
+
+
+def read_message(stream: IO[bytes]) -> dict[str, Any] | None:
+    """Reads a message framed with the LSP base protocol headers, returns None at the end of the stream."""
+    content_length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        header = line.decode("ascii").strip()
+        if not header:
+            break
+        name, _, value = header.partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+    if content_length is None:
+        raise ValueError("Missing Content-Length header")
+    return json.loads(stream.read(content_length).decode("utf-8"))
+
+
+def write_message(stream: IO[bytes], message: dict[str, Any]) -> None:
+    body = json.dumps(message).encode("utf-8")
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    stream.flush()
+
+
+class LSPConnection:
+    """
+    JSON-RPC connection to a language server subprocess over its standard input and output.
+
+    Requests return a future right away, so any number of them can be in flight on the connection: a reader thread
+    completes the futures as the responses arrive, in whatever order the server sends them. When the server exits,
+    the futures of the requests still in flight fail with a `ConnectionError`.
+
+    Messages are queued for a writer thread rather than written by the caller, so that no thread waits on a pipe
+    while holding the lock: a server blocked on writing a large response must still have its responses read.
+    """
+
+    def __init__(self, process: subprocess.Popen):
+        assert process.stdin is not None and process.stdout is not None
+        self._process = process
+        self._stdin: IO[bytes] = process.stdin
+        self._stdout: IO[bytes] = process.stdout
+        self._ids = itertools.count(1)
+        self._pending: dict[int, tuple[str, Future[Any], float]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        # the messages to write, then None once the connection is killed
+        self._outbox: queue.SimpleQueue[dict[str, Any] | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_messages, name="lsp-writer", daemon=True)
+        self._writer.start()
+        self._reader = threading.Thread(target=self._read_responses, name="lsp-reader", daemon=True)
+        self._reader.start()
+
+    @classmethod
+    def start(cls, command_line: list[str], env_vars: dict[str, str], cwd: Path | None = None) -> LSPConnection:
+        logger.debug(f"Starting language server: {' '.join(command_line)}")
+        process = subprocess.Popen(  # pylint: disable=consider-using-with
+            command_line,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            env=os.environ | env_vars,
+            cwd=cwd,
+        )
+        return cls(process)
+
+    @property
+    def pid(self) -> int:
+        return self._process.pid
+
+    @property
+    def is_alive(self) -> bool:
+        return not self._closed and self._process.poll() is None
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests waiting for a response."""
+        with self._lock:
+            return len(self._pending)
+
+    def oldest_request_age(self) -> float | None:
+        """Seconds since the oldest request waiting for a response was sent, None when none is waiting."""
+        with self._lock:
+            # requests are pending in the order they were sent
+            oldest = next(iter(self._pending.values()), None)
+        return None if oldest is None else time.monotonic() - oldest[2]
+
+    def request(self, method: str, params: dict[str, Any] | None = None) -> Future[Any]:
+        future: Future[Any] = Future()
+        with self._lock:
+            if self._closed:
+                raise ConnectionError(f"Connection to language server {self._process.pid} is closed")
+            request_id = next(self._ids)
+            self._pending[request_id] = (method, future, time.monotonic())
+            # queued under the lock, so that requests are sent in the order they are pending
+            self._outbox.put({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params or {}})
+        return future
+
+    def notify(self, method: str, params: dict[str, Any] | None = None) -> None:
+        with self._lock:
+            if self._closed:
+                raise ConnectionError(f"Connection to language server {self._process.pid} is closed")
+            self._outbox.put({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Asks the server to shut down and exit, and kills it if it does not within `timeout` seconds."""
+        if self.is_alive:
+            try:
+                self.request("shutdown").result(timeout=timeout)
+                self.notify("exit")
+            # futures time out with a TimeoutError, which is not an OSError before Python 3.11
+            except (LSPError, FutureTimeoutError, OSError) as e:  # pylint: disable=overlapping-except
+                logger.debug(f"Language server {self._process.pid} did not shut down cleanly: {e}")
+        self.kill(timeout)
+
+    def kill(self, timeout: float = 5.0) -> None:
+        with self._lock:
+            self._closed = True
+        # the writer closes the standard input of the server once the messages queued before are written
+        self._outbox.put(None)
+        try:
+            self._process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._writer.join(timeout=timeout)
+        self._reader.join(timeout=timeout)
+        self._fail_pending()
+
+    def _write_messages(self) -> None:
+        try:
+            while (message := self._outbox.get()) is not None:
+                write_message(self._stdin, message)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Language server {self._process.pid} is not reachable: {e}")
+            self._fail_pending()
+        finally:
+            with contextlib.suppress(OSError):
+                self._stdin.close()
+
+    def _read_responses(self) -> None:
+        try:
+            while (message := read_message(self._stdout)) is not None:
+                self._dispatch(message)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable message from language server {self._process.pid}: {e}")
+        self._fail_pending()
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        if "method" in message:
+            if "id" in message:
+                # requests of the server, e.g. client/registerCapability, are acknowledged without being acted upon
+                self._outbox.put({"jsonrpc": "2.0", "id": message["id"], "result": None})
+            else:
+                logger.debug(f"Notification from language server {self._process.pid}: {message['method']}")
+            return
+        with self._lock:
+            pending = self._pending.pop(message["id"], None) if "id" in message else None
+        if pending is None:
+            logger.warning(f"Unexpected response from language server {self._process.pid}: {message}")
+            return
+        method, future, _ = pending
+        if "error" in message:
+            future.set_exception(LSPError(method, message["error"]))
+        else:
+            future.set_result(message.get("result"))
+
+    def _fail_pending(self) -> None:
+        with self._lock:
+            self._closed = True
+            pending, self._pending = self._pending, {}
+        for method, future, _ in pending.values():
+            exit_code = self._process.poll()
+            future.set_exception(
+                ConnectionError(f"Language server {self._process.pid} exited (code {exit_code}) during {method}")
+            )
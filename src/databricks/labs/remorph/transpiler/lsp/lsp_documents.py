@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import bisect
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from databricks.labs.remorph.transpiler.lsp.lsp_connection import LSPConnection
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.statement_splitter import split_statements
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+# texts are compared a block at a time before looking for the first different character
+_COMPARED_BLOCK = 4096
+
+
+class LineIndex:
+    """Converts between offsets in a text and LSP positions, counting characters as negotiated with utf-32."""
+
+    def __init__(self, text: str):
+        self._length = len(text)
+        self._line_starts = [0, *(match.end() for match in _LINE_BREAK.finditer(text))]
+
+    def offset(self, position: dict[str, int]) -> int:
+        line = position["line"]
+        if line >= len(self._line_starts):
+            return self._length
+        return min(self._line_starts[line] + position["character"], self._length)
+
+    def position(self, offset: int) -> dict[str, int]:
+        line = bisect.bisect_right(self._line_starts, offset) - 1
+        return {"line": line, "character": offset - self._line_starts[line]}
+
+    def range(self, start: int, end: int) -> dict[str, dict[str, int]]:
+        return {"start": self.position(start), "end": self.position(end)}
+
+
+def apply_text_edits(text: str, edits: list[dict[str, Any]]) -> str:
+    """Applies LSP text edits to `text`."""
+    index = LineIndex(text)
+    spans = [
+        (index.offset(edit["range"]["start"]), index.offset(edit["range"]["end"]), edit["newText"]) for edit in edits
+    ]
+    return apply_spans(text, spans)
+
+
+def apply_spans(text: str, spans: list[tuple[int, int, str]]) -> str:
+    # from the last edit to the first one, so that the offsets of the edits still to apply remain valid
+    for start, end, new_text in sorted(spans, key=lambda span: span[0], reverse=True):
+        text = text[:start] + new_text + text[end:]
+    return text
+
+
+def _common_prefix_length(left: str, right: str) -> int:
+    length = min(len(left), len(right))
+    start = 0
+    while start < length and left[start : start + _COMPARED_BLOCK] == right[start : start + _COMPARED_BLOCK]:
+        start += _COMPARED_BLOCK
+    start = min(start, length)
+    while start < length and left[start] == right[start]:
+        start += 1
+    return start
+
+
+def text_change(old_text: str, new_text: str) -> dict[str, Any] | None:
+    """
+    Returns the incremental `TextDocumentContentChangeEvent` turning `old_text` into `new_text`: the range between
+    their common prefix and suffix in `old_text`, and the text replacing it. Returns None when the texts are equal.
+    """
+    if old_text == new_text:
+        return None
+    prefix = _common_prefix_length(old_text, new_text)
+    # the suffix may not overlap the prefix in either text
+    suffix_limit = min(len(old_text), len(new_text)) - prefix
+    suffix = min(_common_prefix_length(old_text[::-1], new_text[::-1]), suffix_limit)
+    old_end = len(old_text) - suffix
+    return {"range": LineIndex(old_text).range(prefix, old_end), "text": new_text[prefix : len(new_text) - suffix]}
+
+
+def statement_spans(text: str, language_id: str) -> list[tuple[int, int]]:
+    """Returns the start and end offsets of the statements of `text`, as split for the dialect of the document."""
+    spans = []
+    start = 0
+    for statement in split_statements(io.StringIO(text), DIALECTS.get(language_id)):
+        spans.append((start, start + len(statement)))
+        start += len(statement)
+    return spans
+
+
+@dataclass
+class StatementResult:
+    transpiled_code: str
+    # error diagnostics, as their offset in the statement and their message
+    errors: list[tuple[int, str]] = field(default_factory=list)
+
+
+@dataclass
+class OpenDocument:
+    """
+    A document the engine keeps open on a language server, with the transpile results of its statements as of the
+    last version, keyed by their text, so that the statements left unchanged by an edit are not transpiled again.
+    """
+
+    connection: LSPConnection
+    language_id: str
+    text: str
+    version: int = 1
+    statements: dict[str, StatementResult] = field(default_factory=dict)
+
+
+def split_result(
+    text: str, spans: list[tuple[int, int]], edits: list[tuple[int, int, str]], errors: list[tuple[int, str]]
+) -> dict[str, StatementResult]:
+    """
+    Splits the edits and error diagnostics of a whole document into the results of its statements. Statements
+    touched by an edit spanning several statements are left out, there is no telling what belongs to them.
+    """
+    if not spans:
+        return {}
+    starts = [start for start, _ in spans]
+    edits_by_statement: dict[int, list[tuple[int, int, str]]] = {}
+    shared: set[int] = set()
+    for start, end, new_text in edits:
+        first = _statement_at(starts, start)
+        last = _statement_at(starts, max(start, end - 1))
+        if first != last or end > spans[last][1]:
+            shared.update(range(first, last + 1))
+            continue
+        edits_by_statement.setdefault(first, []).append((start - starts[first], end - starts[first], new_text))
+    errors_by_statement: dict[int, list[tuple[int, str]]] = {}
+    for offset, message in errors:
+        number = _statement_at(starts, offset)
+        errors_by_statement.setdefault(number, []).append((offset - starts[number], message))
+    results: dict[str, StatementResult] = {}
+    for number, (start, end) in enumerate(spans):
+        if number not in shared:
+            transpiled = apply_spans(text[start:end], edits_by_statement.get(number, []))
+            results[text[start:end]] = StatementResult(transpiled, errors_by_statement.get(number, []))
+    return results
+
+
+def _statement_at(starts: list[int], offset: int) -> int:
+    return max(0, bisect.bisect_right(starts, offset) - 1)
@@ -1,14 +1,42 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import atexit
+import contextlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from databricks.labs.remorph.__about__ import __version__
 from databricks.labs.remorph.config import TranspileResult
+from databricks.labs.remorph.helpers.futures import completed, gather, then
+from databricks.labs.remorph.transpiler.lsp.lsp_connection import LSPConnection, LSPError
+from databricks.labs.remorph.transpiler.lsp.lsp_documents import (
+    LineIndex,
+    OpenDocument,
+    StatementResult,
+    apply_spans,
+    split_result,
+    statement_spans,
+    text_change,
+)
 from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
+from databricks.labs.remorph.transpiler.transpile_status import ParserError, TranspileError
+
+logger = logging.getLogger(__name__)
+
+TRANSPILE_METHOD = "document/transpileToDatabricks"
+TABLE_LINEAGE_METHOD = "document/tableLineage"
+# experimental server capability: transpile requests restricted to their `range` parameter
+TRANSPILE_RANGE_CAPABILITY = "transpileRange"
+_ERROR_SEVERITY = 1
 
 
 @dataclass
@@ -16,6 +44,9 @@ class _LSPRemorphConfigV1:
     dialects: list[str]
     env_vars: dict[str, str]
     command_line: list[str]
+    # number of servers started at most, and seconds after which a server that did not respond is deemed hung
+    pool_size: int = 1
+    request_timeout: float = 300.0
 
     @classmethod
     def parse(cls, data: dict[str, Any]) -> _LSPRemorphConfigV1:
@@ -32,15 +63,81 @@ class _LSPRemorphConfigV1:
         command_line = data.get("command_line", [])
         if len(command_line) == 0:
             raise ValueError("Missing command_line entry")
-        return _LSPRemorphConfigV1(dialects, env_vars, command_line)
+        pool_size = data.get("pool_size", 1)
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError(f"Invalid pool_size entry: {pool_size}")
+        request_timeout = data.get("request_timeout", 300.0)
+        if not isinstance(request_timeout, (int, float)) or request_timeout <= 0:
+            raise ValueError(f"Invalid request_timeout entry: {request_timeout}")
+        return _LSPRemorphConfigV1(dialects, env_vars, command_line, pool_size, float(request_timeout))
+
+
+class _LSPServer:
+    """One server process of the pool, started on first use and again once it died."""
+
+    def __init__(self, start: Callable[[], LSPConnection]):
+        self._start = start
+        self._lock = threading.Lock()
+        self._connection: LSPConnection | None = None
+
+    @property
+    def in_flight(self) -> int:
+        connection = self._connection
+        return connection.in_flight if connection is not None and connection.is_alive else 0
+
+    def connect(self) -> LSPConnection:
+        with self._lock:
+            if self._connection is not None and self._connection.is_alive:
+                return self._connection
+            if self._connection is not None:
+                logger.warning(f"Language server {self._connection.pid} exited, starting it again")
+                self._connection.kill()
+            self._connection = self._start()
+            return self._connection
+
+    def kill_if_hung(self, timeout_seconds: float) -> None:
+        """Kills the server when a request has been waiting longer than `timeout_seconds`, failing its requests."""
+        connection = self._connection
+        if connection is None or not connection.is_alive:
+            return
+        age = connection.oldest_request_age()
+        if age is not None and age > timeout_seconds:
+            logger.warning(f"Language server {connection.pid} did not respond for {age:.0f} seconds, killing it")
+            connection.kill(timeout=0)
+
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
 
 
 class LSPEngine(TranspileEngine):
+    """
+    Transpiles through external language servers, launched from the `command_line` of the transpiler config
+    on first use and kept running until `close` is called or the process exits, so that their startup is paid once.
+
+    Each source is opened as a text document and transpiled with a `document/transpileToDatabricks` request. The
+    document is kept open: when the same file is transpiled again, only the change since its last version is sent
+    with `textDocument/didChange`, and only the statements that changed are transpiled again, each one with a
+    request restricted to its `range` when the server advertises the experimental `transpileRange` capability, or
+    else with a single request for the whole document. The results of the other statements are reused, which
+    assumes that the server transpiles statements independently of each other.
+
+    Up to `pool_size` servers are started as the load requires, each source going to the server with the fewest
+    requests in flight. A server that exits, or does not respond within `request_timeout` seconds, is killed and
+    started again on demand; the sources it held are sent again to the least busy server.
+    """
+
+    _MAX_IN_FLIGHT = 16
+    _MAX_ATTEMPTS = 3
+    _MAX_OPEN_DOCUMENTS = 64
 
     @classmethod
     def from_config_path(cls, config_path: Path) -> LSPEngine:
         config, custom = cls._load_config(config_path)
-        return LSPEngine(config, custom)
+        # the command line of the server is relative to its config
+        return LSPEngine(config, custom, workdir=config_path.parent)
 
     @classmethod
     def _load_config(cls, config_path: Path) -> tuple[_LSPRemorphConfigV1, dict[str, Any]]:
@@ -54,18 +151,294 @@ class LSPEngine(TranspileEngine):
         config = _LSPRemorphConfigV1.parse(remorph)
         return config, data.get("custom", {})
 
-    def __init__(self, config: _LSPRemorphConfigV1, custom: dict[str, Any]):
+    def __init__(self, config: _LSPRemorphConfigV1, custom: dict[str, Any], workdir: Path | None = None):
         self.config = config
         self.custom = custom
+        self._workdir = workdir
+        self.server_info: dict[str, Any] = {}
+        self._init_servers()
+
+    def _init_servers(self) -> None:
+        self._servers = [_LSPServer(self._start_server) for _ in range(self.config.pool_size)]
+        # sources of a failed server are sent again from this thread, not from the one noticing the failure
+        self._retries = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lsp-retry")
+        self._watchdog: threading.Thread | None = None
+        self._closed = threading.Event()
+        self._watchdog_lock = threading.Lock()
+        self._close_at_exit = False
+        self._documents: OrderedDict[str, OpenDocument] = OrderedDict()
+        self._documents_lock = threading.Lock()
+        self._transpiles_ranges = False
+
+    def __getstate__(self) -> dict[str, Any]:
+        # pool workers get the config only, each one starts its own servers
+        return {"config": self.config, "custom": self.custom, "_workdir": self._workdir, "server_info": {}}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_servers()
 
     @property
     def supported_dialects(self) -> list[str]:
         return self.config.dialects
 
+    @property
+    def max_in_flight(self) -> int:
+        return self._MAX_IN_FLIGHT * self.config.pool_size
+
     def transpile(self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path) -> TranspileResult:
-        raise NotImplementedError
+        # hung servers are killed by the watchdog, so the result always comes
+        return self.submit(source_dialect, target_dialect, source_code, file_path).result()
+
+    def submit(
+        self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path
+    ) -> Future[TranspileResult]:
+        result: Future[TranspileResult] = Future()
+        self._submit(result, source_dialect, source_code, file_path, 1)
+        return result
+
+    def _submit(
+        self, result: Future[TranspileResult], source_dialect: str, source_code: str, file_path: Path, attempt: int
+    ) -> None:
+        uri = file_path.absolute().as_uri()
+        try:
+            document = self._sync_document(uri, source_dialect, source_code)
+            spans = statement_spans(source_code, source_dialect)
+            known = {
+                source_code[start:end]: document.statements[source_code[start:end]]
+                for start, end in spans
+                if source_code[start:end] in document.statements
+            }
+            changed = [(start, end) for start, end in spans if source_code[start:end] not in known]
+            if not changed:
+                response = completed(self._assemble(source_code, spans, known, file_path))
+            elif self._transpiles_ranges and len(changed) * 2 <= len(spans):
+                response = self._transpile_statements(document, uri, source_code, spans, changed, known, file_path)
+            else:
+                response = self._transpile_document(document, uri, source_code, spans, file_path)
+        except ConnectionError as e:
+            self._retry(result, e, source_dialect, source_code, file_path, attempt)
+            return
+
+        def _done(done: Future[TranspileResult]) -> None:
+            try:
+                result.set_result(done.result())
+            except LSPError as e:
+                result.set_result(TranspileResult("", 0, [ParserError(file_path, str(e))]))
+            except ConnectionError as e:
+                self._retries.submit(self._retry, result, e, source_dialect, source_code, file_path, attempt)
+            except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+                result.set_exception(e)
+
+        response.add_done_callback(_done)
+
+    def _transpile_document(
+        self, document: OpenDocument, uri: str, text: str, spans: list[tuple[int, int]], file_path: Path
+    ) -> Future[TranspileResult]:
+        response = document.connection.request(TRANSPILE_METHOD, {"uri": uri, "languageId": document.language_id})
+
+        def _result(result: dict[str, Any]) -> TranspileResult:
+            index = LineIndex(text)
+            edits, errors = self._offsets(index, result, file_path)
+            self._keep_statements(document, text, split_result(text, spans, edits, errors))
+            return TranspileResult(apply_spans(text, edits), 1, self._errors(index, errors, file_path))
+
+        return then(response, _result)
+
+    def _transpile_statements(
+        self,
+        document: OpenDocument,
+        uri: str,
+        text: str,
+        spans: list[tuple[int, int]],
+        changed: list[tuple[int, int]],
+        known: dict[str, StatementResult],
+        file_path: Path,
+    ) -> Future[TranspileResult]:
+        """Transpiles the statements of the `changed` spans only, each with a request restricted to its range."""
+        index = LineIndex(text)
+        responses = [
+            document.connection.request(
+                TRANSPILE_METHOD, {"uri": uri, "languageId": document.language_id, "range": index.range(start, end)}
+            )
+            for start, end in changed
+        ]
+
+        def _result(results: list[dict[str, Any]]) -> TranspileResult:
+            statements = dict(known)
+            for (start, end), result in zip(changed, results):
+                edits, errors = self._offsets(index, result, file_path)
+                statements[text[start:end]] = StatementResult(
+                    apply_spans(text[start:end], [(first - start, last - start, new) for first, last, new in edits]),
+                    [(offset - start, message) for offset, message in errors],
+                )
+            self._keep_statements(document, text, statements)
+            return self._assemble(text, spans, statements, file_path)
+
+        return then(gather(responses), _result)
+
+    def _keep_statements(self, document: OpenDocument, text: str, statements: dict[str, StatementResult]) -> None:
+        with self._documents_lock:
+            # unless the document changed meanwhile, these are the statements of its current version
+            if document.text == text:
+                document.statements = statements
+
+    def _assemble(
+        self, text: str, spans: list[tuple[int, int]], statements: dict[str, StatementResult], file_path: Path
+    ) -> TranspileResult:
+        pieces = []
+        errors: list[tuple[int, str]] = []
+        for start, end in spans:
+            statement = statements[text[start:end]]
+            pieces.append(statement.transpiled_code)
+            errors.extend((start + offset, message) for offset, message in statement.errors)
+        # only whitespace follows the last statement
+        pieces.append(text[spans[-1][1] :] if spans else text)
+        return TranspileResult("".join(pieces), 1, self._errors(LineIndex(text), errors, file_path))
+
+    def _retry(
+        self,
+        result: Future[TranspileResult],
+        error: ConnectionError,
+        source_dialect: str,
+        source_code: str,
+        file_path: Path,
+        attempt: int,
+    ) -> None:
+        if attempt >= self._MAX_ATTEMPTS or self._closed.is_set():
+            result.set_exception(error)
+            return
+        logger.warning(f"Transpiling {file_path} again after: {error}")
+        try:
+            self._submit(result, source_dialect, source_code, file_path, attempt + 1)
+        except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+            result.set_exception(e)
 
     def analyse_table_lineage(
         self, source_dialect: str, source_code: str, file_path: Path
     ) -> Iterable[tuple[str, str]]:
-        raise NotImplementedError
+        uri = file_path.absolute().as_uri()
+        document = self._sync_document(uri, source_dialect, source_code)
+        response = document.connection.request(TABLE_LINEAGE_METHOD, {"uri": uri, "languageId": source_dialect})
+        for edge in response.result(timeout=self.config.request_timeout) or []:
+            yield edge["source"], edge["target"]
+
+    def _sync_document(self, uri: str, language_id: str, text: str) -> OpenDocument:
+        """
+        Opens the document on the least busy server, or sends the change since its last version to the server it is
+        open on. Beyond `_MAX_OPEN_DOCUMENTS`, the least recently used documents are closed.
+        """
+        with self._documents_lock:
+            document = self._documents.pop(uri, None)
+            if document is not None and (not document.connection.is_alive or document.language_id != language_id):
+                self._close_document(document.connection, uri)
+                document = None
+            if document is None:
+                connection = self._least_busy_server().connect()
+                self._open_document(connection, uri, language_id, text)
+                document = OpenDocument(connection, language_id, text)
+            elif (change := text_change(document.text, text)) is not None:
+                params = {"textDocument": {"uri": uri, "version": document.version + 1}, "contentChanges": [change]}
+                document.connection.notify("textDocument/didChange", params)
+                document.version += 1
+                document.text = text
+            self._documents[uri] = document
+            while len(self._documents) > self._MAX_OPEN_DOCUMENTS:
+                closed_uri, closed = self._documents.popitem(last=False)
+                self._close_document(closed.connection, closed_uri)
+            return document
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._watchdog_lock:
+            watchdog, self._watchdog = self._watchdog, None
+        if watchdog is not None and watchdog is not threading.current_thread():
+            watchdog.join()
+        with self._documents_lock:
+            self._documents.clear()
+        for server in self._servers:
+            server.close()
+
+    def _least_busy_server(self) -> _LSPServer:
+        # servers not started yet count as idle, so that the pool only grows when the running servers are busy
+        return min(self._servers, key=lambda server: server.in_flight)
+
+    def _start_server(self) -> LSPConnection:
+        connection = LSPConnection.start(self.config.command_line, self.config.env_vars, self._workdir)
+        try:
+            response = connection.request("initialize", self._initialize_params())
+            initialize_result = response.result(timeout=self.config.request_timeout) or {}
+            connection.notify("initialized")
+        except Exception:
+            connection.kill()
+            raise
+        self.server_info = initialize_result.get("serverInfo", {})
+        experimental = initialize_result.get("capabilities", {}).get("experimental") or {}
+        self._transpiles_ranges = experimental.get(TRANSPILE_RANGE_CAPABILITY) is True
+        logger.info(f"Started language server {connection.pid}: {' '.join(self.config.command_line)}")
+        self._start_watchdog()
+        return connection
+
+    def _start_watchdog(self) -> None:
+        with self._watchdog_lock:
+            if self._watchdog is not None:
+                return
+            self._closed.clear()
+            self._watchdog = threading.Thread(target=self._watch_servers, name="lsp-watchdog", daemon=True)
+            self._watchdog.start()
+            if not self._close_at_exit:
+                atexit.register(self.close)
+                self._close_at_exit = True
+
+    def _watch_servers(self) -> None:
+        interval = min(1.0, self.config.request_timeout / 4)
+        while not self._closed.wait(interval):
+            for server in self._servers:
+                server.kill_if_hung(self.config.request_timeout)
+
+    def _initialize_params(self) -> dict[str, Any]:
+        return {
+            "processId": os.getpid(),
+            "clientInfo": {"name": "remorph", "version": __version__},
+            "rootUri": self._workdir.absolute().as_uri() if self._workdir else None,
+            # positions count characters, as Python strings do
+            "capabilities": {"general": {"positionEncodings": ["utf-32"]}},
+            "initializationOptions": {"remorph": {"dialects": self.config.dialects}, "custom": self.custom},
+        }
+
+    @staticmethod
+    def _open_document(connection: LSPConnection, uri: str, language_id: str, text: str) -> None:
+        document = {"uri": uri, "languageId": language_id, "version": 1, "text": text}
+        connection.notify("textDocument/didOpen", {"textDocument": document})
+
+    @staticmethod
+    def _close_document(connection: LSPConnection, uri: str) -> None:
+        # the server may be gone already, its documents with it
+        with contextlib.suppress(ConnectionError):
+            connection.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+
+    @staticmethod
+    def _offsets(
+        index: LineIndex, result: dict[str, Any], file_path: Path
+    ) -> tuple[list[tuple[int, int, str]], list[tuple[int, str]]]:
+        """Returns the edits and the error diagnostics of a transpile result, positioned by offset in the document."""
+        edits = [
+            (index.offset(edit["range"]["start"]), index.offset(edit["range"]["end"]), edit["newText"])
+            for edit in result.get("changes", [])
+        ]
+        errors = []
+        for diagnostic in result.get("diagnostics", []):
+            if diagnostic.get("severity", _ERROR_SEVERITY) == _ERROR_SEVERITY:
+                errors.append((index.offset(diagnostic["range"]["start"]), diagnostic["message"]))
+            else:
+                logger.warning(f"{file_path}: {diagnostic['message']}")
+        return edits, errors
+
+    @staticmethod
+    def _errors(index: LineIndex, errors: list[tuple[int, str]], file_path: Path) -> list[TranspileError]:
+        transpile_errors: list[TranspileError] = []
+        for offset, message in errors:
+            position = index.position(offset)
+            location = f"line {position['line'] + 1}, column {position['character'] + 1}"
+            transpile_errors.append(ParserError(file_path, f"{message} ({location})"))
+        return transpile_errors
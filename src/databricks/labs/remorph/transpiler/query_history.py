@@ -0,0 +1,237 @@
+"""
+Transpilation of query history exports, e.g. from Snowflake or Synapse, holding one query per record rather than one
+per `.sql` file.
+
+The export is a CSV, JSON Lines or Parquet file, read one batch of records at a time: Parquet row groups through
+`ParquetFile.iter_batches`, CSV blocks through the streaming reader of `pyarrow.csv` and JSON Lines line by line, as
+the JSON reader of pyarrow rejects ids of mixed types, e.g. numbers and strings. The ids of CSV and JSON Lines records
+are read as strings, so that every batch of a file has the same schema.
+The queries of each batch are transpiled through `transpile_expressions`, across a process pool with more than one
+worker, and the results are written as soon as the batch is complete, to a file of the format of its extension: the
+id of each record with its transpiled SQL and the type and message of its errors. Memory stays bounded by the size
+of a batch, whatever the number of records.
+
+Requires `pyarrow`, which is not a dependency of remorph.
+"""
+
+import csv
+import json
+import logging
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.csv as pa_csv  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+from databricks.labs.remorph.config import TranspileConfig, TranspileResult
+from databricks.labs.remorph.transpiler.execute import transpile_expressions
+from databricks.labs.remorph.transpiler.transpile_status import (
+    ParserError,
+    ResourceLimitError,
+    ValidationError,
+    summarize_errors,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 10_000
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+# the columns following the id in the transpiled file
+RESULT_COLUMNS = ("transpiled_sql", "error_type", "error_msg")
+
+# CSV is read in blocks of this size, which must hold the longest record
+_CSV_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def query_history_format(path: str | Path) -> str | None:
+    """Returns the format of a query history file from its extension, None for an unsupported one"""
+    return FORMATS.get(Path(path).suffix.lower())
+
+
+def _resolve(names: Iterable[str], column: str, path: Path) -> str:
+    """Returns the name of `column` among `names`, matched regardless of case as exports often upper-case them"""
+    names = list(names)
+    if column in names:
+        return column
+    for name in names:
+        if name.lower() == column.lower():
+            return name
+    raise ValueError(f"Column '{column}' not found in {path}, which holds: {', '.join(names)}")
+
+
+def _read_parquet(path: Path, id_column: str, sql_column: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    parquet = pq.ParquetFile(path)
+    columns = [_resolve(parquet.schema_arrow.names, column, path) for column in (id_column, sql_column)]
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+        yield pa.RecordBatch.from_arrays([batch.column(name) for name in columns], names=columns)
+
+
+def _read_csv(path: Path, id_column: str, sql_column: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        header = next(csv.reader(f), [])
+    columns = [_resolve(header, column, path) for column in (id_column, sql_column)]
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=_CSV_BLOCK_BYTES),
+        # queries span several lines
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        # the type of the ids is not inferred, it could change from a block to the next
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns, column_types={name: pa.string() for name in columns}
+        ),
+    )
+    for batch in reader:
+        for offset in range(0, batch.num_rows, batch_size):
+            yield batch.slice(offset, batch_size)
+
+
+def _json_batch(columns: list[str], ids: list[Any], sqls: list[Any]) -> pa.RecordBatch:
+    # the type of the ids is not inferred, it could change from a batch to the next
+    id_array = pa.array(
+        [value if value is None or isinstance(value, str) else json.dumps(value) for value in ids], pa.string()
+    )
+    return pa.RecordBatch.from_arrays([id_array, pa.array(sqls, pa.string())], names=columns)
+
+
+def _read_jsonl(path: Path, id_column: str, sql_column: str, batch_size: int) -> Iterator[pa.RecordBatch]:
+    columns: list[str] = []
+    ids: list[Any] = []
+    sqls: list[Any] = []
+    with path.open("r", encoding="utf-8-sig") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not columns:
+                columns = [_resolve(record.keys(), column, path) for column in (id_column, sql_column)]
+            ids.append(record.get(columns[0]))
+            sqls.append(record.get(columns[1]))
+            if len(ids) >= batch_size:
+                yield _json_batch(columns, ids, sqls)
+                ids, sqls = [], []
+    if ids:
+        yield _json_batch(columns, ids, sqls)
+
+
+def read_query_history(
+    path: str | Path, id_column: str, sql_column: str, batch_size: int = DEFAULT_BATCH_SIZE
+) -> Iterator[pa.RecordBatch]:
+    """
+    Reads the records of a query history file in batches of at most `batch_size` records, each holding the id
+    column then the SQL column, under their names in the file.
+    """
+    path = Path(path)
+    readers = {"csv": _read_csv, "jsonl": _read_jsonl, "parquet": _read_parquet}
+    file_format = query_history_format(path)
+    if file_format is None:
+        raise ValueError(f"Unsupported query history format: {path}, expected one of {', '.join(FORMATS)}")
+    return readers[file_format](path, id_column, sql_column, batch_size)
+
+
+class QueryHistoryWriter:
+    """Writes batches of transpiled records to a file of the format of its extension, opened on the first batch"""
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._format = query_history_format(self._path)
+        if self._format is None:
+            raise ValueError(f"Unsupported query history format: {self._path}, expected one of {', '.join(FORMATS)}")
+        self._writer: pq.ParquetWriter | pa_csv.CSVWriter | TextIO | None = None
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        if self._writer is None:
+            self._writer = self._open(batch.schema)
+        if isinstance(self._writer, (pq.ParquetWriter, pa_csv.CSVWriter)):
+            self._writer.write_batch(batch)
+            return
+        for record in batch.to_pylist():
+            self._writer.write(json.dumps(record))
+            self._writer.write("\n")
+
+    def _open(self, schema: pa.Schema) -> pq.ParquetWriter | pa_csv.CSVWriter | TextIO:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        if self._format == "parquet":
+            return pq.ParquetWriter(self._path, schema)
+        if self._format == "csv":
+            return pa_csv.CSVWriter(self._path, schema)
+        return self._path.open("w", encoding="utf-8")
+
+    def close(self, empty_schema: pa.Schema) -> None:
+        """Closes the file, creating it with `empty_schema` when no batch was written"""
+        if self._writer is None:
+            self._writer = self._open(empty_schema)
+        self._writer.close()
+
+
+def _result_batch(batch: pa.RecordBatch, results: list[TranspileResult]) -> pa.RecordBatch:
+    summaries = [summarize_errors(result.error_list) for result in results]
+    arrays = [
+        batch.column(0),
+        pa.array([result.transpiled_code for result in results], pa.string()),
+        pa.array([error_type for error_type, _ in summaries], pa.string()),
+        pa.array([error_msg for _, error_msg in summaries], pa.string()),
+    ]
+    return pa.RecordBatch.from_arrays(arrays, names=[batch.schema.names[0], *RESULT_COLUMNS])
+
+
+def _write_complete_batches(
+    writer: QueryHistoryWriter, pending: deque[pa.RecordBatch], results: list[TranspileResult]
+) -> None:
+    """Writes the pending batches all the results of which arrived, removing them and their results"""
+    while pending and len(results) >= pending[0].num_rows:
+        batch = pending.popleft()
+        if batch.num_rows:
+            writer.write(_result_batch(batch, results[: batch.num_rows]))
+            del results[: batch.num_rows]
+
+
+def transpile_query_history(
+    config: TranspileConfig,
+    input_file: str | Path,
+    output_file: str | Path,
+    id_column: str,
+    sql_column: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict[str, int | str]:
+    """
+    Transpiles the queries of the query history `input_file`, from `config.source_dialect`, to `output_file`.
+    :return: The number of queries transpiled, failing per cause, and transpiled from the template of a query with
+        other literals, see `TranspileConfig.statement_templates`, and the path of the output file.
+    """
+    writer = QueryHistoryWriter(output_file)
+    # the batches read whose results are not all written yet
+    pending: deque[pa.RecordBatch] = deque()
+    errors: Counter[type] = Counter()
+    total = 0
+    collapsed = 0
+
+    def sources() -> Iterator[str]:
+        for batch in read_query_history(input_file, id_column, sql_column, batch_size):
+            pending.append(batch)
+            yield from (sql or "" for sql in batch.column(1).to_pylist())
+
+    results: list[TranspileResult] = []
+    try:
+        for result in transpile_expressions(config, sources()):
+            results.append(result)
+            total += 1
+            collapsed += result.statements_collapsed
+            errors.update({type(error) for error in result.error_list})
+            _write_complete_batches(writer, pending, results)
+    finally:
+        empty_schema = pa.schema([(id_column, pa.string()), *((name, pa.string()) for name in RESULT_COLUMNS)])
+        writer.close(empty_schema)
+    logger.info(f"Transpiled {total} queries from {input_file} to {output_file}")
+    return {
+        "total_queries_processed": total,
+        "no_of_sql_failed_while_parsing": errors[ParserError],
+        "no_of_sql_failed_while_validating": errors[ValidationError],
+        "no_of_sql_over_resource_limits": errors[ResourceLimitError],
+        "statements_collapsed": collapsed,
+        "output_file": str(output_file),
+    }
@@ -0,0 +1,139 @@
+"""
+Transpilation of the SQL held in a Spark DataFrame, e.g. a query history kept in a Delta table, on the executors of
+a cluster rather than from a local folder.
+
+    queries = spark.table("main.migration.query_history").select("query_id", "dialect", "query_text")
+    transpiled = transpile_dataframe(queries, id_column="query_id", sql_column="query_text")
+    transpiled.write.saveAsTable("main.migration.transpiled_queries")
+
+Each partition is transpiled by `DataFrame.mapInArrow`, the DataFrame counterpart of `RDD.mapPartitions`, which
+Spark Connect supports as well. A Python worker process creates one `SqlglotEngine` on its first batch and reuses
+it for the tasks that follow, as Spark reuses its Python workers, so that the dialects are set up once per process.
+Throughput scales with the cores of the cluster as long as the DataFrame has at least as many partitions as cores.
+The `databricks-labs-remorph` package must be installed on the cluster.
+"""
+
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+import pyarrow as pa  # type: ignore[import-untyped]
+from pyspark.sql import DataFrame
+from pyspark.sql.types import DoubleType, StringType, StructField, StructType
+
+from databricks.labs.remorph.helpers.watchdog import Budget
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.transpile_status import ParserError, summarize_errors
+
+logger = logging.getLogger(__name__)
+
+# the columns following the id in the transpiled DataFrame
+RESULT_SCHEMA = StructType(
+    [
+        StructField("transpiled_sql", StringType()),
+        StructField("error_type", StringType()),
+        StructField("error_msg", StringType()),
+        StructField("duration_ms", DoubleType()),
+    ]
+)
+
+# the engine of this Python worker process, shared by the tasks it runs
+_executor_engine: SqlglotEngine | None = None
+
+
+def _engine(budget: Budget | None) -> SqlglotEngine:
+    global _executor_engine  # pylint: disable=global-statement
+    if _executor_engine is None:
+        _executor_engine = SqlglotEngine()
+    _executor_engine.set_budget(budget)
+    return _executor_engine
+
+
+def _transpile_row(
+    engine: SqlglotEngine, target_dialect: str, row_id: Any, dialect: str | None, sql: str | None
+) -> tuple[str | None, str | None, str | None]:
+    if sql is None:
+        return None, None, None
+    file_path = Path(str(row_id))
+    if dialect is None or dialect not in DIALECTS:
+        return None, ParserError.__name__, f"Unsupported source dialect: {dialect}"
+    try:
+        result = engine.transpile(dialect, target_dialect, sql, file_path)
+    except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+        # a row the engine fails on must not fail its task, and the whole job with it
+        logger.warning(f"Exception caught for row {row_id}: {e}")
+        return None, type(e).__name__, str(e)
+    return result.transpiled_code, *summarize_errors(result.error_list)
+
+
+def transpile_rows(
+    engine: SqlglotEngine,
+    target_dialect: str,
+    rows: Iterable[tuple[Any, str | None, str | None]],
+) -> Iterator[tuple[Any, str | None, str | None, str | None, float]]:
+    """
+    Transpiles the SQL of each `(id, dialect, sql)` row, yielding `(id, transpiled_sql, error_type, error_msg,
+    duration_ms)`. The error type is the one of the first error, the messages of all errors are joined by newlines.
+    A row the engine raises on is reported with the type of the exception, rather than raised.
+    """
+    for row_id, dialect, sql in rows:
+        start = time.perf_counter()
+        transpiled_sql, error_type, error_msg = _transpile_row(engine, target_dialect, row_id, dialect, sql)
+        yield row_id, transpiled_sql, error_type, error_msg, (time.perf_counter() - start) * 1000
+
+
+def transpile_batches(
+    target_dialect: str,
+    id_column: str,
+    dialect_column: str,
+    sql_column: str,
+    budget: Budget | None,
+    batches: Iterable[pa.RecordBatch],
+) -> Iterator[pa.RecordBatch]:
+    """
+    Transpiles the rows of each Arrow batch with the engine of this process, yielding a batch of the id column,
+    as it is, and the columns of `RESULT_SCHEMA` per batch.
+    """
+    engine = _engine(budget)
+    names = [id_column, *RESULT_SCHEMA.names]
+    for batch in batches:
+        if not batch.num_rows:
+            continue
+        rows = zip(
+            batch.column(id_column).to_pylist(),
+            batch.column(dialect_column).to_pylist(),
+            batch.column(sql_column).to_pylist(),
+        )
+        _, transpiled_sqls, error_types, error_msgs, durations = zip(*transpile_rows(engine, target_dialect, rows))
+        arrays = [
+            batch.column(id_column),
+            pa.array(transpiled_sqls, pa.string()),
+            pa.array(error_types, pa.string()),
+            pa.array(error_msgs, pa.string()),
+            pa.array(durations, pa.float64()),
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def transpile_dataframe(
+    df: DataFrame,
+    target_dialect: str = "databricks",
+    *,
+    id_column: str = "id",
+    dialect_column: str = "dialect",
+    sql_column: str = "sql",
+    budget: Budget | None = None,
+) -> DataFrame:
+    """
+    [Experimental] Transpiles the SQL of each row of `df`, in the source dialect of the row, on the executors, each
+    row within `budget`, if any. A Python worker runs one task at a time, so memory budgets apply to it as a whole.
+    :return: A DataFrame of the id of each row, with the type of `id_column`, and the columns of `RESULT_SCHEMA`:
+    the transpiled SQL, the type and message of its errors, None without, and the time it took in milliseconds.
+    """
+    schema = StructType([df.schema[id_column], *RESULT_SCHEMA.fields])
+    transpile = partial(transpile_batches, target_dialect, id_column, dialect_column, sql_column, budget)
+    return df.select(id_column, dialect_column, sql_column).mapInArrow(transpile, schema)
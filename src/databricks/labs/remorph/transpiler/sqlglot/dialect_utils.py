@@ -1,3 +1,6 @@
+import threading
+from collections.abc import Iterator
+
 from sqlglot import Dialects, Dialect
 
 from databricks.labs.remorph.transpiler.sqlglot.parsers import oracle, presto, snowflake
@@ -22,9 +25,65 @@ SQLGLOT_DIALECTS: dict[str, type[Dialect] | str] = {
 }
 
 
+class DialectRegistry:
+    """
+    Resolves dialect keys, e.g. `snowflake`, to dialect instances and back. Each dialect is instantiated once, on
+    first use, and shared: sqlglot dialects hold no state while tokenizing, parsing or generating, so the registry
+    can be used from several threads.
+
+    A key that is not registered resolves to the base sqlglot dialect, as `Dialect.get_or_raise(None)` does.
+    Dialects registered under several keys, e.g. Postgres, resolve back to their first key.
+    """
+
+    def __init__(self, dialects: dict[str, type[Dialect] | str]):
+        self._dialects = dialects
+        self._lock = threading.Lock()
+        self._by_key: dict[str, Dialect] = {}
+        self._key_by_type: dict[type[Dialect], str] | None = None
+        self._default = Dialect()
+
+    def keys(self) -> list[str]:
+        return list(self._dialects.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._dialects
+
+    def get(self, key: str | None) -> Dialect:
+        if key is None or key not in self._dialects:
+            return self._default
+        dialect = self._by_key.get(key)
+        if dialect is None:
+            with self._lock:
+                dialect = self._by_key.get(key)
+                if dialect is None:
+                    dialect = Dialect.get_or_raise(self._dialects[key])
+                    self._by_key[key] = dialect
+        return dialect
+
+    def key_of(self, dialect: Dialect) -> str:
+        """
+        Returns the key `dialect` is registered under, raising a `KeyError` for an unregistered dialect.
+        """
+        key_by_type = self._key_by_type
+        if key_by_type is None:
+            # resolving the keys of the dialects registered by name imports their sqlglot modules,
+            # so the index is only built on the first reverse lookup
+            key_by_type = {}
+            for key in self._dialects:
+                key_by_type.setdefault(type(self.get(key)), key)
+            self._key_by_type = key_by_type
+        return key_by_type[type(dialect)]
+
+
+DIALECTS = DialectRegistry(SQLGLOT_DIALECTS)
+
+
 def get_dialect(dialect: str) -> Dialect:
-    return Dialect.get_or_raise(SQLGLOT_DIALECTS.get(dialect))
+    return DIALECTS.get(dialect)
 
 
 def get_key_from_dialect(input_dialect: Dialect) -> str:
-    return [source_key for source_key, dialect in SQLGLOT_DIALECTS.items() if dialect == input_dialect][0]
+    return DIALECTS.key_of(input_dialect)
@@ -0,0 +1,288 @@
+"""
+Deduplication of statements differing only in their literals, e.g. the statements of a query history export.
+
+A statement is fingerprinted by hashing its tokens with the string and number literals replaced by sentinels of
+the same shape: as long as the literal, with the same digits and punctuation for a number. The pretty printer
+breaks lines on the length of the generated text, so statements only share a fingerprint if their literals have
+the same lengths. A literal too short to hold a sentinel, or holding characters the target dialect may escape,
+is hashed as it is.
+
+The first statement of a fingerprint is transpiled as usual. When a second one shows up, its probe, the tokens
+of the statement with the sentinels in place of the literals, is transpiled to derive a template: the transpiled
+SQL split around the sentinels. The statements after that are transpiled by filling the template with their own
+literals.
+
+The transpilation of a literal may depend on its value, e.g. a date format is translated and dropped if it is
+the default one, so a template is only derived when every literal of the probe is a plain operand, e.g. of a
+comparison or a `LIMIT`, rather than the argument of a function, and when filling the template with the literals
+of the first statement reproduces the SQL that statement was transpiled to.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlglot import Dialect
+from sqlglot import expressions as exp
+from sqlglot.tokens import Token, TokenType
+
+DEFAULT_MAX_TEMPLATES = 10_000
+
+# characters a dialect may escape or normalize when generating a string literal
+_UNSAFE_STRING_CHARACTERS = re.compile(r"['\"\\`]")
+
+# expressions generating their literal operands as they are, whatever their value
+_OPAQUE_PARENTS = (
+    exp.Select,
+    exp.Alias,
+    exp.Limit,
+    exp.Offset,
+    exp.EQ,
+    exp.NEQ,
+    exp.GT,
+    exp.GTE,
+    exp.LT,
+    exp.LTE,
+    exp.Like,
+    exp.ILike,
+    exp.Between,
+    exp.In,
+    exp.Tuple,
+    exp.Case,
+    exp.If,
+    exp.Coalesce,
+    exp.Add,
+    exp.Sub,
+    exp.Mul,
+    exp.Div,
+)
+
+
+def _encode(index: int, digits: str, length: int) -> str | None:
+    """
+    Encodes `index` in the base of all `digits` but the last one, padded on the left to `length` with the last one,
+    so that no two indexes share a code. Returns None if `length` is too short to hold the code and a padding.
+    """
+    base = len(digits) - 1
+    code = digits[index % base]
+    index //= base
+    while index:
+        code = digits[index % base] + code
+        index //= base
+    if len(code) >= length:
+        return None
+    return digits[-1] * (length - len(code)) + code
+
+
+def sentinel(token: Token, index: int) -> str | None:
+    """
+    Returns the text of the sentinel standing for the literal at `index` among the literals of its statement, of
+    the same shape as `token`, or None if `token` is not a literal that can be replaced by a sentinel.
+    """
+    if token.token_type == TokenType.STRING:
+        if not token.text.isprintable() or _UNSAFE_STRING_CHARACTERS.search(token.text):
+            return None
+        return _encode(index, "abcdefghijklmnopqrstuvwxyz", len(token.text))
+    if token.token_type == TokenType.NUMBER:
+        digit_count = sum(character.isdigit() for character in token.text)
+        code = _encode(index, "0123456789", digit_count)
+        if code is None:
+            return None
+        digits = iter(code)
+        return "".join(next(digits) if character.isdigit() else character for character in token.text)
+    return None
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    key: tuple[type[Dialect], type[Dialect], bytes]
+    literals: tuple[Token, ...]
+    sentinels: tuple[str, ...]
+
+    @classmethod
+    def from_tokens(cls, read_dialect: Dialect, write_dialect: Dialect, tokens: list[Token]) -> "Fingerprint":
+        digest = hashlib.blake2b(digest_size=16)
+        literals: list[Token] = []
+        sentinels: list[str] = []
+        for token in tokens:
+            text = sentinel(token, len(literals))
+            if text is None:
+                text = token.text
+            else:
+                literals.append(token)
+                sentinels.append(text)
+            digest.update(f"{token.token_type.name}\0{text}\0".encode("utf-8", "surrogatepass"))
+            for comment in token.comments:
+                digest.update(f"--{comment}\0".encode("utf-8", "surrogatepass"))
+        return cls((type(read_dialect), type(write_dialect), digest.digest()), tuple(literals), tuple(sentinels))
+
+    def probe_tokens(self, tokens: list[Token]) -> list[Token]:
+        """Copies `tokens`, replacing the literals with their sentinels."""
+        sentinels = {id(literal): text for literal, text in zip(self.literals, self.sentinels)}
+        probe = []
+        for token in tokens:
+            text = sentinels.get(id(token))
+            if text is not None:
+                token = Token(token.token_type, text, token.line, token.col, token.start, token.end, [])
+            probe.append(token)
+        return probe
+
+    def has_opaque_literals(self, probe_expression: exp.Expression) -> bool:
+        """
+        Tells whether each sentinel is a literal of the expression parsed from the probe tokens, and an operand of an
+        expression that does not look into its value.
+        """
+        sentinels = set(self.sentinels)
+        found = 0
+        for literal in probe_expression.find_all(exp.Literal):
+            if literal.this not in sentinels:
+                continue
+            parent = literal.parent
+            while isinstance(parent, (exp.Neg, exp.Paren)):
+                parent = parent.parent
+            if not isinstance(parent, _OPAQUE_PARENTS):
+                return False
+            found += 1
+        return found == len(sentinels)
+
+
+def render_literal(dialect: Dialect, token: Token) -> str:
+    """Generates the literal of `token` in `dialect`, as the generator does within a statement."""
+    if token.token_type == TokenType.STRING:
+        return dialect.generate(exp.Literal.string(token.text))
+    return dialect.generate(exp.Literal.number(token.text))
+
+
+@dataclass(frozen=True)
+class Template:
+    """Transpiled SQL split around its literals: `pieces[i]` precedes the literal at index `slots[i]`."""
+
+    pieces: tuple[str, ...]
+    slots: tuple[int, ...]
+
+    @classmethod
+    def derive(cls, probe_sql: str, rendered_sentinels: list[str]) -> "Template | None":
+        """
+        Splits the SQL transpiled from a probe around its sentinels, or returns None unless each sentinel occurs
+        exactly once, e.g. when a literal was rewritten or dropped.
+        """
+        positions = []
+        for index, rendered in enumerate(rendered_sentinels):
+            matches = list(re.finditer(rf"(?<![\w.]){re.escape(rendered)}(?![\w.])", probe_sql))
+            if len(matches) != 1:
+                return None
+            positions.append((matches[0].start(), matches[0].end(), index))
+        positions.sort()
+        pieces = []
+        offset = 0
+        for start, end, _ in positions:
+            pieces.append(probe_sql[offset:start])
+            offset = end
+        pieces.append(probe_sql[offset:])
+        return cls(tuple(pieces), tuple(index for _, _, index in positions))
+
+    def fill(self, rendered_literals: list[str]) -> str:
+        parts = []
+        for piece, slot in zip(self.pieces, self.slots):
+            parts.append(piece)
+            parts.append(rendered_literals[slot])
+        parts.append(self.pieces[-1])
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class _FirstStatement:
+    transpiled_sql: str
+    literals: tuple[Token, ...]
+
+
+# the statements of the fingerprint cannot be transpiled from a template
+_NOT_TEMPLATED = object()
+
+
+class StatementTemplates:
+    """
+    Templates of the fingerprints seen last, evicting the least recently used one beyond `max_size` so that memory
+    stays bounded however many distinct statements are transpiled. Safe to use from several threads.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_TEMPLATES):
+        self._max_size = max_size
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._entries
+
+    def transpile(
+        self,
+        fingerprint: Fingerprint,
+        write_dialect: Dialect,
+        transpile_probe: Callable[[], str | None],
+    ) -> str | None:
+        """
+        Returns the statement of `fingerprint` transpiled from the template of its fingerprint, or None if it must
+        be transpiled as usual. On the second statement of a fingerprint, the template is derived from the SQL
+        `transpile_probe` transpiles the probe tokens of the statement to, None if that fails.
+        """
+        entry = self._get(fingerprint.key)
+        if entry is None or entry is _NOT_TEMPLATED:
+            return None
+        if isinstance(entry, _FirstStatement):
+            entry = self._derive(fingerprint, write_dialect, transpile_probe, entry)
+            self._put(fingerprint.key, entry or _NOT_TEMPLATED)
+            if entry is None:
+                return None
+        assert isinstance(entry, Template)
+        return entry.fill([render_literal(write_dialect, literal) for literal in fingerprint.literals])
+
+    def record(self, fingerprint: Fingerprint, transpiled_sql: str) -> None:
+        """Remembers the SQL the first statement of a fingerprint was transpiled to."""
+        with self._lock:
+            if fingerprint.key in self._entries:
+                return
+        self._put(fingerprint.key, _FirstStatement(transpiled_sql, fingerprint.literals))
+
+    @staticmethod
+    def _derive(
+        fingerprint: Fingerprint,
+        write_dialect: Dialect,
+        transpile_probe: Callable[[], str | None],
+        first: _FirstStatement,
+    ) -> Template | None:
+        probe_sql = transpile_probe()
+        if probe_sql is None:
+            return None
+        rendered_sentinels = [
+            render_literal(write_dialect, Token(literal.token_type, text))
+            for literal, text in zip(fingerprint.literals, fingerprint.sentinels)
+        ]
+        template = Template.derive(probe_sql, rendered_sentinels)
+        if template is None:
+            return None
+        if (
+            template.fill([render_literal(write_dialect, literal) for literal in first.literals])
+            != first.transpiled_sql
+        ):
+            return None
+        return template
+
+    def _get(self, key: tuple) -> object | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: tuple, entry: object) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
@@ -10,7 +10,7 @@ from sqlglot.errors import UnsupportedError
 from sqlglot.helper import apply_index_offset, csv
 
 from databricks.labs.remorph.transpiler.sqlglot import local_expression
-from databricks.labs.remorph.transpiler.sqlglot.lca_utils import unalias_lca_in_select
+from databricks.labs.remorph.transpiler.sqlglot.lca_utils import unalias_lca
 
 # pylint: disable=too-many-public-methods
 
@@ -468,7 +468,7 @@ class Databricks(SqlglotDatabricks):  #
         }
 
         def preprocess(self, expression: exp.Expression) -> exp.Expression:
-            fixed_ast = expression.transform(unalias_lca_in_select, copy=False)
+            fixed_ast = unalias_lca(expression)
             return super().preprocess(fixed_ast)
 
         def format_time(self, expression: exp.Expression, inverse_time_mapping=None, inverse_time_trie=None):
@@ -1,18 +1,48 @@
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import TypeGuard
 
 from sqlglot import expressions as exp, Dialect
 from sqlglot import parse
 from sqlglot.errors import ErrorLevel, ParseError, TokenError, UnsupportedError
 from sqlglot.expressions import Expression, Select
-from sqlglot.optimizer.scope import Scope, build_scope
 
 from databricks.labs.remorph.transpiler.transpile_status import ValidationError
 from databricks.labs.remorph.transpiler.sqlglot.local_expression import AliasInfo
 
 logger = logging.getLogger(__name__)
 
+# marks the statements `find_unsupported_lca` found no lateral column alias in, which `unalias_lca` then skips
+_LCA_FREE = "lca_free"
+
+
+@dataclass
+class SelectLca:
+    """
+    The aliases of a select, the columns of its where clause and windows referencing them, and the columns of the
+    queries nested in those referencing them, which are reported but not rewritten
+    """
+
+    select: Select
+    aliases: dict[str, AliasInfo]
+    in_where: list[exp.Column] = field(default_factory=list)
+    in_windows: list[exp.Column] = field(default_factory=list)
+    nested_in_where: list[exp.Column] = field(default_factory=list)
+    nested_in_windows: list[exp.Column] = field(default_factory=list)
+
+    @property
+    def found(self) -> bool:
+        return bool(self.in_where or self.in_windows or self.nested_in_where or self.nested_in_windows)
+
+
+# a select and the clause of it holding a node: `where`, `window` or `projection`, outside of the windows
+_Clause = tuple[SelectLca, str]
+
+# the clauses of the args of a select walked for lateral column aliases
+_SELECT_CLAUSES = {"where": "where", "expressions": "projection"}
+
 
 def check_for_unsupported_lca(
     from_dialect: Dialect,
@@ -32,14 +62,29 @@ def check_for_unsupported_lca(
         logger.warning(f"Error while preprocessing {file_path}: {e}")
         return None
 
-    aliases_in_where = set()
-    aliases_in_window = set()
+    return find_unsupported_lca(root_expressions, file_path)
+
+
+def find_unsupported_lca(
+    root_expressions: Iterable[Expression | None],
+    file_path: Path,
+) -> ValidationError | None:
+    """
+    Check already parsed expressions for unsupported lateral column aliases in window expressions and where clauses
+    :return: An error if found
+    """
+    aliases_in_where: set[str] = set()
+    aliases_in_window: set[str] = set()
 
     for expr in root_expressions:
-        for select in expr.find_all(exp.Select, bfs=False):
-            alias_info = _find_aliases_in_select(select)
-            aliases_in_where.update(_find_invalid_lca_in_where(select, alias_info))
-            aliases_in_window.update(_find_invalid_lca_in_window(select, alias_info))
+        if expr is None:
+            continue
+        analyses = analyze_lca(expr)
+        if not analyses:
+            expr.meta[_LCA_FREE] = True
+        for analysis in analyses:
+            aliases_in_where.update(column.name for column in (*analysis.in_where, *analysis.nested_in_where))
+            aliases_in_window.update(column.name for column in (*analysis.in_windows, *analysis.nested_in_windows))
 
     if not (aliases_in_where or aliases_in_window):
         return None
@@ -54,46 +99,88 @@ def check_for_unsupported_lca(
     return ValidationError(file_path, " ".join(err_messages))
 
 
-def unalias_lca_in_select(expr: exp.Expression) -> exp.Expression:
-    if not isinstance(expr, exp.Select):
-        return expr
-
-    root_select: Scope | None = build_scope(expr)
-    if not root_select:
-        return expr
-
-    # We won't search inside nested selects, they will be visited separately
-    nested_selects = {*root_select.derived_tables, *root_select.subqueries}
-    alias_info = _find_aliases_in_select(expr)
-    where_ast: Expression | None = expr.args.get("where")
-    if where_ast:
-        for column in where_ast.walk(prune=lambda n: n in nested_selects):
-            _replace_aliases(column, alias_info)
-    for window in _find_windows_in_select(expr):
-        for column in window.walk():
-            _replace_aliases(column, alias_info)
-    return expr
-
-
-def _replace_aliases(column: Expression, alias_info: dict[str, AliasInfo]):
-    if (
-        isinstance(column, exp.Column)
-        and column.name in alias_info
-        and not alias_info[column.name].is_same_name_as_column
-    ):
-        unaliased_expr = alias_info[column.name].expression
-        column.replace(unaliased_expr)
-        for col in unaliased_expr.walk():
-            _replace_aliases(col, alias_info)
-
-
-def _find_windows_in_select(select: Select) -> list[exp.Window]:
-    window_expressions = []
-    for expr in select.expressions:
-        window_expr = expr.find(exp.Window)
-        if window_expr:
-            window_expressions.append(window_expr)
-    return window_expressions
+def analyze_lca(expression: Expression) -> list[SelectLca]:
+    """
+    Finds the selects of `expression` referencing their own aliases in their where clause or windows, the queries
+    nested in those included, inner selects first. The expression is walked once, each node along with the clause
+    holding it and the aliases of the selects it is nested in the where clause or a window of, so that the cost stays
+    linear in the size of the expression however deep the queries are nested.
+    """
+    analyses = []
+    stack: list[tuple[Expression, _Clause | None, dict[str, _Clause]]] = [(expression, None, {})]
+    while stack:
+        node, clause, enclosing = stack.pop()
+        if isinstance(node, exp.Column):
+            _add_lca(node, clause, enclosing)
+            continue
+        if isinstance(node, exp.Query) and clause is not None:
+            # a nested query must not reference the aliases of the where clause or window it is nested in either
+            owner, kind = clause
+            if kind != "projection":
+                enclosing = enclosing | {
+                    name: clause for name, alias in owner.aliases.items() if not alias.is_same_name_as_column
+                }
+            clause = None
+        elif isinstance(node, exp.Window) and clause is not None and clause[1] == "projection":
+            clause = (clause[0], "window")
+        children: list[tuple[Expression, _Clause | None, dict[str, _Clause]]] = []
+        if isinstance(node, exp.Select):
+            analysis = SelectLca(node, _find_aliases_in_select(node))
+            analyses.append(analysis)
+            for key, child in _args(node):
+                select_clause = _SELECT_CLAUSES.get(key)
+                children.append((child, None if select_clause is None else (analysis, select_clause), enclosing))
+        else:
+            children = [(child, clause, enclosing) for child in node.iter_expressions()]
+        # in reverse, so that the children are visited in order
+        stack.extend(reversed(children))
+    # nested selects come after the ones they are nested in, and are rewritten before them
+    return [analysis for analysis in reversed(analyses) if analysis.found]
+
+
+def _args(node: Expression) -> Iterator[tuple[str, Expression]]:
+    for key, value in node.args.items():
+        for child in value if isinstance(value, list) else [value]:
+            if isinstance(child, Expression):
+                yield key, child
+
+
+def _add_lca(column: exp.Column, clause: _Clause | None, enclosing: dict[str, _Clause]) -> None:
+    if clause is not None and clause[1] != "projection" and _is_lca(column, clause[0].aliases):
+        analysis, kind = clause
+        (analysis.in_where if kind == "where" else analysis.in_windows).append(column)
+    elif column.name in enclosing:
+        analysis, kind = enclosing[column.name]
+        (analysis.nested_in_where if kind == "where" else analysis.nested_in_windows).append(column)
+
+
+def unalias_lca(expression: Expression) -> Expression:
+    """Replaces the lateral column aliases referenced in where clauses and windows with the expressions aliased"""
+    if expression.meta.get(_LCA_FREE):
+        return expression
+    for analysis in analyze_lca(expression):
+        for column in (*analysis.in_where, *analysis.in_windows):
+            _replace_aliases(column, analysis.aliases, frozenset())
+    return expression
+
+
+def _scope_walk(node: Expression) -> Iterator[Expression]:
+    """Walks `node` without descending into the queries nested in it"""
+    return node.walk(bfs=False, prune=lambda n: n is not node and isinstance(n, exp.Query))
+
+
+def _is_lca(node: Expression, aliases: dict[str, AliasInfo]) -> TypeGuard[exp.Column]:
+    return isinstance(node, exp.Column) and node.name in aliases and not aliases[node.name].is_same_name_as_column
+
+
+def _replace_aliases(column: Expression, alias_info: dict[str, AliasInfo], expanding: frozenset[str]):
+    # an alias referencing itself through other aliases is left as it is
+    if not _is_lca(column, alias_info) or column.name in expanding:
+        return
+    unaliased_expr = alias_info[column.name].expression.copy()
+    column.replace(unaliased_expr)
+    for col in list(_scope_walk(unaliased_expr)):
+        _replace_aliases(col, alias_info, expanding | {column.name})
 
 
 def _find_aliases_in_select(select_expr: Select) -> dict[str, AliasInfo]:
@@ -101,38 +188,8 @@ def _find_aliases_in_select(select_expr: Select) -> dict[str, AliasInfo]:
     for expr in select_expr.expressions:
         if isinstance(expr, exp.Alias):
             alias_name = expr.output_name
-            is_same_name_as_column = False
-            for column in expr.find_all(exp.Column):
-                if column.name == alias_name:
-                    is_same_name_as_column = True
-                    break
-            aliases[alias_name] = AliasInfo(alias_name, expr.unalias().copy(), is_same_name_as_column)
+            is_same_name_as_column = any(
+                isinstance(node, exp.Column) and node.name == alias_name for node in _scope_walk(expr)
+            )
+            aliases[alias_name] = AliasInfo(alias_name, expr.unalias(), is_same_name_as_column)
     return aliases
-
-
-def _find_invalid_lca_in_where(
-    select_expr: Select,
-    aliases: dict[str, AliasInfo],
-) -> set[str]:
-    aliases_in_where = set()
-    where_ast: Expression | None = select_expr.args.get("where")
-    if where_ast:
-        for column in where_ast.find_all(exp.Column):
-            if column.name in aliases and not aliases[column.name].is_same_name_as_column:
-                aliases_in_where.add(column.name)
-
-    return aliases_in_where
-
-
-def _find_invalid_lca_in_window(
-    select_expr: Select,
-    aliases: dict[str, AliasInfo],
-) -> set[str]:
-    aliases_in_window = set()
-    windows = _find_windows_in_select(select_expr)
-    for window in windows:
-        for column in window.find_all(exp.Column):
-            if column.name in aliases and not aliases[column.name].is_same_name_as_column:
-                aliases_in_window.add(column.name)
-
-    return aliases_in_window
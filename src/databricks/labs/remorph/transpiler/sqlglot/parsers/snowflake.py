@@ -1,5 +1,4 @@
 import logging
-import re
 
 from sqlglot import expressions as exp
 from sqlglot.dialects.dialect import build_date_delta as parse_date_delta, build_formatted_time
@@ -9,7 +8,6 @@ from sqlglot.helper import is_int, seq_get
 from sqlglot.optimizer.simplify import simplify_literals
 from sqlglot.parser import build_var_map as parse_var_map
 from sqlglot.tokens import Token, TokenType
-from sqlglot.trie import new_trie
 
 from databricks.labs.remorph.transpiler.sqlglot import local_expression
 
@@ -282,11 +280,6 @@ class Snowflake(SqlglotSnowflake):
         COMMENTS = ["--", "//", ("/*", "*/")]
         STRING_ESCAPES = ["\\", "'"]
 
-        CUSTOM_TOKEN_MAP = {
-            r"(?i)CREATE\s+OR\s+REPLACE\s+PROCEDURE": TokenType.PROCEDURE,
-            r"(?i)var\s+\w+\s+=\s+\w+?": TokenType.VAR,
-        }
-
         SINGLE_TOKENS = {
             **SqlglotSnowflake.Tokenizer.SINGLE_TOKENS,
             "&": TokenType.PARAMETER,  # https://docs.snowflake.com/en/user-guide/snowsql-use#substituting-variables-in-a-session
@@ -297,74 +290,14 @@ class Snowflake(SqlglotSnowflake):
         # DEC is not a reserved keyword in Snowflake it can be used as table alias
         KEYWORDS.pop("DEC")
 
-        @classmethod
-        def update_keywords(cls, new_key_word_dict):
-            cls.KEYWORDS = new_key_word_dict | cls.KEYWORDS
-
-        @classmethod
-        def merge_trie(cls, parent_trie, curr_trie):
-            merged_trie = {}
-            logger.debug(f"The Parent Trie is {parent_trie}")
-            logger.debug(f"The Input Trie is {curr_trie}")
-            for key in set(parent_trie.keys()) | set(curr_trie.keys()):  # Get all unique keys from both tries
-                if key in parent_trie and key in curr_trie:  # If the key is in both tries, merge the subtries
-                    if isinstance(parent_trie[key], dict) and isinstance(curr_trie[key], dict):
-                        logger.debug(f"New trie inside the key is {curr_trie}")
-                        logger.debug(f"Parent trie inside the key is {parent_trie}")
-                        merged_trie[key] = cls.merge_trie(parent_trie[key], curr_trie[key])
-                        logger.debug(f"Merged Trie is {merged_trie}")
-                    elif isinstance(parent_trie[key], dict):
-                        merged_trie[key] = parent_trie[key]
-                    else:
-                        merged_trie[key] = curr_trie[key]
-                elif key in parent_trie:  # If the key is only in trie1, add it to the merged trie
-                    merged_trie[key] = parent_trie[key]
-                else:  # If the key is only in trie2, add it to the merged trie
-                    merged_trie[key] = curr_trie[key]
-            return merged_trie
-
-        @classmethod
-        def update_keyword_trie(
-            cls,
-            curr_trie,
-            parent_trie=None,
-        ):
-            if parent_trie is None:
-                parent_trie = cls._KEYWORD_TRIE
-            cls.KEYWORD_TRIE = cls.merge_trie(parent_trie, curr_trie)
-
-        def match_strings_token_dict(self, string, pattern_dict):
-            result_dict = {}
-            for pattern in pattern_dict:
-                matches = re.finditer(pattern, string, re.MULTILINE | re.IGNORECASE | re.DOTALL)
-                for _, match in enumerate(matches, start=1):
-                    result_dict[match.group().upper()] = pattern_dict[pattern]
-            return result_dict
-
-        def match_strings_list(self, string, pattern_dict):
-            result = []
-            for pattern in pattern_dict:
-                matches = re.finditer(pattern, string, re.MULTILINE | re.IGNORECASE | re.DOTALL)
-                for _, match in enumerate(matches, start=1):
-                    result.append(match.group().upper())
-            return result
-
         def tokenize(self, sql: str) -> list[Token]:
-            """Returns a list of tokens corresponding to the SQL string `sql`."""
+            """
+            Returns a list of tokens corresponding to the SQL string `sql`.
+
+            Tokenizing only touches the state of this instance, so separate instances can tokenize concurrently.
+            """
             self.reset()
             self.sql = sql
-            # Update Keywords
-            ref_dict = self.match_strings_token_dict(sql, self.CUSTOM_TOKEN_MAP)
-            self.update_keywords(ref_dict)
-            # Update Keyword Trie
-            custom_trie = new_trie(self.match_strings_list(sql, self.CUSTOM_TOKEN_MAP))
-            logger.debug(
-                f"The New Trie after adding the REF, VAR and IF ELSE blocks "
-                f"based on {self.CUSTOM_TOKEN_MAP}, is \n\n {custom_trie}"
-            )
-            self.update_keyword_trie(custom_trie)
-            logger.debug(f"Updated New Trie is {custom_trie}")
-            # Parent Code
             self.size = len(sql)
             try:
                 self._scan()
@@ -1,24 +1,43 @@
 import logging
 import typing as t
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
-from sqlglot import expressions as exp, parse, transpile, Dialect
+from sqlglot import expressions as exp, parse, Dialect
 from sqlglot.errors import ErrorLevel, ParseError, TokenError, UnsupportedError
 from sqlglot.expressions import Expression
+from sqlglot.parser import Parser
 from sqlglot.tokens import Token, TokenType
 
 from databricks.labs.remorph.config import TranspileResult
 from databricks.labs.remorph.helpers.string_utils import format_error_message
+from databricks.labs.remorph.helpers.tracing import span
+from databricks.labs.remorph.helpers.watchdog import Budget, BudgetExceeded, Watchdog
 from databricks.labs.remorph.transpiler.sqlglot import lca_utils
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect
-from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import SQLGLOT_DIALECTS
-from databricks.labs.remorph.transpiler.transpile_status import ParserError, ValidationError, TranspileError
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.fingerprint import Fingerprint, StatementTemplates
+from databricks.labs.remorph.transpiler.transpile_status import (
+    ParserError,
+    ResourceLimitError,
+    TranspileError,
+    ValidationError,
+)
 from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
 
 logger = logging.getLogger(__name__)
 
+# the length of the SQL quoted in the error of a statement over its budget, which may be huge
+_QUOTED_SQL_LENGTH = 1000
+_PHASE_DESCRIPTIONS = {
+    "parse": "parsing the statement",
+    "generate": "generating the statement",
+    "file": "transpiling the file",
+}
+
 
 @dataclass
 class ParsedExpression:
@@ -26,64 +45,295 @@ class ParsedExpression:
     parsed_expression: Expression
 
 
+@dataclass
+class ParsedStatement:
+    original_sql: str
+    expressions: list[Expression | None]
+    fingerprint: Fingerprint | None = None
+    # set, instead of the expressions, for a statement transpiled from the template of its fingerprint
+    transpiled_sql: str | None = None
+
+
 @dataclass
 class ParserProblem:
     original_sql: str
-    parser_error: ParserError
+    parser_error: ParserError | ResourceLimitError
 
 
 class SqlglotEngine(TranspileEngine):
 
+    def __init__(
+        self,
+        max_templates: int = 0,
+        budget: Budget | None = None,
+    ):
+        """
+        With `max_templates` above zero, statements differing only in their literals are transpiled once, see
+        `fingerprint`, keeping the templates of the last `max_templates` fingerprints. Every statement is transpiled
+        by default.
+
+        Parsing or generating a statement, or transpiling a file, is interrupted once over `budget`, see `watchdog`:
+        the parser checks the budget on each token and the generator on each node. The statement, or the file, is
+        reported as a `ResourceLimitError` and the transpilation goes on. There is no limit by default.
+        """
+        self._max_templates = max_templates
+        self._budget = budget or Budget()
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._templates = StatementTemplates(self._max_templates) if self._max_templates > 0 else None
+        self._watchdog = Watchdog()
+
+    def __getstate__(self) -> dict[str, t.Any]:
+        # pool workers start with no templates, and their own watchdog
+        return {
+            "_max_templates": self._max_templates,
+            "_budget": self._budget,
+        }
+
+    def __setstate__(self, state: dict[str, t.Any]) -> None:
+        self.__dict__.update(state)
+        self._init_state()
+
+    def set_budget(self, budget: Budget | None) -> None:
+        self._budget = budget or Budget()
+
+    def set_max_templates(self, max_templates: int) -> None:
+        if max_templates != self._max_templates:
+            self._max_templates = max_templates
+            self._templates = StatementTemplates(max_templates) if max_templates > 0 else None
+
     @property
     def supported_dialects(self) -> list[str]:
-        return sorted(SQLGLOT_DIALECTS.keys())
+        return sorted(DIALECTS.keys())
 
-    def _partial_transpile(
+    def transpile(self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path) -> TranspileResult:
+        """
+        Tokenizes and parses the source once, one statement at a time, then runs the lateral column alias check
+        and the Databricks generation on the same syntax trees. A statement that fails to parse or generate
+        is reported as an error, the other statements are still transpiled.
+        """
+        return self._transpile(DIALECTS.get(source_dialect), DIALECTS.get(target_dialect), source_code, file_path)
+
+    def transpile_many(
+        self, source_dialect: str, target_dialect: str, sources: Iterable[str], file_path: Path
+    ) -> Iterator[TranspileResult]:
+        """
+        Transpiles each source in turn, like `transpile`, resolving the dialects once for all of them.
+        """
+        read_dialect = DIALECTS.get(source_dialect)
+        write_dialect = DIALECTS.get(target_dialect)
+        for source_code in sources:
+            yield self._transpile(read_dialect, write_dialect, source_code, file_path)
+
+    def _transpile(
+        self, read_dialect: Dialect, write_dialect: Dialect, source_code: str, file_path: Path
+    ) -> TranspileResult:
+        try:
+            with self._watchdog.guard(self._budget.file_seconds):
+                return self._transpile_within_budget(read_dialect, write_dialect, source_code, file_path)
+        except BudgetExceeded as e:
+            error = self._resource_limit_error(e, "file", source_code, None, file_path)
+            logger.error(f"Exception caught for file {file_path!s}: {error.error_msg}")
+            return TranspileResult("", 1, [error])
+
+    def _transpile_within_budget(
+        self, read_dialect: Dialect, write_dialect: Dialect, source_code: str, file_path: Path
+    ) -> TranspileResult:
+        try:
+            with span("tokenize"):
+                tokens = read_dialect.tokenize(sql=source_code)
+        except TokenError as e:
+            logger.error(f"Exception caught for file {file_path!s}: {e}")
+            error_msg = format_error_message("TOKEN ERROR", e, source_code)
+            return TranspileResult("", 1, [ParserError(file_path=file_path, error_msg=error_msg)])
+
+        # an empty source still holds one (empty) statement
+        chunks = self._make_chunks(tokens, source_code) or [("", [])]
+        templated = None
+        if self._templates is not None:
+            fingerprints = self._fingerprint_statements(read_dialect, write_dialect, chunks, file_path, source_code)
+            templated = partial(self._templated, read_dialect, write_dialect, source_code, chunks, fingerprints)
+        statements, problems = self._parse_statements(read_dialect, chunks, file_path, source_code, templated)
+        if not problems:
+            error: TranspileError | None = self._check_supported(statements, file_path)
+            if error:
+                return TranspileResult(str(file_path), 1, [error])
+
+        # statements are only templated once they passed the checks of a file without problems
+        generated = self._generate_statements(write_dialect, statements, file_path, record=not problems)
+        collapsed = sum(statement.transpiled_sql is not None for statement in statements)
+        if not problems and all(isinstance(outcome, list) for _, outcome in generated):
+            transpiled_expressions = [sql for _, outcome in generated if isinstance(outcome, list) for sql in outcome]
+            return TranspileResult("\n".join(transpiled_expressions), len(transpiled_expressions), [], collapsed)
+        result = self._partial_result(generated, problems, file_path)
+        result.statements_collapsed = collapsed
+        return result
+
+    def _fingerprint_statements(
         self,
         read_dialect: Dialect,
         write_dialect: Dialect,
+        chunks: list[tuple[str, list[Token]]],
+        file_path: Path,
         source_code: str,
+    ) -> list[Fingerprint | None]:
+        """
+        Fingerprints the statement chunks. The first statement of a fingerprint repeated within the chunks is
+        transpiled on its own beforehand, so that the statements after it can be transpiled from a template.
+        """
+        assert self._templates is not None
+        with span("fingerprint"):
+            fingerprints = [
+                Fingerprint.from_tokens(read_dialect, write_dialect, tokens) if tokens else None for _, tokens in chunks
+            ]
+        repeats = Counter(fingerprint.key for fingerprint in fingerprints if fingerprint is not None)
+        for chunk, fingerprint in zip(chunks, fingerprints):
+            if fingerprint is None or repeats[fingerprint.key] < 2 or fingerprint.key in self._templates:
+                continue
+            statements, problems = self._parse_statements(
+                read_dialect, [chunk], file_path, source_code, partial(self._untemplated, fingerprint)
+            )
+            if not problems and not self._check_supported(statements, file_path):
+                self._generate_statements(write_dialect, statements, file_path, record=True)
+        return fingerprints
+
+    @staticmethod
+    def _untemplated(fingerprint: Fingerprint, _: int) -> tuple[Fingerprint | None, str | None]:
+        return fingerprint, None
+
+    def _templated(
+        self,
+        read_dialect: Dialect,
+        write_dialect: Dialect,
+        source_code: str,
+        chunks: list[tuple[str, list[Token]]],
+        fingerprints: list[Fingerprint | None],
+        index: int,
+    ) -> tuple[Fingerprint | None, str | None]:
+        """
+        Returns the fingerprint of the statement chunk at `index`, with the statement transpiled from the template
+        of the fingerprint, None if there is no template for it.
+        """
+        fingerprint = fingerprints[index]
+        if fingerprint is None or self._templates is None:
+            return None, None
+        tokens = chunks[index][1]
+
+        def transpile_probe() -> str | None:
+            try:
+                expressions = read_dialect.parser(error_level=ErrorLevel.RAISE).parse(
+                    fingerprint.probe_tokens(tokens), source_code
+                )
+                if len(expressions) != 1 or expressions[0] is None:
+                    return None
+                if not fingerprint.has_opaque_literals(expressions[0]):
+                    return None
+                return write_dialect.generate(expressions[0], copy=False, pretty=True)
+            except (ParseError, TokenError, UnsupportedError):
+                return None
+
+        with span("template"):
+            return fingerprint, self._templates.transpile(fingerprint, write_dialect, transpile_probe)
+
+    def _generate_statements(
+        self, write_dialect: Dialect, statements: list[ParsedStatement], file_path: Path, record: bool = False
+    ) -> list[tuple[ParsedStatement, list[str] | ParserProblem]]:
+        generated: list[tuple[ParsedStatement, list[str] | ParserProblem]] = []
+        for statement in statements:
+            self._watchdog.checkpoint()
+            if statement.transpiled_sql is not None:
+                generated.append((statement, [statement.transpiled_sql]))
+                continue
+            try:
+                with self._statement_guard(), span("generate"):
+                    transpiled_sqls = [
+                        self._generate(write_dialect, expression) if expression else ""
+                        for expression in statement.expressions
+                    ]
+                generated.append((statement, transpiled_sqls))
+            except (ParseError, TokenError, UnsupportedError) as e:
+                generated.append((statement, self._generation_problem(e, statement.original_sql, file_path)))
+                continue
+            except BudgetExceeded as e:
+                sql = statement.original_sql
+                error = self._resource_limit_error(e, "generate", sql, None, file_path)
+                generated.append((statement, ParserProblem(sql, error)))
+                continue
+            if (
+                record
+                and self._templates is not None
+                and statement.fingerprint
+                and self._is_templatable(transpiled_sqls)
+            ):
+                self._templates.record(statement.fingerprint, transpiled_sqls[0])
+        return generated
+
+    def _statement_guard(self) -> AbstractContextManager[None]:
+        return self._watchdog.guard(self._budget.statement_seconds, self._budget.statement_memory_mb)
+
+    def _generate(self, write_dialect: Dialect, expression: Expression) -> str:
+        generator = write_dialect.generator(pretty=True)
+        if not self._budget.unlimited:
+            # the generator goes through `sql` for each node of the syntax tree
+            self._watchdog.instrument(generator, "sql")
+        return generator.generate(expression, copy=False)
+
+    @staticmethod
+    def _is_templatable(transpiled_sqls: list[str]) -> bool:
+        # comments stand for unsupported statements, see `_partial_result`
+        return len(transpiled_sqls) == 1 and bool(transpiled_sqls[0]) and not transpiled_sqls[0].startswith("--")
+
+    def _partial_result(
+        self,
+        generated: list[tuple[ParsedStatement, list[str] | ParserProblem]],
+        problems: list[ParserProblem],
         file_path: Path,
-    ) -> tuple[list[str], list[ParserProblem]]:
+    ) -> TranspileResult:
         transpiled_sqls: list[str] = []
-        parsed_expressions, problem_list = self.safe_parse(read_dialect, source_code, file_path)
-        for parsed_expression in parsed_expressions:
-            try:
-                transpiled_sql = write_dialect.generate(parsed_expression.parsed_expression, pretty=True)
-                # Checking if the transpiled SQL is a comment and raise an error
-                if transpiled_sql.startswith("--"):
-                    raise UnsupportedError("Unsupported SQL")
-                transpiled_sqls.append(transpiled_sql)
-            except ParseError as e:
-                error_msg = format_error_message("Parsing Error", e, parsed_expression.original_sql)
-                problem_list.append(ParserProblem(parsed_expression.original_sql, ParserError(file_path, error_msg)))
-            except UnsupportedError as e:
-                error_msg = format_error_message("Unsupported SQL Error", e, parsed_expression.original_sql)
-                problem_list.append(ParserProblem(parsed_expression.original_sql, ParserError(file_path, error_msg)))
-            except TokenError as e:
-                error_msg = format_error_message("Token Error", e, parsed_expression.original_sql)
-                problem_list.append(ParserProblem(parsed_expression.original_sql, ParserError(file_path, error_msg)))
-        return transpiled_sqls, problem_list
+        for statement, outcome in generated:
+            if isinstance(outcome, ParserProblem):
+                problems.append(outcome)
+            elif outcome[0].startswith("--"):
+                # Checking if the transpiled SQL is a comment and report it as unsupported
+                unsupported = UnsupportedError("Unsupported SQL")
+                problems.append(self._generation_problem(unsupported, statement.original_sql, file_path))
+            else:
+                transpiled_sqls.append(outcome[0])
+        logger.error(f"Exception caught for file {file_path!s}: {problems[0].parser_error.error_msg}")
+        return TranspileResult("\n".join(transpiled_sqls), 1, [problem.parser_error for problem in problems])
 
-    def transpile(self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path) -> TranspileResult:
-        read_dialect = get_dialect(source_dialect)
-        error: TranspileError | None = self._check_supported(read_dialect, source_code, file_path)
-        if error:
-            return TranspileResult(str(file_path), 1, [error])
-        write_dialect = get_dialect(target_dialect)
-        try:
-            transpiled_expressions = transpile(
-                source_code, read=read_dialect, write=write_dialect, pretty=True, error_level=ErrorLevel.RAISE
-            )
-            transpiled_code = "\n".join(transpiled_expressions)
-            return TranspileResult(transpiled_code, len(transpiled_expressions), [])
-        except (ParseError, TokenError, UnsupportedError) as e:
-            logger.error(f"Exception caught for file {file_path!s}: {e}")
-            transpiled_expressions, problems = self._partial_transpile(
-                read_dialect, write_dialect, source_code, file_path
-            )
-            transpiled_code = "\n".join(transpiled_expressions)
-            return TranspileResult(transpiled_code, 1, [problem.parser_error for problem in problems])
+    @staticmethod
+    def _generation_problem(
+        error: ParseError | TokenError | UnsupportedError, sql: str, file_path: Path
+    ) -> ParserProblem:
+        if isinstance(error, ParseError):
+            error_type = "Parsing Error"
+        elif isinstance(error, UnsupportedError):
+            error_type = "Unsupported SQL Error"
+        else:
+            error_type = "Token Error"
+        error_msg = format_error_message(error_type, error, sql)
+        return ParserProblem(sql, ParserError(file_path, error_msg))
+
+    @staticmethod
+    def _resource_limit_error(
+        error: BudgetExceeded, phase: str, sql: str, tokens: list[Token] | None, file_path: Path
+    ) -> ResourceLimitError:
+        sql_tokens = len(tokens) if tokens is not None else 0
+        size = f"{len(sql)} characters" + (f", {sql_tokens} tokens" if tokens is not None else "")
+        details = f"{error} while {_PHASE_DESCRIPTIONS[phase]} ({size})"
+        quoted_sql = sql if len(sql) <= _QUOTED_SQL_LENGTH else f"{sql[:_QUOTED_SQL_LENGTH]}..."
+        return ResourceLimitError(
+            file_path,
+            format_error_message("RESOURCE LIMIT ERROR", ValueError(details), quoted_sql),
+            phase,
+            error.resource,
+            round(error.elapsed_seconds, 3),
+            round(error.memory_mb, 1) if error.memory_mb is not None else None,
+            len(sql),
+            sql_tokens,
+        )
 
     def parse(
         self, source_dialect: str, source_sql: str, file_path: Path
@@ -119,48 +369,92 @@ class SqlglotEngine(TranspileEngine):
     ) -> tuple[list[ParsedExpression], list[ParserProblem]]:
         try:
             tokens = read_dialect.tokenize(sql=source_code)
-            return self._safe_parse(read_dialect, tokens, file_path)
+            return self._safe_parse(read_dialect, tokens, file_path, source_code)
         except TokenError as e:
             error_msg = format_error_message("TOKEN ERROR", e, source_code)
             return [], [ParserProblem(source_code, ParserError(file_path=file_path, error_msg=error_msg))]
 
     def _safe_parse(
-        self, read_dialect: Dialect, all_tokens: list[Token], file_path: Path
+        self, read_dialect: Dialect, all_tokens: list[Token], file_path: Path, source_code: str
     ) -> tuple[list[ParsedExpression], list[ParserProblem]]:
-        chunks = self._make_chunks(all_tokens)
-        parsed_expressions: list[ParsedExpression] = []
+        chunks = self._make_chunks(all_tokens, source_code)
+        statements, problems = self._parse_statements(read_dialect, chunks, file_path, source_code)
+        parsed_expressions = [
+            ParsedExpression(statement.original_sql, t.cast(Expression, statement.expressions[0]))
+            for statement in statements
+        ]
+        return parsed_expressions, problems
+
+    def _parse_statements(
+        self,
+        read_dialect: Dialect,
+        chunks: list[tuple[str, list[Token]]],
+        file_path: Path,
+        source_code: str | None,
+        templated: Callable[[int], tuple[Fingerprint | None, str | None]] | None = None,
+    ) -> tuple[list[ParsedStatement], list[ParserProblem]]:
+        """
+        Parses each statement chunk on its own. Chunks end on a semicolon, so parsing them one by one yields
+        the same expressions as parsing the whole token list at once. The source code is handed to the parser
+        as token offsets refer to it, e.g. when a statement is kept as a raw command.
+
+        Statements `templated` transpiles from the template of their fingerprint, given their index, are not parsed.
+        """
+        statements: list[ParsedStatement] = []
         problems: list[ParserProblem] = []
         parser_opts = {"error_level": ErrorLevel.RAISE}
         parser = read_dialect.parser(**parser_opts)
-        for sql, tokens in chunks:
+        if not self._budget.unlimited:
+            # the parser goes through `_advance` for each token, backtracking included
+            self._watchdog.instrument(parser, "_advance")
+        for index, (sql, tokens) in enumerate(chunks):
+            self._watchdog.checkpoint()
             try:
-                expressions = parser.parse(tokens)
-                expression = t.cast(Expression, expressions[0])
-                parsed_expressions.append(ParsedExpression(sql, expression))
+                with self._statement_guard():
+                    statements.append(self._parse_statement(parser, sql, tokens, source_code, templated, index))
             except (ParseError, TokenError, UnsupportedError) as e:
                 error_msg = format_error_message("PARSING ERROR", e, sql)
                 problems.append(ParserProblem(sql, ParserError(file_path, error_msg)))
+            except BudgetExceeded as e:
+                problems.append(ParserProblem(sql, self._resource_limit_error(e, "parse", sql, tokens, file_path)))
             finally:
                 parser.reset()
-        return parsed_expressions, problems
+        return statements, problems
+
+    @staticmethod
+    def _parse_statement(
+        parser: Parser,
+        sql: str,
+        tokens: list[Token],
+        source_code: str | None,
+        templated: Callable[[int], tuple[Fingerprint | None, str | None]] | None,
+        index: int,
+    ) -> ParsedStatement:
+        fingerprint, transpiled_sql = templated(index) if templated else (None, None)
+        if transpiled_sql is not None:
+            return ParsedStatement(sql, [], fingerprint, transpiled_sql)
+        with span("parse"):
+            expressions = parser.parse(tokens, source_code)
+        return ParsedStatement(sql, expressions, fingerprint)
 
     @staticmethod
-    def _make_chunks(tokens: list[Token]) -> list[tuple[str, list[Token]]]:
+    def _make_chunks(tokens: list[Token], source_code: str) -> list[tuple[str, list[Token]]]:
+        """
+        Splits the tokens into statements ending on a semicolon. The original SQL of each statement is sliced
+        from the source code, from the start of its first token to the end of its last one, so it keeps the
+        original formatting and the comments in between.
+        """
         chunks: list[tuple[str, list[Token]]] = []
-        current_chunk: list[Token] = []
-        # Split tokens into chunks based on semicolons(or other separators)
-        # Need to define the separator in Class Tokenizer
-        for token in tokens:
-            current_chunk.append(token)
-            if token.token_type in {TokenType.SEMICOLON}:
-                original_sql = " ".join([token.text for token in current_chunk]).strip()
-                chunks.append((original_sql, current_chunk))
-                # reset
-                current_chunk = []
+        chunk_start = 0
+        for index, token in enumerate(tokens):
+            if token.token_type == TokenType.SEMICOLON:
+                chunk = tokens[chunk_start : index + 1]
+                chunks.append((source_code[chunk[0].start : token.end + 1].strip(), chunk))
+                chunk_start = index + 1
         # don't forget the last chunk
-        if current_chunk:
-            original_sql = " ".join([token.text for token in current_chunk]).strip()
-            chunks.append((original_sql, current_chunk))
+        if chunk_start < len(tokens):
+            chunk = tokens[chunk_start:]
+            chunks.append((source_code[chunk[0].start : chunk[-1].end + 1].strip(), chunk))
         return chunks
 
     @staticmethod
@@ -168,5 +462,7 @@ class SqlglotEngine(TranspileEngine):
         table = expression.find(exp.Table, bfs=False)
         return table.name if table else ""
 
-    def _check_supported(self, source_dialect: Dialect, source_code: str, file_path: Path) -> ValidationError | None:
-        return lca_utils.check_for_unsupported_lca(source_dialect, source_code, file_path)
+    def _check_supported(self, statements: list[ParsedStatement], file_path: Path) -> ValidationError | None:
+        expressions = [expression for statement in statements for expression in statement.expressions]
+        with span("lca_check"):
+            return lca_utils.find_unsupported_lca(expressions, file_path)
@@ -0,0 +1,175 @@
+import re
+from collections.abc import Iterator
+from typing import TextIO
+
+from sqlglot import Dialect
+from sqlglot.tokens import TokenType
+
+# The statement terminator and the keywords delimiting procedural blocks, the other code changing the splitter
+# state being the delimiters of comments and quoted text
+_TERMINATOR_AND_KEYWORDS = r";|\b(?:BEGIN|END|CASE)\b"
+_NEXT_WORD = re.compile(r"\s*(\w+|;)?")
+# the delimiters split by without a dialect: comments, string literals and quoted identifiers in any of the usual
+# quotes, escaped by a backslash or doubled, and dollar-quoted bodies
+_DEFAULT_COMMENTS = {"--": "\n", "/*": "*/", "$$": "$$"}
+_DEFAULT_QUOTES = {quote: (quote, frozenset({"\\", quote})) for quote in ("'", '"', "`")}
+# BEGIN followed by one of these starts a transaction, not a block
+_TRANSACTION_WORDS = {"TRANSACTION", "TRAN", "WORK", "DISTRIBUTED", ";", ""}
+# END followed by one of these closes a construct the splitter does not track
+_UNTRACKED_BLOCKS = {"IF", "LOOP", "WHILE", "FOR", "REPEAT"}
+# the longest text that must be visible past a match: a keyword, the word after it or an escaped quote
+_LOOKAHEAD = 64
+
+
+def dialect_delimiters(dialect: Dialect) -> tuple[dict[str, str], dict[str, tuple[str, frozenset[str]]]]:
+    """
+    Returns the delimiters of the text the splitter skips in `dialect`, from the tables of its tokenizer: the end of
+    each comment, dollar-quoted body or raw string, and the end and escapes of each string literal or quoted
+    identifier. An escape that is also a quote only escapes the end it doubles, as in the tokenizer.
+    """
+    # pylint: disable=protected-access
+    tokenizer = dialect.tokenizer_class
+    comments = {start: end or "\n" for start, end in tokenizer._COMMENTS.items()}
+    comments["$$"] = "$$"
+    for start, (end, token_type) in tokenizer._FORMAT_STRINGS.items():
+        # prefixed strings, e.g. N'...', start with a word, which the quote following it is enough to skip
+        if token_type == TokenType.RAW_STRING and end and not start[0].isalnum():
+            comments.setdefault(start, end)
+    quotes: dict[str, tuple[str, frozenset[str]]] = {}
+    for start, end in tokenizer._QUOTES.items():
+        escapes = {escape for escape in tokenizer._STRING_ESCAPES if escape == end or escape not in tokenizer._QUOTES}
+        quotes[start] = (end, frozenset(escapes))
+    for start, end in tokenizer._IDENTIFIERS.items():
+        quotes.setdefault(start, (end, frozenset({end})))
+    return comments, quotes
+
+
+class _StatementSplitter:
+    def __init__(self, dialect: Dialect | None):
+        if dialect is None:
+            self._comments, quotes = _DEFAULT_COMMENTS, _DEFAULT_QUOTES
+        else:
+            self._comments, quotes = dialect_delimiters(dialect)
+        self._quote_end = {start: end for start, (end, _) in quotes.items()}
+        self._doubled = {start for start, (end, escapes) in quotes.items() if end in escapes}
+        # the end of a quoted text and the characters escaping the next one in it
+        self._quoted_text = {
+            start: re.compile("|".join(re.escape(token) for token in sorted({end, *escapes}, key=len, reverse=True)))
+            for start, (end, escapes) in quotes.items()
+        }
+        # the longest delimiters first, so that e.g. `/*+` is not lexed as `/*` or `'''` as `'`
+        starts = sorted(quotes.keys() | self._comments.keys(), key=len, reverse=True)
+        self._code = re.compile(
+            "|".join([*(re.escape(start) for start in starts), _TERMINATOR_AND_KEYWORDS]), re.IGNORECASE
+        )
+        self._state: str | None = None
+        self._depth = 0
+        self._pieces: list[str] = []
+        self.tail = ""
+
+    def feed(self, buffer: str, final: bool) -> Iterator[str]:
+        """
+        Yields the statements completed in `buffer`. The text past the last position that could be scanned
+        without seeing more input is kept in `tail`, to be fed again with the next chunk.
+        """
+        safe_end = len(buffer) if final else max(0, len(buffer) - _LOOKAHEAD)
+        start = pos = 0
+        while pos < safe_end:
+            if self._state is None:
+                pos, terminated = self._scan_code(buffer, pos, safe_end)
+                if terminated:
+                    yield self._take(buffer[start:pos])
+                    start = pos
+                continue
+            if self._state in self._quoted_text:
+                pos = self._skip_quoted(buffer, pos, safe_end)
+            else:
+                pos = self._skip_comment(buffer, pos, safe_end)
+        self._pieces.append(buffer[start:pos])
+        self.tail = buffer[pos:]
+        if final:
+            statement = self._take("")
+            if statement.strip():
+                yield statement
+
+    def _scan_code(self, buffer: str, pos: int, safe_end: int) -> tuple[int, bool]:
+        """
+        Scans code up to the next token that changes the state and returns the position after it
+        and whether it terminated a statement.
+        """
+        match = self._code.search(buffer, pos)
+        if match is None or match.start() >= safe_end:
+            return safe_end, False
+        token = match.group(0)
+        if token == ";":
+            return match.end(), self._depth == 0
+        if token in self._quoted_text or token in self._comments:
+            self._state = token
+            return match.end(), False
+        return self._keyword(token.upper(), buffer, match.end()), False
+
+    def _skip_comment(self, buffer: str, pos: int, safe_end: int) -> int:
+        assert self._state is not None
+        closing = self._comments[self._state]
+        end = buffer.find(closing, pos)
+        if end < 0 or end >= safe_end:
+            return safe_end
+        self._state = None
+        return end + len(closing)
+
+    def _skip_quoted(self, buffer: str, pos: int, safe_end: int) -> int:
+        assert self._state is not None
+        match = self._quoted_text[self._state].search(buffer, pos)
+        if match is None or match.start() >= safe_end:
+            return safe_end
+        end = self._quote_end[self._state]
+        if match.group(0) != end:
+            # an escape, the character after it does not close the quoted text
+            return match.end() + 1
+        if self._state in self._doubled and buffer.startswith(end, match.end()):
+            # a doubled end does not close the quoted text
+            return match.end() + len(end)
+        self._state = None
+        return match.end()
+
+    def _keyword(self, keyword: str, buffer: str, pos: int) -> int:
+        next_word_match = _NEXT_WORD.match(buffer, pos)
+        next_word = (next_word_match.group(1) or "").upper() if next_word_match else ""
+        if keyword == "CASE" or (keyword == "BEGIN" and next_word not in _TRANSACTION_WORDS):
+            self._depth += 1
+        elif keyword == "END" and next_word not in _UNTRACKED_BLOCKS:
+            self._depth = max(0, self._depth - 1)
+            if next_word == "CASE" and next_word_match:
+                # END CASE closes the block opened by CASE, it does not open another one
+                return next_word_match.end()
+        return pos
+
+    def _take(self, text: str) -> str:
+        self._pieces.append(text)
+        statement = "".join(self._pieces)
+        self._pieces = []
+        return statement
+
+
+def split_statements(stream: TextIO, dialect: Dialect | None = None, chunk_size: int = 1 << 20) -> Iterator[str]:
+    """
+    Splits the SQL read from `stream` into statements, reading it `chunk_size` characters at a time,
+    so that memory stays bounded by the largest statement rather than by the size of the input.
+
+    Statements end at semicolons outside of string literals, quoted identifiers, comments, dollar-quoted bodies
+    and BEGIN ... END or CASE ... END blocks. Each statement is yielded with its terminating semicolon and the
+    whitespace and comments preceding it, so joining the statements gives back the input.
+
+    :param stream: The SQL input.
+    :param dialect: The source dialect, whose tokenizer tells the delimiters of comments, string literals and
+        quoted identifiers and the escapes in them, e.g. the `//` comments of Snowflake or the `[...]` identifiers
+        of T-SQL. Without it, `--` and `/* */` comments and text quoted by `'`, `"` or a backtick are skipped, in
+        which a backslash or a doubled quote escapes a quote.
+    :param chunk_size: The number of characters read at a time.
+    """
+    splitter = _StatementSplitter(dialect)
+    while True:
+        chunk = stream.read(chunk_size)
+        yield from splitter.feed(splitter.tail + chunk, final=not chunk)
+        if not chunk:
+            return
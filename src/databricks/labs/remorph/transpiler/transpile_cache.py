@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+import sqlglot
+
+from databricks.labs.remorph.__about__ import __version__
+from databricks.labs.remorph.config import TranspileResult
+from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
+from databricks.labs.remorph.transpiler.transpile_status import TranspileError
+
+logger = logging.getLogger(__name__)
+
+
+class TranspileCache:
+    """
+    On-disk cache of transpile results, content addressed by a hash of the source code, the source dialect,
+    the target dialect, the file path (error messages embed it), the transpiler and the remorph and sqlglot versions.
+    The transpiler is identified by the class of its engine and a digest of its config file, see `transpiler_id`,
+    so that transpilers sharing a cache folder never serve each other's results.
+
+    Entries are stored as `entries/<key>.json`. The `index.json` file maps each transpiled file to its current
+    key, so entries for changed, removed or previously versioned files can be evicted after a run.
+    """
+
+    def __init__(self, cache_dir: Path, transpiler: str):
+        self._cache_dir = cache_dir
+        self._transpiler = transpiler
+        self._entries_dir = cache_dir / "entries"
+        self._index_file = cache_dir / "index.json"
+
+    @staticmethod
+    def transpiler_id(transpiler: TranspileEngine, transpiler_config_path: str) -> str:
+        """Identifies `transpiler` by the class of its engine and a digest of its config file, if any"""
+        engine = type(transpiler)
+        config_path = Path(transpiler_config_path)
+        if config_path.is_file():
+            config = hashlib.sha256(config_path.read_bytes()).hexdigest()
+        else:
+            config = transpiler_config_path
+        return f"{engine.__module__}.{engine.__qualname__}:{config}"
+
+    def key(self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path) -> str:
+        digest = hashlib.sha256()
+        parts = (__version__, sqlglot.__version__, self._transpiler, source_dialect, target_dialect, str(file_path))
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        digest.update(source_code.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> TranspileResult | None:
+        entry = self._entries_dir / f"{key}.json"
+        try:
+            data = json.loads(entry.read_text(encoding="utf-8"))
+            errors = [TranspileError.from_dict(error) for error in data["errors"]]
+            return TranspileResult(
+                data["transpiled_code"], data["success_count"], errors, data.get("statements_collapsed", 0)
+            )
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring corrupt transpile cache entry {entry}: {e}")
+            return None
+
+    def put(self, key: str, result: TranspileResult) -> None:
+        data: dict[str, Any] = {
+            "transpiled_code": result.transpiled_code,
+            "success_count": result.success_count,
+            "statements_collapsed": result.statements_collapsed,
+            "errors": [error.as_dict() for error in result.error_list],
+        }
+        self._entries_dir.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(self._entries_dir / f"{key}.json", json.dumps(data))
+
+    def evict_stale(self, input_path: Path, keys_by_file: dict[Path, str]) -> int:
+        """
+        Records the keys of the files transpiled in this run and evicts every entry that is no longer referenced:
+        entries of files that changed, of files under `input_path` that were removed, and entries written by
+        other transpilers or remorph or sqlglot versions.
+
+        :return: The number of evicted entries.
+        """
+        index = self._load_index()
+        root = input_path.resolve()
+        for file_name in list(index):
+            if Path(file_name).is_relative_to(root):
+                del index[file_name]
+        index.update({str(file.resolve()): key for file, key in keys_by_file.items()})
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(self._index_file, json.dumps(index, indent=1, sort_keys=True))
+
+        live_keys = set(index.values())
+        evicted = 0
+        if self._entries_dir.exists():
+            for entry in self._entries_dir.glob("*.json"):
+                if entry.stem not in live_keys:
+                    entry.unlink(missing_ok=True)
+                    evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} stale entries from transpile cache {self._cache_dir}")
+        return evicted
+
+    def _load_index(self) -> dict[str, str]:
+        try:
+            index = json.loads(self._index_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring corrupt transpile cache index {self._index_file}: {e}")
+            return {}
+        return index if isinstance(index, dict) else {}
+
+    @staticmethod
+    def _write_atomic(path: Path, content: str) -> None:
+        # pool workers may write the same entry concurrently, so never expose a partially written file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(content, encoding="utf-8")
+        os.replace(tmp_path, path)
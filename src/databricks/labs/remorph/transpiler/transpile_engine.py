@@ -1,9 +1,11 @@
 from __future__ import annotations
 import abc
 from collections.abc import Iterable
+from concurrent.futures import Future
 from pathlib import Path
 
 from databricks.labs.remorph.config import TranspileResult
+from databricks.labs.remorph.helpers.futures import completed
 
 
 class TranspileEngine(abc.ABC):
@@ -35,6 +37,23 @@ class TranspileEngine(abc.ABC):
         self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path
     ) -> TranspileResult: ...
 
+    def submit(
+        self, source_dialect: str, target_dialect: str, source_code: str, file_path: Path
+    ) -> Future[TranspileResult]:
+        """
+        Starts transpiling the source and returns a future of the result. Engines able to transpile several sources
+        at once, such as a language server, override it; by default the source is transpiled before returning.
+        """
+        return completed(self.transpile(source_dialect, target_dialect, source_code, file_path))
+
+    @property
+    def max_in_flight(self) -> int:
+        """The number of sources worth submitting before waiting for the first result."""
+        return 1
+
+    def close(self) -> None:
+        """Releases the resources held by the engine, e.g. external processes. The engine can still be used."""
+
     @property
     @abc.abstractmethod
     def supported_dialects(self) -> list[str]: ...
@@ -1,6 +1,7 @@
 import abc
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from pathlib import Path
+from typing import Any
 
 
 @dataclass
@@ -11,6 +12,24 @@ class TranspileError(abc.ABC):
     def __str__(self):
         return f"{type(self).__name__}(file_path='{self.file_path!s}', error_msg='{self.error_msg}')"
 
+    def as_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {"type": type(self).__name__, "file_path": str(self.file_path)}
+        for error_field in fields(self):
+            if error_field.name != "file_path":
+                data[error_field.name] = getattr(self, error_field.name)
+        return data
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> "TranspileError":
+        """Restores an error serialized with `as_dict`, raising a `KeyError` for an unknown error type."""
+        error_type = ERROR_TYPES[data["type"]]
+        details = {
+            error_field.name: data[error_field.name]
+            for error_field in fields(error_type)
+            if error_field.name not in {"file_path", "error_msg"} and error_field.name in data
+        }
+        return error_type(Path(data["file_path"]), data["error_msg"], **details)
+
 
 @dataclass
 class ParserError(TranspileError):
@@ -22,10 +41,62 @@ class ValidationError(TranspileError):
     pass
 
 
+@dataclass
+class ResourceLimitError(TranspileError):
+    """A statement, or a whole file, interrupted for running over its wall-clock or memory budget."""
+
+    # the phase interrupted: parse or generate for a statement, file for a whole file
+    phase: str = ""
+    # the budget exceeded: time or memory
+    resource: str = ""
+    elapsed_seconds: float = 0.0
+    # the memory used, only measured under a memory budget
+    memory_mb: float | None = None
+    sql_chars: int = 0
+    sql_tokens: int = 0
+
+
+ERROR_TYPES: dict[str, type[TranspileError]] = {
+    ParserError.__name__: ParserError,
+    ValidationError.__name__: ValidationError,
+    ResourceLimitError.__name__: ResourceLimitError,
+}
+
+
+def summarize_errors(errors: list[TranspileError]) -> tuple[str | None, str | None]:
+    """Returns the type of the first error and the messages of all of them joined by newlines, None without errors"""
+    if not errors:
+        return None, None
+    return type(errors[0]).__name__, "\n".join(error.error_msg for error in errors)
+
+
 @dataclass
 class TranspileStatus:
-    file_list: list[Path]
+    """
+    Counters of a transpile run. The errors themselves are written to the error log as they occur,
+    only the first `ERROR_SAMPLE_SIZE` of them are kept in `error_sample`.
+    """
+
+    ERROR_SAMPLE_SIZE = 100
+
+    files_processed: int
     no_of_transpiled_queries: int
     parse_error_count: int
     validate_error_count: int
-    error_list: list[TranspileError]
+    error_sample: list[TranspileError] = field(default_factory=list)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    # statements transpiled from the template of a statement differing only in its literals
+    statements_collapsed: int = 0
+    resource_limit_error_count: int = 0
+
+    def add_errors(self, errors: list[TranspileError]) -> None:
+        for error in errors:
+            if isinstance(error, ParserError):
+                self.parse_error_count += 1
+            elif isinstance(error, ValidationError):
+                self.validate_error_count += 1
+            elif isinstance(error, ResourceLimitError):
+                self.resource_limit_error_count += 1
+            if len(self.error_sample) < self.ERROR_SAMPLE_SIZE:
+                self.error_sample.append(error)
@@ -0,0 +1,257 @@
+"""
+Token-level triage of SQL files, to size a migration before transpiling it.
+
+A full transpile parses every statement, which is too slow to run over hundreds of thousands of files only to find
+out which of them need attention. The triage scanner never parses: it lexes each file with regular expressions built
+from the delimiters the statement splitter takes from the source dialect tokenizer, its quotes, escapes, quoted
+identifiers and comments, blanks the literals and comments out, and counts on the remaining code:
+
+- the statements, separated by semicolons as the transpiler splits them;
+- the procedural constructs: blocks, declarations, control flow, cursors, exception handlers and the creation of
+  procedures, functions and triggers;
+- the calls of functions the source dialect parser knows but the Databricks one does not;
+- the dynamic SQL: `EXECUTE IMMEDIATE`, `EXEC (...)`, `sp_executesql`, `PREPARE ... FROM` and `DBMS_SQL`;
+- the lateral column alias suspects: a column alias referenced again, unqualified, before the end of the projection
+  and filters of its statement, e.g. in the `WHERE` clause or a window, which is checked and rewritten on transpile.
+
+The counts are heuristics meant for sizing, not for correctness. Each file is summarized in a row of a CSV file.
+"""
+
+import csv
+import logging
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import astuple, dataclass, fields
+from pathlib import Path
+
+from sqlglot.parser import Parser
+
+from databricks.labs.remorph.helpers.file_utils import get_sql_file, is_sql_file
+from databricks.labs.remorph.helpers.string_utils import remove_bom
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.statement_splitter import dialect_delimiters
+
+logger = logging.getLogger(__name__)
+
+# characters of unquoted identifiers and variables, e.g. `@var` in T-SQL or `$1` in Snowflake
+_WORD = r"[^\W\d][\w$@#]*"
+
+_PROCEDURAL = re.compile(
+    r"\b(?:"
+    r"CREATE\s+(?:OR\s+(?:REPLACE|ALTER)\s+)?(?:PROCEDURE|PROC|FUNCTION|TRIGGER|PACKAGE)"
+    # BEGIN opens a block, unless it starts a transaction
+    r"|BEGIN\b(?!\s*;|\s+(?:TRANSACTION|TRAN|WORK|DISTRIBUTED)\b)"
+    # IF is a statement, unless it is a function or an existence check
+    r"|IF\b(?!\s*\(|\s+(?:NOT\s+)?EXISTS\b)"
+    r"|DECLARE|CURSOR|LOOP|WHILE|ELSIF|ELSEIF|EXCEPTION|RAISE|RETURN"
+    r")\b",
+    re.IGNORECASE,
+)
+_DYNAMIC_SQL = re.compile(
+    rf"\b(?:EXECUTE\s+IMMEDIATE\b|EXEC(?:UTE)?\s*[(@]|SP_EXECUTESQL\b|PREPARE\s+{_WORD}\s+FROM\b|DBMS_SQL\s*\.)",
+    re.IGNORECASE,
+)
+_CALL = re.compile(rf"(?<![\w$@#.])({_WORD})\s*\(")
+# a column or table alias, not a type of a cast nor a common table expression
+_ALIAS = re.compile(rf"\bAS\s+({_WORD})(?!\s*[(.)]|[\w$@#])", re.IGNORECASE)
+# the end of the clauses a lateral column alias can be referenced in, an ORDER BY ending a window does not count
+_CLAUSE_END = re.compile(
+    r"\b(?:GROUP\s+BY|HAVING|QUALIFY|UNION|INTERSECT|EXCEPT|MINUS|ORDER\s+BY\b(?![^()]*\)))\b", re.IGNORECASE
+)
+_PARENTHESES = re.compile(r"[()]")
+_HAS_CODE = re.compile(r"\w")
+
+# the dialect Databricks SQL is transpiled to, whose functions are not specific to the source dialect
+_TARGET_DIALECT = "databricks"
+
+
+@dataclass
+class FileTriage:
+    file_path: str
+    source_dialect: str
+    bytes: int = 0
+    lines: int = 0
+    statements: int = 0
+    procedural: int = 0
+    dialect_functions: int = 0
+    dynamic_sql: int = 0
+    lca_suspects: int = 0
+    scan_error: str = ""
+    risk: str = "low"
+
+    @classmethod
+    def columns(cls) -> list[str]:
+        return [field.name for field in fields(cls)]
+
+    def assess(self) -> "FileTriage":
+        """Sets the risk of the file: high when it needs a manual review, medium when it needs a closer look"""
+        if self.dynamic_sql or self.scan_error:
+            self.risk = "high"
+        elif self.procedural or self.dialect_functions or self.lca_suspects:
+            self.risk = "medium"
+        else:
+            self.risk = "low"
+        return self
+
+
+def _quoted(start: str, end: str, escapes: frozenset[str]) -> str:
+    """Returns the pattern of the text quoted by `start` and `end`, in which `escapes` escape the next character"""
+    if len(end) > 1:
+        return rf"(?s:{re.escape(start)}.*?{re.escape(end)})"
+    excluded = re.escape(end + "".join(escape for escape in escapes if escape != end))
+    specials = [rf"{re.escape(escape)}." for escape in escapes if escape != end]
+    if end in escapes:
+        specials.append(re.escape(end * 2))
+    # unrolled as `normal* (special normal*)*`, which fails on an unterminated quote in linear time
+    body = rf"[^{excluded}]*"
+    if specials:
+        body += rf"(?:(?:{'|'.join(specials)})[^{excluded}]*)*"
+    return rf"(?s:{re.escape(start)}{body}{re.escape(end)})"
+
+
+def _renames_column(statement: str, alias_start: int, alias: str) -> bool:
+    """Tells whether the alias defined at `alias_start` only repeats the name of the column it aliases"""
+    end = alias_start
+    while end and statement[end - 1].isspace():
+        end -= 1
+    start = end - len(alias)
+    if start < 0 or statement[start:end].upper() != alias.upper():
+        return False
+    return start == 0 or not (statement[start - 1].isalnum() or statement[start - 1] in "_$@#")
+
+
+class TriageScanner:
+    """Scans the SQL files of a source dialect, see the module documentation. Holds no state between files."""
+
+    def __init__(self, source_dialect: str):
+        if source_dialect not in DIALECTS:
+            raise ValueError(f"Unsupported source dialect: {source_dialect}")
+        self._source_dialect = source_dialect
+        dialect = DIALECTS.get(source_dialect)
+        # the same delimiters as the statement splitter, so that both see the same code outside of them
+        comments, quotes = dialect_delimiters(dialect)
+        quoted: dict[str, str] = {}
+        line_comments: set[str] = set()
+        for start, end in comments.items():
+            if end == "\n":
+                quoted[start] = rf"{re.escape(start)}[^\n]*"
+                line_comments.add(start)
+            else:
+                quoted[start] = _quoted(start, end, frozenset())
+        for start, (end, escapes) in quotes.items():
+            quoted[start] = _quoted(start, end, escapes)
+        # the longest delimiters first, so that e.g. `/*+` is not lexed as `/*` or `"""` as `"`
+        starts = sorted(quoted, key=len, reverse=True)
+        self._quoted = re.compile("|".join(quoted[start] for start in starts))
+        self._unterminated = re.compile("|".join(re.escape(start) for start in starts if start not in line_comments))
+        self._keywords = {keyword for keyword in dialect.tokenizer_class.KEYWORDS if " " not in keyword}
+        self._dialect_functions = self._specific_functions(dialect.parser_class)
+
+    @staticmethod
+    def _specific_functions(parser: type[Parser]) -> frozenset[str]:
+        target = DIALECTS.get(_TARGET_DIALECT).parser_class
+        known = {*target.FUNCTIONS, *target.FUNCTION_PARSERS, *Parser.FUNCTIONS, *Parser.FUNCTION_PARSERS}
+        return frozenset(name for name in (*parser.FUNCTIONS, *parser.FUNCTION_PARSERS) if name not in known)
+
+    def scan(self, source_code: str, file_path: str | Path) -> FileTriage:
+        result = FileTriage(
+            str(file_path),
+            self._source_dialect,
+            bytes=len(source_code.encode("utf-8", "surrogatepass")),
+            lines=len(source_code.splitlines()),
+        )
+        code = self._quoted.sub(" ", source_code)
+        if self._unterminated.search(code):
+            result.scan_error = "unterminated quote or comment"
+        statements = [statement for statement in code.split(";") if _HAS_CODE.search(statement)]
+        result.statements = len(statements)
+        result.procedural = len(_PROCEDURAL.findall(code))
+        result.dynamic_sql = len(_DYNAMIC_SQL.findall(code))
+        functions = self._dialect_functions
+        result.dialect_functions = sum(name.upper() in functions for name in _CALL.findall(code))
+        result.lca_suspects = sum(self._lca_suspects(statement) for statement in statements)
+        return result.assess()
+
+    def _lca_suspects(self, statement: str) -> int:
+        definitions: dict[str, list[int]] = {}
+        for match in _ALIAS.finditer(statement):
+            alias = match.group(1)
+            if alias.upper() in self._keywords or _renames_column(statement, match.start(), alias):
+                continue
+            definitions.setdefault(alias.upper(), []).append(match.end())
+        if not definitions:
+            return 0
+        # an alias repeated by another definition, e.g. in another select, is not a reference
+        aliases = "|".join(re.escape(alias) for alias in definitions)
+        references = re.compile(rf"(\bAS\s+)?(?<![\w$@#.])({aliases})(?![\w$@#]|\s*\.)", re.IGNORECASE)
+        scope_ends: dict[int, int] = {}
+        suspects = set()
+        for reference in references.finditer(statement):
+            if reference.group(1):
+                continue
+            for definition_end in definitions[reference.group(2).upper()]:
+                if definition_end > reference.start():
+                    break
+                if definition_end not in scope_ends:
+                    scope_ends[definition_end] = self._scope_end(statement, definition_end)
+                if reference.start() < scope_ends[definition_end]:
+                    suspects.add(definition_end)
+        return len(suspects)
+
+    @staticmethod
+    def _scope_end(statement: str, start: int) -> int:
+        """Returns the end of the clauses following `start` at its nesting level, or of the query closing it"""
+        clause_end = _CLAUSE_END.search(statement, start)
+        end = clause_end.start() if clause_end else len(statement)
+        depth = 0
+        for parenthesis in _PARENTHESES.finditer(statement, start, end):
+            depth += 1 if parenthesis.group() == "(" else -1
+            if depth < 0:
+                return parenthesis.start()
+        return end
+
+    def scan_file(self, file_path: Path) -> FileTriage:
+        try:
+            with file_path.open("r", encoding="utf-8", errors="replace") as f:
+                source_code = f.read()
+        except OSError as e:
+            logger.warning(f"Could not read {file_path}: {e}")
+            return FileTriage(str(file_path), self._source_dialect, scan_error=type(e).__name__).assess()
+        return self.scan(remove_bom(source_code), file_path)
+
+
+def _input_files(input_source: Path) -> Iterator[Path]:
+    if input_source.is_dir():
+        yield from get_sql_file(input_source)
+    elif is_sql_file(input_source):
+        yield input_source
+
+
+def write_triage(rows: Iterable[FileTriage], output_file: Path) -> dict[str, int]:
+    """Writes `rows` to `output_file` as CSV, one at a time, and returns the number of files per risk"""
+    risks = {"low": 0, "medium": 0, "high": 0}
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with output_file.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FileTriage.columns())
+        for row in rows:
+            writer.writerow(astuple(row))
+            risks[row.risk] += 1
+    return risks
+
+
+def triage(source_dialect: str, input_source: str | Path, output_file: str | Path) -> dict[str, int | str]:
+    """
+    Scans the SQL files of `input_source`, a file or a folder, and writes a row per file to the CSV `output_file`.
+    :return: The number of files scanned, and per risk, and the path of the output file.
+    """
+    scanner = TriageScanner(source_dialect)
+    rows = (scanner.scan_file(file) for file in _input_files(Path(input_source)))
+    risks = write_triage(rows, Path(output_file))
+    return {
+        "total_files_processed": sum(risks.values()),
+        "low_risk_files": risks["low"],
+        "medium_risk_files": risks["medium"],
+        "high_risk_files": risks["high"],
+        "output_file": str(output_file),
+    }
@@ -0,0 +1,90 @@
+"""
+Per-expression overhead of transpiling column expressions one call at a time versus in a batch.
+
+    python -m tests.benchmarks.expression_throughput --expressions 20000 --workers 4
+
+`per-call` creates an engine and resolves the dialects for every expression, as `transpile_column_exp` used to do
+through `transpile_sql`. `batch` shares them through `transpile_expressions`, in this process and then across a
+process pool of `--workers` processes.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from databricks.labs.remorph.config import TranspileConfig
+from databricks.labs.remorph.transpiler.execute import transpile_expressions
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+
+# column expressions as found in the semantic layers of BI tools
+TEMPLATES = (
+    "nvl(col{i}, 0)",
+    "case when col{i} is null then 1 else 0 end",
+    "iff(col{i} > {i}, 'high', 'low')",
+    "to_date(col{i}, 'YYYY-MM-DD')",
+    "dateadd(day, {i}, col{i})",
+    "col{i} * 2 + col{j}",
+    "sum(col{i}) over (partition by col{j} order by col{i})",
+    "coalesce(col{i}, col{j}, '')",
+    "substr(col{i}, 1, {i})",
+    "current_timestamp()",
+)
+
+
+def expressions(count: int) -> list[str]:
+    return [TEMPLATES[i % len(TEMPLATES)].format(i=i, j=i + 1) for i in range(count)]
+
+
+def _per_call(config: TranspileConfig, sqls: Iterable[str]) -> int:
+    count = 0
+    for sql in sqls:
+        SqlglotEngine().transpile(config.source_dialect, config.target_dialect, sql, Path("inline_sql"))
+        count += 1
+    return count
+
+
+def _batch(config: TranspileConfig, sqls: Iterable[str]) -> int:
+    return sum(1 for _ in transpile_expressions(config, sqls))
+
+
+def _time(run: Callable[[TranspileConfig, Iterable[str]], int], config: TranspileConfig, sqls: list[str]) -> float:
+    start = time.perf_counter()
+    count = run(config, sqls)
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--expressions", type=int, default=20_000, help="number of expressions to transpile")
+    parser.add_argument("--workers", type=int, default=4, help="processes of the pool for the batch run")
+    parser.add_argument("--source-dialect", default="snowflake")
+    args = parser.parse_args(argv)
+
+    # the transpiler logs a warning for every unsupported construct, which would dominate the timings
+    logging.disable(logging.CRITICAL)
+    sqls = expressions(args.expressions)
+    config = TranspileConfig(transpiler_config_path="sqlglot", source_dialect=args.source_dialect)
+    # warm-up, so that the first run does not pay for the imports and the dialect class setup
+    _batch(config, sqls[:100])
+    runs = {
+        "per-call": _time(_per_call, config, sqls),
+        "batch": _time(_batch, config, sqls),
+    }
+    if args.workers > 1:
+        pool_config = TranspileConfig(
+            transpiler_config_path="sqlglot", source_dialect=args.source_dialect, workers=args.workers
+        )
+        runs[f"batch, {args.workers} workers"] = _time(_batch, pool_config, sqls)
+    logging.disable(logging.NOTSET)
+
+    print(f"{'run':<24}{'us/expression':>16}{'expressions/s':>16}")
+    for name, micros in runs.items():
+        print(f"{name:<24}{micros:>16.1f}{1e6 / micros:>16.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
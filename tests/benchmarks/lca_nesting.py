@@ -0,0 +1,71 @@
+"""
+Cost of the lateral column alias check and rewrite on deeply nested queries.
+
+    python -m tests.benchmarks.lca_nesting --depths 50 100 200 400
+
+Each query nests derived tables and `IN` subqueries `depth` levels deep, every level referencing its own aliases in
+its where clause and a window. `check` is `find_unsupported_lca`, `rewrite` is `unalias_lca` and `generate` is the
+whole Databricks generator, the rewrite included. Their time should grow linearly with the depth.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlglot import Expression, parse_one
+
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import get_dialect
+from databricks.labs.remorph.transpiler.sqlglot.generator.databricks import Databricks
+from databricks.labs.remorph.transpiler.sqlglot.lca_utils import find_unsupported_lca, unalias_lca
+
+
+def nested_query(depth: int) -> str:
+    sql = "SELECT c0 AS a0, c1 FROM t0"
+    for i in range(1, depth + 1):
+        if i % 2:
+            sql = (
+                f"SELECT c{i} + 1 AS a{i}, SUM(c{i}) OVER (PARTITION BY a{i}) AS s{i}, c1 "
+                f"FROM ({sql}) AS d{i} WHERE a{i} > {i}"
+            )
+        else:
+            sql = f"SELECT c{i} AS a{i}, c1 FROM t{i} WHERE a{i} IN ({sql})"
+    return sql
+
+
+def _time(run: Callable[[Expression], object], expression: Expression, repeat: int) -> float:
+    """Returns the best time of `repeat` runs on copies of `expression`, in milliseconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        copy = expression.copy()
+        start = time.perf_counter()
+        run(copy)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depths", type=int, nargs="+", default=[50, 100, 200, 400], help="nesting depths")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per depth, the best one is reported")
+    args = parser.parse_args(argv)
+
+    # the parser and the generator recurse once per nesting level
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100 * max(args.depths)))
+    logging.disable(logging.CRITICAL)
+    snowflake = get_dialect("snowflake")
+    print(f"{'depth':>8}{'check ms':>12}{'rewrite ms':>12}{'generate ms':>14}")
+    for depth in args.depths:
+        expression = parse_one(nested_query(depth), read=snowflake)
+        check = _time(lambda e: find_unsupported_lca([e], Path("nested.sql")), expression, args.repeat)
+        rewrite = _time(unalias_lca, expression, args.repeat)
+        generate = _time(lambda e: Databricks().generate(e, copy=False), expression, args.repeat)
+        print(f"{depth:>8}{check:>12.1f}{rewrite:>12.1f}{generate:>14.1f}")
+    logging.disable(logging.NOTSET)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
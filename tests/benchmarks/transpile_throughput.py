@@ -0,0 +1,225 @@
+"""
+Throughput benchmark of `SqlglotEngine.transpile` over the functional SQL corpus.
+
+    python -m tests.benchmarks.transpile_throughput run --output head.json
+    python -m tests.benchmarks.transpile_throughput compare base.json head.json --threshold 10
+
+`run` transpiles the source SQL of every file under `tests/resources/functional` and reports the statements
+transpiled per second, the per-dialect p50/p95/p99 per-file latency and the peak RSS of the process.
+`compare` exits with a non-zero status when a metric of the second result is worse than the first one by more
+than the threshold (in percent).
+"""
+
+import argparse
+import io
+import json
+import logging
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import sqlglot
+
+from databricks.labs.remorph.__about__ import __version__
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.statement_splitter import split_statements
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None  # type: ignore[assignment]
+
+FUNCTIONAL_RESOURCES = Path(__file__).parent.parent / "resources" / "functional"
+TARGET_DIALECT = "databricks"
+
+
+@dataclass
+class FileTiming:
+    dialect: str
+    path: str
+    statements: int
+    seconds: float
+
+
+def _source_sql(content: str, dialect: str) -> str:
+    # functional test files hold the source SQL and the expected Databricks SQL, only the former is transpiled
+    match = re.search(rf"--\s*{dialect} sql:\n(.*?)(?=\n--\s*{TARGET_DIALECT} sql:|$)", content, re.DOTALL)
+    return match.group(1) if match else content
+
+
+def collect_files(resources: Path) -> list[tuple[str, Path, str]]:
+    """
+    Returns the source dialect, path and source SQL of every functional test file; the dialect is named after
+    the top level folder, e.g. `snowflake_expected_exceptions` holds Snowflake SQL.
+    """
+    files = []
+    for folder in sorted(path for path in resources.iterdir() if path.is_dir()):
+        dialect = folder.name.removesuffix("_expected_exceptions")
+        for path in sorted(folder.rglob("*.sql")):
+            files.append((dialect, path, _source_sql(path.read_text(encoding="utf-8"), dialect)))
+    return files
+
+
+def time_files(files: list[tuple[str, Path, str]], repeat: int) -> list[FileTiming]:
+    """
+    Transpiles every file `repeat` times, after a warm-up pass, and keeps the fastest run of each file.
+    """
+    # without statement templates, the repeated runs transpile every statement rather than fill in templates
+    engine = SqlglotEngine(max_templates=0)
+    for dialect, path, sql in files:
+        engine.transpile(dialect, TARGET_DIALECT, sql, path)
+    timings = []
+    for dialect, path, sql in files:
+        seconds = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.transpile(dialect, TARGET_DIALECT, sql, path)
+            seconds.append(time.perf_counter() - start)
+        statements = sum(1 for statement in split_statements(io.StringIO(sql)) if statement.strip())
+        timings.append(FileTiming(dialect, str(path), statements, min(seconds)))
+    return timings
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0]}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": cuts[49], "p95": cuts[94], "p99": cuts[98]}
+
+
+def _throughput(timings: list[FileTiming]) -> dict[str, Any]:
+    seconds = sum(timing.seconds for timing in timings)
+    statements = sum(timing.statements for timing in timings)
+    latencies_ms = {name: value * 1000 for name, value in _percentiles([timing.seconds for timing in timings]).items()}
+    return {
+        "files": len(timings),
+        "statements": statements,
+        "seconds": seconds,
+        "statements_per_second": statements / seconds if seconds else 0.0,
+        **{f"{name}_ms": value for name, value in latencies_ms.items()},
+    }
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, check=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(timings: list[FileTiming]) -> dict[str, Any]:
+    dialects = sorted({timing.dialect for timing in timings})
+    return {
+        "metadata": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": _git_commit(),
+            "remorph_version": __version__,
+            "sqlglot_version": sqlglot.__version__,
+            "python_version": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "overall": _throughput(timings),
+        "dialects": {
+            dialect: _throughput([timing for timing in timings if timing.dialect == dialect]) for dialect in dialects
+        },
+        "peak_rss_mb": _peak_rss_mb(),
+        "files": [asdict(timing) for timing in timings],
+    }
+
+
+# metric name -> whether a higher value is better
+_COMPARED_METRICS = {"statements_per_second": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float) -> list[str]:
+    """
+    Returns a description of every metric of `head` worse than in `base` by more than `threshold` percent.
+    """
+    regressions = []
+    scopes = {"overall": (base["overall"], head["overall"])}
+    for dialect, head_metrics in head["dialects"].items():
+        if dialect in base["dialects"]:
+            scopes[dialect] = (base["dialects"][dialect], head_metrics)
+    for scope, (base_metrics, head_metrics) in scopes.items():
+        for metric, higher_is_better in _COMPARED_METRICS.items():
+            change = _change(base_metrics[metric], head_metrics[metric], higher_is_better)
+            if change is not None and change > threshold:
+                regressions.append(
+                    f"{scope} {metric}: {base_metrics[metric]:.2f} -> {head_metrics[metric]:.2f} ({change:.1f}% worse)"
+                )
+    change = _change(base.get("peak_rss_mb"), head.get("peak_rss_mb"), higher_is_better=False)
+    if change is not None and change > threshold:
+        regressions.append(f"peak_rss_mb: {base['peak_rss_mb']:.1f} -> {head['peak_rss_mb']:.1f} ({change:.1f}% worse)")
+    return regressions
+
+
+def _change(base: float | None, head: float | None, higher_is_better: bool) -> float | None:
+    """Returns how much worse `head` is than `base`, in percent."""
+    if not base or head is None:
+        return None
+    return (base - head) / base * 100 if higher_is_better else (head - base) / base * 100
+
+
+def _print_summary(summary: dict[str, Any]) -> None:
+    print(f"{'dialect':<12}{'files':>7}{'stmts':>8}{'stmts/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, metrics in (*summary["dialects"].items(), ("overall", summary["overall"])):
+        print(
+            f"{name:<12}{metrics['files']:>7}{metrics['statements']:>8}{metrics['statements_per_second']:>10.1f}"
+            f"{metrics['p50_ms']:>9.2f}{metrics['p95_ms']:>9.2f}{metrics['p99_ms']:>9.2f}"
+        )
+    if summary["peak_rss_mb"] is not None:
+        print(f"peak RSS: {summary['peak_rss_mb']:.1f} MB")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="benchmark the functional corpus")
+    run_parser.add_argument("--resources", type=Path, default=FUNCTIONAL_RESOURCES)
+    run_parser.add_argument("--repeat", type=int, default=3, help="runs per file, the fastest one is kept")
+    run_parser.add_argument("--output", type=Path, help="JSON file to write the results to")
+    compare_parser = commands.add_parser("compare", help="compare two benchmark results")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("head", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="tolerated regression, in percent")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        # the transpiler logs a warning for every unsupported construct, which would dominate the timings
+        logging.disable(logging.CRITICAL)
+        summary = summarize(time_files(collect_files(args.resources), args.repeat))
+        logging.disable(logging.NOTSET)
+        _print_summary(summary)
+        if args.output:
+            args.output.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return 0
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    head = json.loads(args.head.read_text(encoding="utf-8"))
+    regressions = compare(base, head, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regression above {args.threshold}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Stand-in language server for the tests of `LSPEngine`, speaking just enough of the protocol over stdin/stdout.
+
+`document/transpileToDatabricks` replaces `nvl(` with `COALESCE(` and reports an error diagnostic for each `!!`, in
+the whole document or in its `range` parameter, advertising the latter unless `TRANSPILE_RANGE` is `false`;
+documents are synchronized incrementally. A document holding `CRASH` makes the server exit and one holding `HANG`
+makes it stop responding; followed by `ONCE <path>`, they only do so when the file at `<path>` does not exist yet,
+creating it.
+`document/tableLineage` reports an edge from every table following `FROM` to every table following `INTO`, and
+misbehaves the same way.
+"""
+
+# pylint: disable=duplicate-code
+
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+documents: dict[str, str] = {}
+
+
+def read_message():
+    content_length = None
+    while True:
+        line = sys.stdin.buffer.readline()
+        if not line:
+            return None
+        header = line.decode("ascii").strip()
+        if not header:
+            break
+        name, _, value = header.partition(":")
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+    return json.loads(sys.stdin.buffer.read(content_length).decode("utf-8"))
+
+
+def write_message(message):
+    body = json.dumps(message).encode("utf-8")
+    sys.stdout.buffer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    sys.stdout.buffer.flush()
+
+
+def initialize(_params):
+    capabilities = {"positionEncoding": "utf-32", "textDocumentSync": 2}
+    if os.environ.get("TRANSPILE_RANGE", "true") == "true":
+        capabilities["experimental"] = {"transpileRange": True}
+    return {
+        "capabilities": capabilities,
+        "serverInfo": {"name": "test-lsp-server", "version": os.environ.get("SOME_ENV", "")},
+    }
+
+
+def offset(text, text_position):
+    lines = text.split("\n")
+    return sum(len(line) + 1 for line in lines[: text_position["line"]]) + text_position["character"]
+
+
+def position(text, offset_in_text):
+    before = text[:offset_in_text].split("\n")
+    return {"line": len(before) - 1, "character": len(before[-1])}
+
+
+def change(params):
+    uri = params["textDocument"]["uri"]
+    for content_change in params["contentChanges"]:
+        text = documents[uri]
+        if "range" not in content_change:
+            documents[uri] = content_change["text"]
+            continue
+        start = offset(text, content_change["range"]["start"])
+        end = offset(text, content_change["range"]["end"])
+        documents[uri] = text[:start] + content_change["text"] + text[end:]
+
+
+def misbehave(text):
+    once = re.search(r"ONCE (\S+)", text)
+    if once:
+        marker = Path(once.group(1))
+        if marker.exists():
+            return
+        marker.touch()
+    if "CRASH" in text:
+        os._exit(3)  # pylint: disable=protected-access
+    if "HANG" in text:
+        time.sleep(3600)
+
+
+def transpile(params):
+    text = documents[params["uri"]]
+    start, end = 0, len(text)
+    if "range" in params:
+        start, end = offset(text, params["range"]["start"]), offset(text, params["range"]["end"])
+    misbehave(text[start:end])
+    changes = [
+        {"range": {"start": position(text, match.start()), "end": position(text, match.end())}, "newText": "COALESCE("}
+        for match in re.compile(r"nvl\(", re.IGNORECASE).finditer(text, start, end)
+    ]
+    diagnostics = [
+        {
+            "range": {"start": position(text, match.start()), "end": position(text, match.end())},
+            "severity": 1,
+            "code": "unsupported",
+            "message": "Unsupported syntax",
+        }
+        for match in re.compile("!!").finditer(text, start, end)
+    ]
+    return {"uri": params["uri"], "changes": changes, "diagnostics": diagnostics}
+
+
+def table_lineage(params):
+    text = documents[params["uri"]]
+    misbehave(text)
+    sources = re.findall(r"\bFROM\s+(\w+)", text, flags=re.IGNORECASE)
+    targets = re.findall(r"\bINTO\s+(\w+)", text, flags=re.IGNORECASE)
+    return [{"source": source, "target": target} for source in sources for target in targets]
+
+
+def main():
+    handlers = {
+        "initialize": initialize,
+        "document/transpileToDatabricks": transpile,
+        "document/tableLineage": table_lineage,
+        "shutdown": lambda params: None,
+    }
+    while (message := read_message()) is not None:
+        method = message.get("method")
+        params = message.get("params") or {}
+        if method == "exit":
+            return
+        if method == "textDocument/didOpen":
+            documents[params["textDocument"]["uri"]] = params["textDocument"]["text"]
+        elif method == "textDocument/didChange":
+            change(params)
+        elif method == "textDocument/didClose":
+            documents.pop(params["textDocument"]["uri"], None)
+        elif "id" in message:
+            if method in handlers:
+                write_message({"jsonrpc": "2.0", "id": message["id"], "result": handlers[method](params)})
+            else:
+                error = {"code": -32601, "message": f"Method not found: {method}"}
+                write_message({"jsonrpc": "2.0", "id": message["id"], "error": error})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import json
+import threading
+
+from databricks.labs.remorph.helpers.tracing import disable_tracing, enable_tracing, get_tracer, span, traced
+
+
+def test_span_is_a_no_op_when_disabled():
+    assert get_tracer() is None
+    with span("parse", statement=1) as opened:
+        assert opened is None
+    assert span("parse") is span("generate")
+
+
+def _validate():
+    with span("validate"):
+        pass
+
+
+def test_spans_nest_per_thread():
+    tracer = enable_tracing()
+    thread = threading.Thread(target=_validate)
+    try:
+        with span("file", path="a.sql"):
+            with span("parse"):
+                pass
+            with span("generate"):
+                pass
+        thread.start()
+        thread.join()
+    finally:
+        assert disable_tracing() is tracer
+
+    events = {event.name: event for event in tracer.events}
+    assert events["file"].depth == 0
+    assert events["parse"].depth == 1
+    assert events["generate"].depth == 1
+    assert events["validate"].depth == 0
+    assert events["file"].args == {"path": "a.sql"}
+    assert events["file"].children_ns == events["parse"].duration_ns + events["generate"].duration_ns
+    assert events["validate"].tid != events["file"].tid
+
+
+def test_chrome_trace_and_summary(tmp_path):
+    tracer = enable_tracing()
+    try:
+
+        @traced
+        def transpile_file():
+            for _ in range(3):
+                with span("parse"):
+                    pass
+
+        transpile_file()
+    finally:
+        disable_tracing()
+
+    tracer.write_chrome_trace(tmp_path / "trace.json")
+    trace = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    names = [event["name"] for event in trace["traceEvents"]]
+    assert names[0].endswith("transpile_file")
+    assert names[1:] == ["parse", "parse", "parse"]
+    assert all(event["ph"] == "X" and event["ts"] >= 0 for event in trace["traceEvents"])
+
+    summary = {phase.name: phase for phase in tracer.summary()}
+    assert summary["parse"].count == 3
+    assert summary["parse"].self_ms == summary["parse"].total_ms
+    assert "parse" in tracer.format_summary()
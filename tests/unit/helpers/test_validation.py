@@ -1,6 +1,11 @@
-from databricks.labs.lsql.backends import MockBackend
+import sys
+from datetime import timedelta
+from unittest.mock import Mock, create_autospec, patch
+
+from databricks.labs.lsql.backends import MockBackend, SqlBackend
 from databricks.labs.lsql.core import Row
-from databricks.labs.remorph.helpers.validation import Validator
+from databricks.labs.remorph.helpers.validation import LocalValidator, Validator
+from databricks.sdk.errors import TooManyRequests
 
 
 def test_valid_query(transpile_config):
@@ -94,3 +99,60 @@ def test_validate_with_no_rows_returned(transpile_config):
     validation_result = validator.validate_format_result(transpile_config, query)
     assert "Exception Start" in validation_result.validated_sql
     assert "No results returned" in validation_result.exception_msg
+
+
+def test_query_retried_when_throttled(transpile_config):
+    query = "SELECT * FROM a_table"
+    sql_backend = create_autospec(SqlBackend)
+    sql_backend.fetch.side_effect = [
+        TooManyRequests("Too many concurrent queries", retry_after_secs=0),
+        iter([Row(plan="== Physical Plan ==")]),
+    ]
+    validator = Validator(sql_backend)
+    validation_result = validator.validate_format_result(transpile_config, query)
+    assert query in validation_result.validated_sql
+    assert validation_result.exception_msg is None
+    assert sql_backend.fetch.call_count == 2
+
+
+def test_query_throttled_until_timeout(transpile_config):
+    query = "SELECT * FROM a_table"
+    sql_backend = create_autospec(SqlBackend)
+    sql_backend.fetch.side_effect = TooManyRequests("Too many concurrent queries", retry_after_secs=0)
+    validator = Validator(sql_backend, retry_timeout=timedelta(milliseconds=1))
+    validation_result = validator.validate_format_result(transpile_config, query)
+    assert "Exception Start" in validation_result.validated_sql
+    assert "Too many concurrent queries" in validation_result.exception_msg
+
+
+def test_local_validator_rejects_syntax_error_without_warehouse(transpile_config):
+    sql_backend = MockBackend(rows={"EXPLAIN SELECT": [Row(plan="== Physical Plan ==")]})
+    validator = Validator(sql_backend, local_validator=LocalValidator())
+    validation_result = validator.validate_format_result(transpile_config, "SELECT A B C FROM t")
+    assert "Exception Start" in validation_result.validated_sql
+    assert validation_result.exception_msg.startswith("[PARSE_SYNTAX_ERROR] Syntax error detected locally:")
+    assert "\033" not in validation_result.exception_msg
+    assert not sql_backend.queries
+
+    validation_result = validator.validate_format_result(transpile_config, "SELECT a FROM ${db}.t")
+    assert validation_result.exception_msg is None
+    assert sql_backend.queries == ["EXPLAIN SELECT a FROM `{db}`.t"]
+
+
+def test_local_validator_uses_spark_sql_parser(transpile_config):
+    spark_sql_parser = Mock()
+    spark_sql_parser.parsePlan.side_effect = Exception("org.apache.spark.sql.catalyst.parser.ParseException: bad")
+    with patch.object(LocalValidator, "_get_spark_sql_parser", return_value=spark_sql_parser):
+        local_validator = LocalValidator()
+    validator = Validator(MockBackend(), local_validator=local_validator)
+    validation_result = validator.validate_format_result(transpile_config, "SELECT a FROM t")
+    assert "ParseException: bad" in validation_result.exception_msg
+    spark_sql_parser.parsePlan.assert_called_once_with("SELECT a FROM t")
+
+
+def test_local_validator_without_pyspark(transpile_config):
+    with patch.dict(sys.modules, {"pyspark.sql": None}):
+        local_validator = LocalValidator()
+    validator = Validator(MockBackend(), local_validator=local_validator)
+    validation_result = validator.validate_format_result(transpile_config, "SELECT A B C FROM t")
+    assert validation_result.exception_msg.startswith("[PARSE_SYNTAX_ERROR] Syntax error detected locally:")
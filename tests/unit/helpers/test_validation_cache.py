@@ -0,0 +1,58 @@
+import itertools
+from datetime import timedelta
+from unittest.mock import patch
+
+from databricks.labs.lsql.backends import MockBackend
+from databricks.labs.lsql.core import Row
+
+from databricks.labs.remorph.helpers.validation import Validator
+from databricks.labs.remorph.helpers.validation_cache import ValidationCache, sql_fingerprint
+
+
+def test_fingerprint_ignores_whitespace_and_comments():
+    assert sql_fingerprint("SELECT a,\n  b FROM t") == sql_fingerprint("/* header */ SELECT a, b -- cols\nFROM t")
+    assert sql_fingerprint("SELECT 'a  b' FROM t") != sql_fingerprint("SELECT 'a b' FROM t")
+    assert sql_fingerprint("SELECT 'a' FROM t") != sql_fingerprint("SELECT `a` FROM t")
+
+
+def test_cache_round_trip(tmp_path):
+    cache = ValidationCache(tmp_path / "validation.sqlite")
+    key = cache.key("SELECT * FROM t", "catalog", "schema")
+    assert cache.get(key) is None
+    cache.put(key, (False, "error", "[PARSE_SYNTAX_ERROR]"))
+    assert ValidationCache(tmp_path / "validation.sqlite").get(key) == (False, "error", "[PARSE_SYNTAX_ERROR]")
+    assert cache.key("SELECT * FROM t", "catalog", "other_schema") != key
+
+
+def test_cache_entries_expire(tmp_path):
+    cache = ValidationCache(tmp_path / "validation.sqlite", ttl=timedelta(hours=1))
+    key = cache.key("SELECT * FROM t", "catalog", "schema")
+    with patch("time.time", return_value=1_000_000.0):
+        cache.put(key, (True, None, None))
+    with patch("time.time", return_value=1_003_000.0):
+        assert cache.get(key) == (True, None, None)
+    with patch("time.time", return_value=1_004_000.0):
+        assert cache.get(key) is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ValidationCache(tmp_path / "validation.sqlite", max_entries=2)
+    keys = [cache.key(f"SELECT {i}", "catalog", "schema") for i in range(3)]
+    with patch("time.time", side_effect=itertools.count(1_000_000)):
+        for key in keys:
+            cache.put(key, (True, None, None))
+            cache.get(keys[0])
+        cache.evict()
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[2]) is not None
+
+
+def test_validator_skips_cached_statements(transpile_config, tmp_path):
+    sql_backend = MockBackend(rows={"EXPLAIN SELECT": [Row(plan="== Physical Plan ==")]})
+    validator = Validator(sql_backend, cache=ValidationCache(tmp_path / "validation.sqlite"))
+    first = validator.validate_format_result(transpile_config, "SELECT * FROM a_table")
+    second = validator.validate_format_result(transpile_config, "SELECT *\n  FROM a_table -- cached")
+    assert len(sql_backend.queries) == 1
+    assert first.exception_msg is None and second.exception_msg is None
+    assert "-- cached" in second.validated_sql
@@ -0,0 +1,121 @@
+import sys
+import threading
+import time
+
+import pytest
+
+from databricks.labs.remorph.helpers.watchdog import BudgetExceeded, Watchdog
+
+
+def _spin(guarding: Watchdog, seconds: float) -> None:
+    start = time.monotonic()
+    while time.monotonic() - start < seconds:
+        guarding.checkpoint()
+
+
+class _Parser:
+    def __init__(self):
+        self.advanced = 0
+
+    def advance(self) -> None:
+        self.advanced += 1
+
+
+@pytest.fixture
+def watchdog():
+    return Watchdog()
+
+
+def test_runs_within_budget(watchdog):
+    with watchdog.guard(5):
+        _spin(watchdog, 0.02)
+    with watchdog.guard(None):
+        _spin(watchdog, 0.02)
+
+
+def test_checkpoints_outside_of_a_guard_do_nothing(watchdog):
+    _spin(watchdog, 0.02)
+
+
+def test_interrupts_code_over_its_time_budget(watchdog):
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded, match="Exceeded the time budget of 0.05s") as exceeded, watchdog.guard(0.05):
+        _spin(watchdog, 10)
+    assert time.monotonic() - start < 5
+    assert exceeded.value.resource == "time"
+    assert exceeded.value.elapsed_seconds >= 0.05
+    assert exceeded.value.memory_mb is None
+
+
+def test_interrupts_only_at_checkpoints(watchdog):
+    with watchdog.guard(0.01):
+        time.sleep(0.05)
+    with pytest.raises(BudgetExceeded), watchdog.guard(0.01):
+        time.sleep(0.05)
+        watchdog.checkpoint()
+
+
+def test_interrupts_the_code_of_instrumented_methods(watchdog):
+    parser = _Parser()
+    watchdog.instrument(parser, "advance")
+    with pytest.raises(BudgetExceeded), watchdog.guard(0.05):
+        while True:
+            parser.advance()
+    assert parser.advanced > 0
+
+
+def test_guarded_code_cannot_swallow_the_interruption(watchdog):
+    swallowed = []
+
+    def _swallowing():
+        try:
+            _spin(watchdog, 10)
+        except Exception as e:  # noqa: BLE001 pylint: disable=broad-exception-caught
+            swallowed.append(e)
+
+    with pytest.raises(BudgetExceeded), watchdog.guard(0.05):
+        _swallowing()
+    assert not swallowed
+
+
+def test_interrupts_the_guard_over_its_budget_when_nested(watchdog):
+    inner_exceeded = 0
+    with pytest.raises(BudgetExceeded, match="budget of 0.3s"), watchdog.guard(0.3):
+        for _ in range(100):
+            try:
+                with watchdog.guard(0.05):
+                    _spin(watchdog, 1)
+            except BudgetExceeded:
+                inner_exceeded += 1
+    assert 1 < inner_exceeded < 100
+
+
+def test_interrupts_each_thread_on_its_own(watchdog):
+    outcomes: list[str] = []
+
+    def _run(seconds: float) -> None:
+        try:
+            with watchdog.guard(0.1):
+                _spin(watchdog, seconds)
+            outcomes.append("done")
+        except BudgetExceeded:
+            outcomes.append("exceeded")
+
+    threads = [threading.Thread(target=_run, args=(seconds,)) for seconds in (0.01, 10, 10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    assert sorted(outcomes) == ["done", "exceeded", "exceeded"]
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="memory is measured on Linux only")
+def test_interrupts_code_over_its_memory_budget(watchdog):
+    allocated = []
+    with pytest.raises(BudgetExceeded, match="memory budget of 20MB") as exceeded, watchdog.guard(None, 20):
+        for _ in range(1000):
+            allocated.append(b"x" * 1024 * 1024)
+            for _ in range(300):
+                watchdog.checkpoint()
+    assert exceeded.value.memory_mb > 20
+    assert len(allocated) < 1000
@@ -0,0 +1,122 @@
+import re
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+# Runs a command in a fresh interpreter, with the workspace mocked out, so that `python -X importtime` reports
+# what the command imports on a cold start. The command may fail further down, only its imports matter.
+_RUN_COMMAND = """
+from unittest.mock import MagicMock, patch
+
+from databricks.labs.remorph import cli
+
+ctx = MagicMock()
+ctx.prompts.confirm.return_value = False
+with patch.object(cli, "ApplicationContext", return_value=ctx), patch.object(cli, "ReconConfigPrompts"):
+    try:
+        cli.{command}({arguments})
+    except BaseException:
+        pass
+"""
+
+_IMPORT_TIME = re.compile(r"^import time:\s+\d+ \|\s+(\d+) \| (.+)$")
+
+_SPARK_MODULES = ("pyspark", "databricks.connect")
+_DATAFRAME_MODULES = ("pyarrow", "pandas")
+_TRANSPILE_MODULES = ("databricks.labs.remorph.transpiler.execute",)
+_DIALECT_MODULES = ("databricks.labs.remorph.transpiler.sqlglot",)
+_RECONCILE_MODULES = ("databricks.labs.remorph.reconcile.execute",)
+
+# The modules each command must not import, what it does not use staying out of its cold start, and the seconds of
+# imports allowed to it, as a multiple of the import time of the `databricks.labs.remorph` package, which loads the
+# Databricks SDK and is paid by every command. The package is timed in the same run, so that the load of the machine
+# weighs on both sides of the budget.
+COMMANDS = [
+    (
+        "transpile",
+        "MagicMock(), 'sqlglot', 'snowflake', 'missing.sql', None, 'true', '', '', ''",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES,
+        3.0,
+    ),
+    (
+        "generate_lineage",
+        "MagicMock(), 'sqlglot', 'snowflake', 'missing.sql', 'missing'",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES + _TRANSPILE_MODULES,
+        3.0,
+    ),
+    (
+        "transpile_file",
+        "'snowflake', 'missing.sql'",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES + _TRANSPILE_MODULES + _DIALECT_MODULES,
+        3.0,
+    ),
+    (
+        "triage",
+        "'snowflake', 'missing.sql', 'missing.csv'",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES + _TRANSPILE_MODULES,
+        3.0,
+    ),
+    (
+        "transpile_query_history",
+        "'snowflake', 'missing.csv'",
+        _SPARK_MODULES + ("pandas",) + _RECONCILE_MODULES,
+        3.0,
+    ),
+    (
+        "transpile_daemon",
+        "socket_path='missing/remorph.sock'",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES + _TRANSPILE_MODULES,
+        3.0,
+    ),
+    (
+        "configure_secrets",
+        "MagicMock()",
+        _SPARK_MODULES + _DATAFRAME_MODULES + _RECONCILE_MODULES + _TRANSPILE_MODULES + _DIALECT_MODULES,
+        3.0,
+    ),
+    ("reconcile", "MagicMock()", (), 6.0),
+    ("aggregates_reconcile", "MagicMock()", (), 6.0),
+]
+
+
+def _import_times(code: str) -> dict[str, int]:
+    """Returns the cumulative import time in microseconds of the modules imported by `code`, top-level ones first"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", textwrap.dedent(code)],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=120,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            times[match.group(2)] = int(match.group(1))
+    return times
+
+
+def test_cli_module_does_not_import_spark_or_dialects():
+    times = _import_times("from databricks.labs.remorph import cli")
+    modules = {module.strip() for module in times}
+    assert not {module for module in modules if module.startswith(_SPARK_MODULES)}
+    assert "databricks.labs.remorph.transpiler.execute" not in modules
+    assert "databricks.labs.remorph.reconcile.execute" not in modules
+
+
+def _total_seconds(times: dict[str, int]) -> float:
+    return sum(cumulative for module, cumulative in times.items() if not module.startswith(" ")) / 1_000_000
+
+
+@pytest.mark.parametrize("command, arguments, not_imported, budget", COMMANDS)
+def test_command_imports_only_what_it_uses_within_budget(command, arguments, not_imported, budget):
+    times = _import_times(_RUN_COMMAND.format(command=command, arguments=arguments))
+    modules = {module.strip(): cumulative for module, cumulative in times.items()}
+    assert "databricks.labs.remorph.cli" in modules
+    unexpected = sorted(module for module in modules if module.startswith(not_imported))
+    assert not unexpected, f"{command} imported {', '.join(unexpected[:10])}"
+    seconds = _total_seconds(times)
+    package_seconds = modules["databricks.labs.remorph"] / 1_000_000
+    assert seconds < budget * package_seconds, f"{command} spent {seconds:.2f}s importing modules"
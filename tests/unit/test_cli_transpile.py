@@ -1,14 +1,32 @@
+from pathlib import Path
 from unittest.mock import create_autospec, patch, PropertyMock, ANY
 
 import pytest
-
+import yaml
 
 from databricks.labs.remorph import cli
 from databricks.labs.remorph.config import TranspileConfig
+from databricks.labs.remorph.helpers.watchdog import Budget
 from databricks.sdk import WorkspaceClient
 
 from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
 
+LABS_YML = Path(__file__).parent.parent.parent / "labs.yml"
+
+
+def _unset_flags(command: str, *flags: str) -> dict[str, str]:
+    """
+    Returns the arguments `databricks labs` passes for `flags` of `command` when the user does not set them: their
+    default in labs.yml, blueprint leaving out the flags without one.
+    """
+    commands = {command["name"]: command for command in yaml.safe_load(LABS_YML.read_text())["commands"]}
+    arguments = {}
+    for flag in commands[command]["flags"]:
+        default = str(flag.get("default", ""))
+        if flag["name"] in flags and default:
+            arguments[flag["name"].replace("-", "_")] = default
+    return arguments
+
 
 def test_transpile_with_missing_installation():
     workspace_client = create_autospec(WorkspaceClient)
@@ -35,7 +53,7 @@ def test_transpile_with_no_sdk_config():
     workspace_client = create_autospec(WorkspaceClient)
     with (
         patch("databricks.labs.remorph.cli.ApplicationContext", autospec=True) as mock_app_context,
-        patch("databricks.labs.remorph.cli.do_transpile", return_value={}) as mock_transpile,
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
         patch("os.path.exists", return_value=True),
     ):
         default_config = TranspileConfig(
@@ -84,7 +102,7 @@ def test_transpile_with_warehouse_id_in_sdk_config():
     with (
         patch("databricks.labs.remorph.cli.ApplicationContext", autospec=True) as mock_app_context,
         patch("os.path.exists", return_value=True),
-        patch("databricks.labs.remorph.cli.do_transpile", return_value={}) as mock_transpile,
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
     ):
         sdk_config = {"warehouse_id": "w_id"}
         default_config = TranspileConfig(
@@ -133,7 +151,7 @@ def test_transpile_with_cluster_id_in_sdk_config():
     with (
         patch("databricks.labs.remorph.cli.ApplicationContext", autospec=True) as mock_app_context,
         patch("os.path.exists", return_value=True),
-        patch("databricks.labs.remorph.cli.do_transpile", return_value={}) as mock_transpile,
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
     ):
         sdk_config = {"cluster_id": "c_id"}
         default_config = TranspileConfig(
@@ -278,7 +296,7 @@ def test_transpile_with_valid_input(mock_workspace_client_cli):
 
     with (
         patch("os.path.exists", return_value=True),
-        patch("databricks.labs.remorph.cli.do_transpile", return_value={}) as mock_transpile,
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
     ):
         cli.transpile(
             mock_workspace_client_cli,
@@ -308,6 +326,46 @@ def test_transpile_with_valid_input(mock_workspace_client_cli):
         )
 
 
+@pytest.mark.parametrize(
+    "flags",
+    [
+        ("cache-folder",),
+        ("streaming-threshold-mb",),
+        ("trace-file",),
+        ("statement-timeout-seconds", "statement-memory-mb", "file-timeout-seconds"),
+        ("statement-templates",),
+    ],
+)
+def test_transpile_without_optional_flags(mock_workspace_client_cli, flags):
+    with (
+        patch("os.path.exists", return_value=True),
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file.sql",
+            "/path/to/output",
+            "true",
+            "my_catalog",
+            "my_schema",
+            "current",
+            **_unset_flags("transpile", *flags),
+        )
+    assert mock_transpile.call_args.args[2] == TranspileConfig(
+        transpiler_config_path="sqlglot",
+        source_dialect="snowflake",
+        input_source="/path/to/sql/file.sql",
+        output_folder="/path/to/output",
+        sdk_config={'cluster_id': 'test_cluster'},
+        skip_validation=True,
+        catalog_name="my_catalog",
+        schema_name="my_schema",
+        mode="current",
+    )
+
+
 def test_transpile_empty_output_folder(mock_workspace_client_cli):
     transpiler = "sqlglot"
     source_dialect = "snowflake"
@@ -322,7 +380,7 @@ def test_transpile_empty_output_folder(mock_workspace_client_cli):
 
     with (
         patch("os.path.exists", return_value=True),
-        patch("databricks.labs.remorph.cli.do_transpile", return_value={}) as mock_transpile,
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
     ):
         cli.transpile(
             mock_workspace_client_cli,
@@ -377,3 +435,160 @@ def test_transpile_with_invalid_mode(mock_workspace_client_cli):
             schema_name,
             mode,
         )
+
+
+def test_transpile_with_invalid_workers(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        pytest.raises(Exception, match="Invalid value for '--workers':"),
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "",
+            "false",
+            "my_catalog",
+            "my_schema",
+            "current",
+            "zero",
+        )
+
+
+def test_transpile_with_workers(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "/path/to/output",
+            "true",
+            "my_catalog",
+            "my_schema",
+            "current",
+            "4",
+        )
+        assert mock_transpile.call_args.args[2].workers == 4
+
+
+def test_transpile_with_invalid_validation_concurrency(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        pytest.raises(Exception, match="Invalid value for '--validation-concurrency':"),
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "",
+            "false",
+            "my_catalog",
+            "my_schema",
+            "current",
+            validation_concurrency="0",
+        )
+
+
+def test_transpile_with_invalid_streaming_threshold(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        pytest.raises(Exception, match="Invalid value for '--streaming-threshold-mb':"),
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "",
+            "false",
+            "my_catalog",
+            "my_schema",
+            "current",
+            streaming_threshold_mb="1.5",
+        )
+
+
+def test_transpile_with_budgets(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "/path/to/output",
+            "true",
+            "my_catalog",
+            "my_schema",
+            "current",
+            statement_timeout_seconds="60",
+            statement_memory_mb="0",
+        )
+        config = mock_transpile.call_args.args[2]
+        assert config.budget == Budget(statement_seconds=60)
+
+
+def test_transpile_with_invalid_statement_timeout(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        pytest.raises(Exception, match="Invalid value for '--statement-timeout-seconds':"),
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "",
+            "false",
+            "my_catalog",
+            "my_schema",
+            "current",
+            statement_timeout_seconds="-1",
+        )
+
+
+def test_transpile_with_statement_templates(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        patch("databricks.labs.remorph.transpiler.execute.transpile", return_value={}) as mock_transpile,
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "/path/to/output",
+            "true",
+            "my_catalog",
+            "my_schema",
+            "current",
+            statement_templates="10000",
+        )
+        assert mock_transpile.call_args.args[2].statement_templates == 10000
+
+
+def test_transpile_with_invalid_statement_templates(mock_workspace_client_cli):
+    with (
+        patch("os.path.exists", return_value=True),
+        pytest.raises(Exception, match="Invalid value for '--statement-templates':"),
+    ):
+        cli.transpile(
+            mock_workspace_client_cli,
+            "sqlglot",
+            "snowflake",
+            "/path/to/sql/file2.sql",
+            "",
+            "false",
+            "my_catalog",
+            "my_schema",
+            "current",
+            statement_templates="many",
+        )
@@ -154,6 +154,8 @@ def test_workspace_installer_run_install_called_with_generated_config(ws):
             "skip_validation": True,
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -213,6 +215,8 @@ def test_configure_transpile_no_existing_installation(ws):
             "skip_validation": True,
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -330,6 +334,8 @@ def test_configure_transpile_installation_config_error_continue_install(ws):
             "skip_validation": True,
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -390,6 +396,8 @@ def test_configure_transpile_installation_with_no_validation(ws):
             "skip_validation": True,
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -457,6 +465,8 @@ def test_configure_transpile_installation_with_validation_and_cluster_id_in_conf
             "sdk_config": {"cluster_id": "1234"},
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -525,6 +535,8 @@ def test_configure_transpile_installation_with_validation_and_cluster_id_from_pr
             "sdk_config": {"cluster_id": "1234"},
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -591,6 +603,8 @@ def test_configure_transpile_installation_with_validation_and_warehouse_id_from_
             "sdk_config": {"warehouse_id": "w_id"},
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
@@ -936,6 +950,8 @@ def test_configure_all_override_installation(ws):
             "skip_validation": True,
             "source_dialect": "snowflake",
             "version": 2,
+            "workers": 1,
+            "validation_concurrency": 1,
         },
     )
 
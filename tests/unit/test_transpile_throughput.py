@@ -0,0 +1,40 @@
+import json
+
+from tests.benchmarks.transpile_throughput import collect_files, compare, main
+
+
+def _write_resources(tmp_path):
+    (tmp_path / "snowflake").mkdir(parents=True)
+    (tmp_path / "snowflake" / "test_1.sql").write_text(
+        "-- snowflake sql:\nSELECT nvl(a, 1) FROM t; SELECT 2;\n\n-- databricks sql:\nSELECT COALESCE(a, 1) FROM t;\n"
+    )
+    (tmp_path / "presto_expected_exceptions").mkdir()
+    (tmp_path / "presto_expected_exceptions" / "test_2.sql").write_text("-- presto sql:\nSELECT 1\n")
+    return tmp_path
+
+
+def test_collect_files(tmp_path):
+    files = collect_files(_write_resources(tmp_path))
+    assert [(dialect, path.name, sql) for dialect, path, sql in files] == [
+        ("presto", "test_2.sql", "SELECT 1"),
+        ("snowflake", "test_1.sql", "SELECT nvl(a, 1) FROM t; SELECT 2;\n"),
+    ]
+
+
+def test_run_and_compare(tmp_path):
+    resources = _write_resources(tmp_path / "resources")
+    output = tmp_path / "result.json"
+    assert main(["run", "--resources", str(resources), "--repeat", "1", "--output", str(output)]) == 0
+    result = json.loads(output.read_text())
+    assert result["overall"]["files"] == 2
+    assert result["overall"]["statements"] == 3
+    assert set(result["dialects"]) == {"presto", "snowflake"}
+    assert main(["compare", str(output), str(output)]) == 0
+
+    slower = json.loads(output.read_text())
+    slower["overall"]["statements_per_second"] /= 2
+    slower["dialects"]["snowflake"]["p95_ms"] *= 1.05
+    regressions = compare(result, slower, threshold=10)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("overall statements_per_second")
+    assert not compare(result, slower, threshold=60)
@@ -0,0 +1,129 @@
+import io
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from databricks.labs.remorph import cli
+from databricks.labs.remorph.transpiler.daemon import TranspileDaemon, serve_socket, serve_stream
+from databricks.labs.remorph.transpiler.daemon_client import DaemonClient, DaemonError, main, request
+
+TRANSPILE_PARAMS = {"source_dialect": "snowflake", "source_code": "SELECT nvl(a, 0) FROM t", "file_path": "q.sql"}
+
+
+@pytest.fixture(scope="module")
+def daemon():
+    return TranspileDaemon()
+
+
+@pytest.fixture
+def socket_path(daemon, tmp_path):
+    path = tmp_path / "remorph.sock"
+    ready = threading.Event()
+    server = threading.Thread(target=serve_socket, args=(daemon, path, ready), daemon=True)
+    server.start()
+    ready.wait(timeout=10)
+    yield path
+    if server.is_alive():
+        with DaemonClient(path) as client:
+            client.request("shutdown")
+    server.join(timeout=10)
+
+
+def test_handles_transpile_requests(daemon):
+    response = daemon.handle({"id": 7, "method": "transpile", "params": TRANSPILE_PARAMS})
+    assert response == {
+        "id": 7,
+        "result": {"transpiled_code": "SELECT\n  COALESCE(a, 0)\nFROM t", "success_count": 1, "error_list": []},
+    }
+
+
+def test_handles_lineage_requests(daemon):
+    params = {"source_dialect": "snowflake", "source_code": "INSERT INTO target SELECT * FROM source"}
+    assert daemon.handle({"id": 1, "method": "lineage", "params": params})["result"] == [["source", "target"]]
+
+
+@pytest.mark.parametrize(
+    "request_line, error_type",
+    [
+        ('{"id": 1, "method": "unknown", "params": {"source_dialect": "snowflake"}}', "ValueError"),
+        ('{"id": 1, "method": "transpile", "params": {"source_dialect": "cobol", "source_code": ""}}', "ValueError"),
+        ('{"id": 1, "method": "transpile", "params": {"source_dialect": "snowflake"}}', "KeyError"),
+        ("not json", "JSONDecodeError"),
+    ],
+)
+def test_answers_failed_requests_with_an_error(daemon, request_line, error_type):
+    response, shutdown = daemon.handle_line(request_line)
+    assert json.loads(response)["error"]["type"] == error_type
+    assert not shutdown
+
+
+def test_serves_json_lines_until_shutdown(daemon):
+    requests = [
+        {"id": 1, "method": "ping"},
+        {"id": 2, "method": "transpile", "params": TRANSPILE_PARAMS},
+        {"id": 3, "method": "shutdown"},
+        {"id": 4, "method": "ping"},
+    ]
+    reader = io.StringIO("".join(json.dumps(request) + "\n" for request in requests))
+    writer = io.StringIO()
+    serve_stream(daemon, reader, writer)
+    responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+    assert [response["id"] for response in responses] == [1, 2, 3]
+    assert responses[1]["result"]["transpiled_code"] == "SELECT\n  COALESCE(a, 0)\nFROM t"
+
+
+def test_serves_clients_on_a_unix_socket(socket_path):
+    with DaemonClient(socket_path) as client, DaemonClient(socket_path) as other_client:
+        pid = client.request("ping")["pid"]
+        assert other_client.request("ping")["pid"] == pid
+        assert client.request("transpile", TRANSPILE_PARAMS)["transpiled_code"] == "SELECT\n  COALESCE(a, 0)\nFROM t"
+        with pytest.raises(DaemonError, match="Unknown method"):
+            client.request("unknown", {"source_dialect": "snowflake"})
+
+
+def test_request_goes_to_the_daemon(socket_path):
+    assert request("transpile", TRANSPILE_PARAMS, socket_path)["transpiled_code"] == "SELECT\n  COALESCE(a, 0)\nFROM t"
+
+
+def test_request_falls_back_to_in_process_without_daemon(tmp_path):
+    result = request("transpile", TRANSPILE_PARAMS, tmp_path / "missing.sock")
+    assert result["transpiled_code"] == "SELECT\n  COALESCE(a, 0)\nFROM t"
+
+
+def test_client_main_writes_the_transpiled_file(socket_path, tmp_path, capsys):
+    input_file = tmp_path / "query.sql"
+    input_file.write_text("SELECT nvl(a, 0) FROM t")
+    output_file = tmp_path / "out.sql"
+    argv = ["transpile", str(input_file), "--source-dialect", "snowflake", "--socket-path", str(socket_path)]
+    assert main([*argv, "--output-file", str(output_file)]) == 0
+    assert output_file.read_text() == "SELECT\n  COALESCE(a, 0)\nFROM t\n"
+    assert main(["lineage", str(input_file), "--source-dialect", "snowflake"]) == 0
+    assert capsys.readouterr().out == f"t\t{input_file}\n"
+
+
+def test_cli_transpile_file_falls_back_to_in_process(tmp_path, capsys):
+    input_file = tmp_path / "query.sql"
+    input_file.write_text("SELECT nvl(a, 0) FROM t")
+    cli.transpile_file("snowflake", str(input_file), socket_path=str(tmp_path / "missing.sock"))
+    assert capsys.readouterr().out == "SELECT\n  COALESCE(a, 0)\nFROM t\n"
+
+
+def test_cli_transpile_daemon_serves_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO('{"id": 1, "method": "ping"}\n'))
+    cli.transpile_daemon()
+    assert json.loads(capsys.readouterr().out)["result"]["version"]
+
+
+def test_socket_is_removed_after_shutdown(daemon, tmp_path):
+    path = tmp_path / "remorph.sock"
+    ready = threading.Event()
+    server = threading.Thread(target=serve_socket, args=(daemon, path, ready), daemon=True)
+    server.start()
+    ready.wait(timeout=10)
+    assert (path.stat().st_mode & 0o077) == 0
+    with DaemonClient(path) as client:
+        client.request("shutdown")
+    server.join(timeout=10)
+    assert not Path(path).exists()
@@ -0,0 +1,43 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlglot import Dialect
+from sqlglot.dialects.tsql import TSQL
+
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import SQLGLOT_DIALECTS, DialectRegistry
+from databricks.labs.remorph.transpiler.sqlglot.generator.databricks import Databricks
+from databricks.labs.remorph.transpiler.sqlglot.parsers.snowflake import Snowflake
+
+
+def test_registry_instantiates_each_dialect_once():
+    registry = DialectRegistry(SQLGLOT_DIALECTS)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        dialects = list(executor.map(registry.get, ["snowflake"] * 64))
+    assert isinstance(dialects[0], Snowflake)
+    assert all(dialect is dialects[0] for dialect in dialects)
+    assert isinstance(registry.get("databricks"), Databricks)
+
+
+def test_registry_resolves_unknown_keys_to_the_base_dialect():
+    registry = DialectRegistry(SQLGLOT_DIALECTS)
+    assert type(registry.get("experimental")) is Dialect  # pylint: disable=unidiomatic-typecheck
+    assert registry.get(None) is registry.get("unknown")
+
+
+def test_registry_reverse_lookup():
+    registry = DialectRegistry(SQLGLOT_DIALECTS)
+    assert registry.key_of(registry.get("oracle")) == "oracle"
+    assert registry.key_of(Snowflake()) == "snowflake"
+    # registered by name
+    assert registry.key_of(TSQL()) == "tsql"
+    # registered under several keys
+    assert registry.key_of(registry.get("vertica")) == "netezza"
+    with pytest.raises(KeyError):
+        registry.key_of(Dialect())
+
+
+def test_registry_iterates_over_its_keys():
+    registry = DialectRegistry(SQLGLOT_DIALECTS)
+    assert list(registry) == list(SQLGLOT_DIALECTS)
+    assert "snowflake" in registry
+    assert "experimental" not in registry
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+from databricks.labs.remorph.transpiler.error_log import ErrorLog, read_error_log
+from databricks.labs.remorph.transpiler.transpile_status import (
+    ParserError,
+    ResourceLimitError,
+    TranspileStatus,
+    ValidationError,
+)
+
+
+def test_error_log_is_written_as_errors_occur(tmp_path):
+    path = tmp_path / "err.jsonl"
+    errors = [ParserError(Path("a.sql"), "PARSING ERROR\nline 2"), ValidationError(Path("b.sql"), "it's invalid")]
+    with ErrorLog(path) as error_log:
+        error_log.write([])
+        assert not path.exists()
+        error_log.write(errors[:1])
+        # readable before the log is closed, e.g. after a crash
+        assert list(read_error_log(path)) == errors[:1]
+        error_log.write(errors[1:])
+    assert error_log.count == 2
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    assert list(read_error_log(path)) == errors
+
+
+def test_read_error_log_skips_truncated_lines(tmp_path):
+    path = tmp_path / "err.jsonl"
+    with ErrorLog(path) as error_log:
+        error_log.write([ParserError(Path("a.sql"), "error")])
+    with path.open("a", encoding="utf-8") as f:
+        f.write('{"type": "ParserError", "file_pa')
+    assert list(read_error_log(path)) == [ParserError(Path("a.sql"), "error")]
+
+
+def test_status_keeps_a_bounded_sample_of_errors():
+    status = TranspileStatus(1, 0, 0, 0)
+    status.add_errors([ParserError(Path(f"{i}.sql"), "error") for i in range(TranspileStatus.ERROR_SAMPLE_SIZE)])
+    status.add_errors([ValidationError(Path("last.sql"), "error")])
+    assert status.parse_error_count == TranspileStatus.ERROR_SAMPLE_SIZE
+    assert status.validate_error_count == 1
+    assert len(status.error_sample) == TranspileStatus.ERROR_SAMPLE_SIZE
+
+
+def test_error_log_keeps_the_details_of_resource_limit_errors(tmp_path):
+    path = tmp_path / "err.jsonl"
+    error = ResourceLimitError(Path("big.sql"), "over budget", "parse", "time", 301.5, None, 2_000_000, 600_000)
+    with ErrorLog(path) as error_log:
+        error_log.write([error])
+    assert list(read_error_log(path)) == [error]
+    status = TranspileStatus(1, 0, 0, 0)
+    status.add_errors([error])
+    assert (status.parse_error_count, status.resource_limit_error_count) == (0, 1)
@@ -1,5 +1,9 @@
-import re
+import json
+import os
 import shutil
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from unittest.mock import create_autospec, patch
 
@@ -11,15 +15,18 @@ from databricks.labs.lsql.core import Row
 from databricks.labs.remorph.config import TranspileConfig, ValidationResult
 from databricks.labs.remorph.helpers.file_utils import make_dir
 from databricks.labs.remorph.helpers.validation import Validator
+from databricks.labs.remorph.helpers.watchdog import Budget
+from databricks.labs.remorph.transpiler.error_log import read_error_log
 from databricks.labs.remorph.transpiler.execute import (
     transpile,
     transpile_column_exp,
+    transpile_expressions,
     transpile_sql,
 )
 from databricks.sdk.core import Config
 
 from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
-
+from databricks.labs.remorph.transpiler.transpile_status import ParserError, ValidationError
 
 # pylint: disable=unspecified-encoding
 
@@ -179,29 +186,16 @@ def test_with_dir_skip_validation(initial_setup, mock_workspace_client):
         ), "no_of_sql_failed_while_validating does not match expected value"
         assert stat["error_log_file"], "error_log_file is None or empty"
         assert Path(stat["error_log_file"]).name.startswith("err_") and Path(stat["error_log_file"]).name.endswith(
-            ".lst"
-        ), "error_log_file does not match expected pattern 'err_*.lst'"
+            ".jsonl"
+        ), "error_log_file does not match expected pattern 'err_*.jsonl'"
 
     expected_file_name = f"{input_dir}/query3.sql"
     expected_exception = f"Unsupported operation found in file {input_dir}/query3.sql."
-    pattern = r"ValidationError\(file_name='(?P<file_name>[^']+)', exception='(?P<exception>[^']+)'\)"
-
-    with open(Path(status[0]["error_log_file"])) as file:
-        for line in file:
-            # Skip empty lines
-            if line.strip() == "":
-                continue
-
-            match = re.match(pattern, line)
-
-            if match:
-                # Extract information using group names from the pattern
-                error_info = match.groupdict()
-                # Perform assertions
-                assert error_info["file_name"] == expected_file_name, "File name does not match the expected value"
-                assert expected_exception in error_info["exception"], "Exception does not match the expected value"
-            else:
-                print("No match found.")
+    errors = [
+        error for error in read_error_log(Path(status[0]["error_log_file"])) if isinstance(error, ValidationError)
+    ]
+    assert [str(error.file_path) for error in errors] == [expected_file_name]
+    assert expected_exception in errors[0].error_msg
     # cleanup
     safe_remove_dir(input_dir)
     safe_remove_file(Path(status[0]["error_log_file"]))
@@ -234,29 +228,16 @@ def test_with_dir_with_output_folder_skip_validation(initial_setup, mock_workspa
         ), "no_of_sql_failed_while_validating does not match expected value"
         assert stat["error_log_file"], "error_log_file is None or empty"
         assert Path(stat["error_log_file"]).name.startswith("err_") and Path(stat["error_log_file"]).name.endswith(
-            ".lst"
-        ), "error_log_file does not match expected pattern 'err_*.lst'"
+            ".jsonl"
+        ), "error_log_file does not match expected pattern 'err_*.jsonl'"
 
     expected_file_name = f"{input_dir}/query3.sql"
     expected_exception = f"Unsupported operation found in file {input_dir}/query3.sql."
-    pattern = r"ValidationError\(file_name='(?P<file_name>[^']+)', exception='(?P<exception>[^']+)'\)"
-
-    with open(Path(status[0]["error_log_file"])) as file:
-        for line in file:
-            # Skip empty lines
-            if line.strip() == "":
-                continue
-
-            match = re.match(pattern, line)
-
-            if match:
-                # Extract information using group names from the pattern
-                error_info = match.groupdict()
-                # Perform assertions
-                assert error_info["file_name"] == expected_file_name, "File name does not match the expected value"
-                assert expected_exception in error_info["exception"], "Exception does not match the expected value"
-            else:
-                print("No match found.")
+    errors = [
+        error for error in read_error_log(Path(status[0]["error_log_file"])) if isinstance(error, ValidationError)
+    ]
+    assert [str(error.file_path) for error in errors] == [expected_file_name]
+    assert expected_exception in errors[0].error_msg
 
     # cleanup
     safe_remove_dir(input_dir)
@@ -304,16 +285,11 @@ def test_with_file(initial_setup, mock_workspace_client):
             stat["no_of_sql_failed_while_validating"] == 1
         ), "no_of_sql_failed_while_validating does not match expected value"
         assert Path(stat["error_log_file"]).name.startswith("err_") and Path(stat["error_log_file"]).name.endswith(
-            ".lst"
-        ), "error_log_file does not match expected pattern 'err_*.lst'"
-
-    expected_content = f"""
-ValidationError(file_path='{input_dir!s}/query1.sql', error_msg='Mock validation error')
-    """.strip()
+            ".jsonl"
+        ), "error_log_file does not match expected pattern 'err_*.jsonl'"
 
-    with open(Path(status[0]["error_log_file"])) as file:
-        content = file.read().strip()
-        assert content == expected_content, "File content does not match the expected content"
+    expected_errors = [ValidationError(input_dir / "query1.sql", "Mock validation error")]
+    assert list(read_error_log(Path(status[0]["error_log_file"]))) == expected_errors
     # cleanup
     safe_remove_dir(input_dir)
     safe_remove_file(Path(status[0]["error_log_file"]))
@@ -464,6 +440,19 @@ def test_transpile_column_exp(mock_workspace_client):
         assert result[2][1] is None
 
 
+def test_transpile_expressions_with_workers_matches_serial():
+    expressions = [f"nvl(col{i}, {i})" for i in range(25)] + ["col1 +"]
+    results = []
+    for workers in (1, 3):
+        config = TranspileConfig(transpiler_config_path="sqlglot", source_dialect="snowflake", workers=workers)
+        results.append(list(transpile_expressions(config, iter(expressions), chunk_size=4)))
+
+    assert results[0] == results[1]
+    assert len(results[1]) == 26
+    assert results[1][7].transpiled_code == "COALESCE(col7, 7)"
+    assert results[1][25].error_list
+
+
 def test_with_file_with_success(initial_setup, mock_workspace_client):
     input_dir = initial_setup
     sdk_config = create_autospec(Config)
@@ -547,29 +536,16 @@ def test_parse_error_handling(initial_setup, mock_workspace_client):
         ), "no_of_sql_failed_while_validating does not match expected value"
         assert stat["error_log_file"], "error_log_file is None or empty"
         assert Path(stat["error_log_file"]).name.startswith("err_") and Path(stat["error_log_file"]).name.endswith(
-            ".lst"
-        ), "error_log_file does not match expected pattern 'err_*.lst'"
+            ".jsonl"
+        ), "error_log_file does not match expected pattern 'err_*.jsonl'"
 
     expected_file_name = f"{input_dir}/query4.sql"
     expected_exception = "PARSING ERROR Start:"
-    pattern = r"ParserError\(file_name='(?P<file_name>[^']+)', exception=\"(?P<exception>.+)\"\)"
-
-    with open(Path(status[0]["error_log_file"])) as file:
-        for line in file:
-            # Skip empty lines
-            if line.strip() == "":
-                continue
-
-            match = re.match(pattern, line)
-
-            if match:
-                # Extract information using group names from the pattern
-                error_info = match.groupdict()
-                # Perform assertions
-                assert error_info["file_name"] == expected_file_name, "File name does not match the expected value"
-                assert expected_exception in error_info["exception"], "Exception does not match the expected value"
-            else:
-                print("No match found.")
+    errors = [
+        error for error in read_error_log(Path(status[0]["error_log_file"])) if isinstance(error, ParserError)
+    ]
+    assert [str(error.file_path) for error in errors] == [expected_file_name]
+    assert expected_exception in errors[0].error_msg
     # cleanup
     safe_remove_dir(input_dir)
     safe_remove_file(Path(status[0]["error_log_file"]))
@@ -603,29 +579,225 @@ def test_token_error_handling(initial_setup, mock_workspace_client):
         ), "no_of_sql_failed_while_validating does not match expected value"
         assert stat["error_log_file"], "error_log_file is None or empty"
         assert Path(stat["error_log_file"]).name.startswith("err_") and Path(stat["error_log_file"]).name.endswith(
-            ".lst"
-        ), "error_log_file does not match expected pattern 'err_*.lst'"
+            ".jsonl"
+        ), "error_log_file does not match expected pattern 'err_*.jsonl'"
 
     expected_file_name = f"{input_dir}/query5.sql"
     expected_exception = "TOKEN ERROR Start:"
-    pattern = r"ParserError\(file_name='(?P<file_name>[^']+)', exception=\"(?P<exception>.+)\"\)"
-
-    with open(Path(status[0]["error_log_file"])) as file:
-        for line in file:
-            # Skip empty lines
-            if line.strip() == "":
-                continue
-
-            match = re.match(pattern, line)
-
-            if match:
-                # Extract information using group names from the pattern
-                error_info = match.groupdict()
-                # Perform assertions
-                assert error_info["file_name"] == expected_file_name, "File name does not match the expected value"
-                assert expected_exception in error_info["exception"], "Exception does not match the expected value"
-            else:
-                print("No match found.")
+    errors = [
+        error for error in read_error_log(Path(status[0]["error_log_file"])) if isinstance(error, ParserError)
+    ]
+    assert [str(error.file_path) for error in errors] == [expected_file_name]
+    assert expected_exception in errors[0].error_msg
+    # cleanup
+    safe_remove_dir(input_dir)
+    safe_remove_file(Path(status[0]["error_log_file"]))
+
+
+def test_with_dir_with_workers_matches_serial(initial_setup, mock_workspace_client):
+    input_dir = initial_setup
+    output_dir = input_dir / "transpiled"
+    statuses = []
+    outputs = []
+    for workers in (1, 3):
+        config = TranspileConfig(
+            transpiler_config_path="sqlglot",
+            input_source=str(input_dir),
+            output_folder=None,
+            sdk_config=None,
+            source_dialect="snowflake",
+            skip_validation=True,
+            workers=workers,
+        )
+        status = transpile(mock_workspace_client, SqlglotEngine(), config)
+        with open(Path(status[0]["error_log_file"])) as file:
+            errors = file.read()
+        safe_remove_file(Path(status[0]["error_log_file"]))
+        statuses.append({**status[0], "error_log_file": errors})
+        outputs.append({path.name: path.read_text() for path in sorted(output_dir.iterdir())})
+        safe_remove_dir(output_dir)
+
+    assert statuses[0] == statuses[1]
+    assert outputs[0] == outputs[1]
+    assert statuses[1]["total_files_processed"] == 8
+    assert statuses[1]["total_queries_processed"] == 7
+    # cleanup
+    safe_remove_dir(input_dir)
+
+
+def test_with_dir_with_cache(initial_setup, mock_workspace_client, tmp_path):
+    input_dir = initial_setup
+    config = TranspileConfig(
+        transpiler_config_path="sqlglot",
+        input_source=str(input_dir),
+        output_folder=None,
+        sdk_config=None,
+        source_dialect="snowflake",
+        skip_validation=True,
+        cache_folder=str(tmp_path / "cache"),
+    )
+    first = transpile(mock_workspace_client, SqlglotEngine(), config)
+    first_output = (input_dir / "transpiled" / "query1.sql").read_text()
+    safe_remove_dir(input_dir / "transpiled")
+    write_data_to_file(input_dir / "query2.sql", "select col2 from table2;")
+    with patch.object(SqlglotEngine, "transpile", autospec=True, side_effect=SqlglotEngine.transpile) as mock_transpile:
+        second = transpile(mock_workspace_client, SqlglotEngine(), config)
+
+    assert first[0]["cache_hits"] == 0
+    assert first[0]["cache_misses"] == 7
+    assert second[0]["cache_hits"] == 6
+    assert second[0]["cache_misses"] == 1
+    assert mock_transpile.call_count == 1
+    assert (input_dir / "transpiled" / "query1.sql").read_text() == first_output
+    assert second[0]["no_of_sql_failed_while_parsing"] == first[0]["no_of_sql_failed_while_parsing"]
+    assert second[0]["no_of_sql_failed_while_validating"] == first[0]["no_of_sql_failed_while_validating"]
+    assert len(list((tmp_path / "cache" / "entries").iterdir())) == 7
+    # cleanup
+    safe_remove_dir(input_dir)
+    safe_remove_file(Path(first[0]["error_log_file"]))
+    safe_remove_file(Path(second[0]["error_log_file"]))
+
+
+def test_with_dir_with_validation_concurrency(initial_setup, mock_workspace_client):
+    input_dir = initial_setup
+    output_dir = input_dir / "transpiled"
+    lock = threading.Lock()
+    in_flight = [0, 0]  # current, maximum
+
+    def validate(_, sql):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        # complete out of order, the output must still be mapped back to its file
+        time.sleep(0.01 * (len(sql) % 3))
+        with lock:
+            in_flight[0] -= 1
+        return ValidationResult(f"-- validated\n{sql}", "Mock validation error" if "col2" in sql else None)
+
+    mock_validate = create_autospec(Validator)
+    mock_validate.validate_format_result.side_effect = validate
+    statuses = []
+    outputs = []
+    for validation_concurrency in (1, 3):
+        config = TranspileConfig(
+            transpiler_config_path="sqlglot",
+            input_source=str(input_dir),
+            output_folder=None,
+            sdk_config=None,
+            source_dialect="snowflake",
+            skip_validation=False,
+            validation_concurrency=validation_concurrency,
+        )
+        with (
+            patch('databricks.labs.remorph.helpers.db_sql.get_sql_backend', return_value=MockBackend()),
+            patch("databricks.labs.remorph.transpiler.execute.Validator", return_value=mock_validate),
+        ):
+            status = transpile(mock_workspace_client, SqlglotEngine(), config)
+        with open(Path(status[0]["error_log_file"])) as file:
+            errors = file.read()
+        safe_remove_file(Path(status[0]["error_log_file"]))
+        statuses.append({**status[0], "error_log_file": errors})
+        outputs.append({path.name: path.read_text() for path in sorted(output_dir.iterdir())})
+        safe_remove_dir(output_dir)
+
+    assert statuses[0] == statuses[1]
+    assert outputs[0] == outputs[1]
+    assert statuses[1]["no_of_sql_failed_while_validating"] == 1
+    assert 1 < in_flight[1] <= 3
+    # cleanup
+    safe_remove_dir(input_dir)
+
+
+def test_with_file_streamed_matches_whole_file(initial_setup, mock_workspace_client):
+    input_dir = initial_setup
+    input_file = input_dir / "streamed.sql"
+    write_data_to_file(
+        input_file,
+        """select col1 from table1;
+        -- second statement; with a comment
+        select 'a;b' as col2, nvl(col3, 0) from table2;
+        select * from table3""",
+    )
+    statuses = []
+    outputs = []
+    for streaming_threshold_mb in (None, 0):
+        config = TranspileConfig(
+            transpiler_config_path="sqlglot",
+            input_source=str(input_file),
+            output_folder=None,
+            sdk_config=None,
+            source_dialect="snowflake",
+            skip_validation=True,
+            streaming_threshold_mb=streaming_threshold_mb,
+        )
+        statuses.append(transpile(mock_workspace_client, SqlglotEngine(), config)[0])
+        outputs.append((input_dir / "transpiled" / "streamed.sql").read_text())
+
+    assert statuses[0] == statuses[1]
+    assert statuses[1]["total_queries_processed"] == 3
+    assert outputs[0] == outputs[1]
+    # cleanup
+    safe_remove_dir(input_dir)
+
+
+def test_with_file_with_statement_templates(initial_setup, mock_workspace_client):
+    input_dir = initial_setup
+    input_file = input_dir / "audit.sql"
+    write_data_to_file(input_file, "\n".join(f"INSERT INTO audit VALUES ({n}00, 'event {n}');" for n in range(1, 10)))
+    statuses = []
+    for statement_templates in (0, 100):
+        config = TranspileConfig(
+            transpiler_config_path="sqlglot",
+            input_source=str(input_file),
+            output_folder=None,
+            sdk_config=None,
+            source_dialect="snowflake",
+            skip_validation=True,
+            statement_templates=statement_templates,
+        )
+        statuses.append(transpile(mock_workspace_client, SqlglotEngine(), config)[0])
+
+    assert statuses[0]["statements_collapsed"] == 0
+    assert statuses[1]["statements_collapsed"] == 9
+    # cleanup
+    safe_remove_dir(input_dir)
+
+
+def test_with_dir_with_trace_file(initial_setup, mock_workspace_client, tmp_path):
+    input_dir = initial_setup
+    config = TranspileConfig(
+        transpiler_config_path="sqlglot",
+        input_source=str(input_dir),
+        output_folder=None,
+        sdk_config=None,
+        source_dialect="snowflake",
+        skip_validation=True,
+        workers=2,
+        trace_file=str(tmp_path / "trace.json"),
+    )
+    status = transpile(mock_workspace_client, SqlglotEngine(), config)
+
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    names = {event["name"] for event in trace["traceEvents"]}
+    assert {"run", "file", "read", "tokenize", "parse", "lca_check", "generate", "write"} <= names
+    files = [event for event in trace["traceEvents"] if event["name"] == "file"]
+    assert len(files) == 7
+    # the files are transpiled in the pool workers, their spans are merged into the trace of the run
+    assert {event["pid"] for event in files} != {os.getpid()}
     # cleanup
     safe_remove_dir(input_dir)
     safe_remove_file(Path(status[0]["error_log_file"]))
+
+
+def test_transpile_expressions_in_a_worker_under_a_memory_budget():
+    config = TranspileConfig(
+        transpiler_config_path="sqlglot",
+        source_dialect="snowflake",
+        budget=Budget(statement_memory_mb=1024),
+    )
+    with patch("databricks.labs.remorph.transpiler.execute.ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+        results = list(transpile_expressions(config, iter(["nvl(a, 0)", "col1 +"])))
+    pool.assert_called_once()
+    assert pool.call_args.kwargs["max_workers"] == 1
+    assert results[0].transpiled_code == "COALESCE(a, 0)"
+    assert results[1].error_list
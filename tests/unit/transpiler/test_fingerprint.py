@@ -0,0 +1,78 @@
+from sqlglot import parse_one
+from sqlglot.tokens import Token, TokenType
+
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.fingerprint import (
+    Fingerprint,
+    StatementTemplates,
+    Template,
+    sentinel,
+)
+
+SNOWFLAKE = DIALECTS.get("snowflake")
+DATABRICKS = DIALECTS.get("databricks")
+
+
+def _fingerprint(sql: str) -> Fingerprint:
+    return Fingerprint.from_tokens(SNOWFLAKE, DATABRICKS, SNOWFLAKE.tokenize(sql))
+
+
+def test_statements_differing_in_literals_of_the_same_shape_share_a_fingerprint():
+    assert _fingerprint("SELECT a FROM t WHERE b = 'abc' AND c > 1.25").key == (
+        _fingerprint("SELECT a  FROM t\nWHERE b = 'xyz' AND c > 9.75").key
+    )
+    assert _fingerprint("SELECT a FROM t WHERE b = 'abc'").key != _fingerprint("SELECT a FROM t WHERE b = 'abcd'").key
+    assert _fingerprint("SELECT 12").key != _fingerprint("SELECT 1.2").key
+    assert _fingerprint("SELECT a FROM t").key != _fingerprint("SELECT a FROM u").key
+    assert _fingerprint("SELECT 1 -- one").key != _fingerprint("SELECT 1 -- two").key
+
+
+def test_short_and_escaped_literals_are_part_of_the_fingerprint():
+    assert not _fingerprint("SELECT 1").literals
+    assert not _fingerprint("SELECT 'it''s'").literals
+    assert _fingerprint("SELECT 1").key != _fingerprint("SELECT 2").key
+
+
+def test_sentinels_keep_the_shape_of_literals_and_are_unique():
+    assert sentinel(Token(TokenType.NUMBER, "12.50"), 0) == "99.90"
+    assert sentinel(Token(TokenType.STRING, "2024-01-01"), 27) == "zzzzzzzzbc"
+    assert sentinel(Token(TokenType.NUMBER, "7"), 0) is None
+    assert sentinel(Token(TokenType.VAR, "abc"), 0) is None
+    sentinels = [sentinel(Token(TokenType.NUMBER, "1000"), index) for index in range(500)]
+    assert len(set(sentinels)) == 500
+
+
+def test_only_literals_used_as_plain_operands_are_opaque():
+    tokens = SNOWFLAKE.tokenize("SELECT a FROM t WHERE b = 'abc' AND c IN (10, 20) LIMIT 50")
+    fingerprint = Fingerprint.from_tokens(SNOWFLAKE, DATABRICKS, tokens)
+    probe = SNOWFLAKE.parser().parse(fingerprint.probe_tokens(tokens))[0]
+    assert fingerprint.has_opaque_literals(probe)
+    tokens = SNOWFLAKE.tokenize("SELECT TO_CHAR(a, 'YYYY') FROM t")
+    fingerprint = Fingerprint.from_tokens(SNOWFLAKE, DATABRICKS, tokens)
+    assert not fingerprint.has_opaque_literals(parse_one("SELECT TO_CHAR(a, 'zzza') FROM t", read="snowflake"))
+
+
+def test_template_fills_literals_in_their_order_in_the_output():
+    template = Template.derive("SELECT f(99, 'zza') FROM t WHERE x = 98", ["98", "'zza'", "99"])
+    assert template == Template(("SELECT f(", ", ", ") FROM t WHERE x = ", ""), (2, 1, 0))
+    assert template.fill(["10", "'abc'", "20"]) == "SELECT f(20, 'abc') FROM t WHERE x = 10"
+    assert Template.derive("SELECT 99, 99", ["99"]) is None
+
+
+def test_templates_evict_the_least_recently_used_fingerprint():
+    templates = StatementTemplates(max_size=2)
+    first, second, third = (_fingerprint(sql) for sql in ("SELECT 10", "SELECT 'ab'", "SELECT 1.5"))
+    templates.record(first, "SELECT\n  10")
+    templates.record(second, "SELECT\n  'ab'")
+    assert templates.transpile(_fingerprint("SELECT 20"), DATABRICKS, lambda: "SELECT\n  90") == "SELECT\n  20"
+    templates.record(third, "SELECT\n  1.5")
+    assert len(templates) == 2
+    assert templates.transpile(_fingerprint("SELECT 'cd'"), DATABRICKS, lambda: "SELECT\n  'za'") is None
+    assert templates.transpile(_fingerprint("SELECT 30"), DATABRICKS, lambda: None) == "SELECT\n  30"
+
+
+def test_template_is_not_derived_when_it_does_not_reproduce_the_first_statement():
+    templates = StatementTemplates()
+    templates.record(_fingerprint("SELECT 10"), "SELECT\n  10")
+    assert templates.transpile(_fingerprint("SELECT 20"), DATABRICKS, lambda: "SELECT\n  90 + 1") is None
+    assert templates.transpile(_fingerprint("SELECT 30"), DATABRICKS, lambda: "SELECT\n  90") is None
@@ -42,6 +42,8 @@ custom:
         ("dialects", [], "Missing dialects entry"),
         ("command_line", None, "Missing command_line entry"),
         ("command_line", [], "Missing command_line entry"),
+        ("pool_size", 0, "Invalid pool_size entry"),
+        ("request_timeout", -1, "Invalid request_timeout entry"),
     ],
 )
 def test_invalid_config_raises_error(key, value, message):
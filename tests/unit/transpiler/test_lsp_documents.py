@@ -0,0 +1,64 @@
+import pytest
+
+from databricks.labs.remorph.transpiler.lsp.lsp_documents import (
+    LineIndex,
+    StatementResult,
+    apply_text_edits,
+    split_result,
+    statement_spans,
+    text_change,
+)
+
+
+@pytest.mark.parametrize(
+    "old_text, new_text",
+    [
+        ("SELECT a FROM t", "SELECT b FROM t"),
+        ("SELECT a\nFROM t", "SELECT a\nFROM t\nWHERE x = 1"),
+        ("SELECT a\nFROM t\nWHERE x = 1", "SELECT a\nFROM t"),
+        ("aaaa", "aa"),
+        ("", "SELECT 1"),
+        ("x" * 10_000 + "a" + "y" * 10_000, "x" * 10_000 + "bb" + "y" * 10_000),
+    ],
+)
+def test_text_change_turns_the_old_text_into_the_new_one(old_text, new_text):
+    change = text_change(old_text, new_text)
+    assert change is not None
+    assert apply_text_edits(old_text, [{"range": change["range"], "newText": change["text"]}]) == new_text
+
+
+def test_text_change_is_limited_to_the_difference():
+    change = text_change("SELECT a\nFROM t\nWHERE x = 1", "SELECT a\nFROM t\nWHERE x = 22")
+    assert change == {
+        "range": {"start": {"line": 2, "character": 10}, "end": {"line": 2, "character": 11}},
+        "text": "22",
+    }
+    assert text_change("SELECT 1", "SELECT 1") is None
+
+
+def test_line_index_round_trips_offsets():
+    index = LineIndex("SELECT 1;\r\nSELECT 2;\nSELECT 3")
+    assert index.position(11) == {"line": 1, "character": 0}
+    assert index.offset({"line": 2, "character": 3}) == 24
+    assert index.offset({"line": 7, "character": 0}) == 29
+
+
+def test_statement_spans_cover_the_statements():
+    text = "SELECT 1;\nSELECT 'a;b';\n"
+    assert [text[start:end] for start, end in statement_spans(text, "snowflake")] == ["SELECT 1;", "\nSELECT 'a;b';"]
+
+
+def test_split_result_assigns_edits_and_errors_to_their_statement():
+    text = "SELECT nvl(a, 0);\nSELECT !!;"
+    spans = statement_spans(text, "snowflake")
+    results = split_result(text, spans, [(7, 11, "COALESCE(")], [(25, "Unsupported syntax")])
+    assert results == {
+        "SELECT nvl(a, 0);": StatementResult("SELECT COALESCE(a, 0);"),
+        "\nSELECT !!;": StatementResult("\nSELECT !!;", [(8, "Unsupported syntax")]),
+    }
+
+
+def test_split_result_leaves_out_statements_sharing_an_edit():
+    text = "SELECT 1;\nSELECT 2;\nSELECT 3;"
+    results = split_result(text, statement_spans(text, "snowflake"), [(7, 17, "x")], [])
+    assert list(results) == ["\nSELECT 3;"]
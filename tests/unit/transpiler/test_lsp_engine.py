@@ -0,0 +1,250 @@
+import concurrent.futures
+import re
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from databricks.labs.remorph.config import TranspileConfig
+from databricks.labs.remorph.transpiler.execute import transpile
+from databricks.labs.remorph.transpiler.lsp.lsp_connection import LSPConnection
+from databricks.labs.remorph.transpiler.lsp.lsp_documents import apply_text_edits
+from databricks.labs.remorph.transpiler.lsp.lsp_engine import LSPEngine
+from databricks.labs.remorph.transpiler.transpile_engine import TranspileEngine
+from databricks.labs.remorph.transpiler.transpile_status import ParserError
+from tests.unit.conftest import path_to_resource
+
+
+@pytest.fixture
+def lsp_engine():
+    engine = LSPEngine.from_config_path(Path(path_to_resource("lsp_transpiler", "lsp_config.yml")))
+    yield engine
+    engine.close()
+
+
+def _pool_config(
+    tmp_path: Path, pool_size: int, request_timeout: float = 300, transpile_range: bool = True
+) -> Path:
+    server = Path(path_to_resource("lsp_transpiler", "lsp_server.py"))
+    config = {
+        "remorph": {
+            "version": 1,
+            "dialects": ["snowflake"],
+            "environment": [{"SOME_ENV": "abc"}, {"TRANSPILE_RANGE": str(transpile_range).lower()}],
+            "command_line": [sys.executable, str(server)],
+            "pool_size": pool_size,
+            "request_timeout": request_timeout,
+        },
+        "custom": {},
+    }
+    config_path = tmp_path / "lsp_config.yml"
+    config_path.write_text(yaml.dump(config))
+    return config_path
+
+
+def _server_pids(engine: LSPEngine) -> set[int]:
+    # pylint: disable=protected-access
+    return {server._connection.pid for server in engine._servers if server._connection is not None}
+
+
+def test_transpiles_through_the_server(lsp_engine):
+    result = lsp_engine.transpile("snowflake", "databricks", "SELECT nvl(a, 0) FROM t", Path("query.sql"))
+    assert result.transpiled_code == "SELECT COALESCE(a, 0) FROM t"
+    assert result.success_count == 1
+    assert not result.error_list
+
+
+def test_server_starts_with_the_configured_environment(lsp_engine):
+    lsp_engine.transpile("snowflake", "databricks", "SELECT 1", Path("query.sql"))
+    assert lsp_engine.server_info == {"name": "test-lsp-server", "version": "abc"}
+
+
+def test_error_diagnostics_become_parser_errors(lsp_engine):
+    result = lsp_engine.transpile("snowflake", "databricks", "SELECT 1;\nSELECT !! FROM t", Path("query.sql"))
+    assert result.error_list == [ParserError(Path("query.sql"), "Unsupported syntax (line 2, column 8)")]
+
+
+def test_analyses_table_lineage_through_the_server(lsp_engine):
+    lineage = lsp_engine.analyse_table_lineage("snowflake", "INSERT INTO target SELECT * FROM source", Path("q.sql"))
+    assert list(lineage) == [("source", "target")]
+
+
+def test_pipelines_requests_on_one_server(lsp_engine):
+    sqls = [f"SELECT nvl(col{i}, {i})" for i in range(50)]
+    futures = [lsp_engine.submit("snowflake", "databricks", sql, Path(f"query{i}.sql")) for i, sql in enumerate(sqls)]
+    pids = _server_pids(lsp_engine)
+    results = [future.result(timeout=30) for future in futures]
+    assert [result.transpiled_code for result in results] == [f"SELECT COALESCE(col{i}, {i})" for i in range(50)]
+    assert len(pids) == 1
+    assert _server_pids(lsp_engine) == pids
+
+
+def test_pipelines_requests_with_responses_larger_than_the_pipe_buffer(tmp_path):
+    engine = LSPEngine.from_config_path(_pool_config(tmp_path, pool_size=1, request_timeout=5))
+    # the server blocks on writing its responses while requests are still being written to it
+    sql = "\n".join(f"SELECT nvl(column_{i}, 0) FROM t;" for i in range(300))
+    try:
+        futures = [engine.submit("snowflake", "databricks", sql, Path(f"query{i}.sql")) for i in range(16)]
+        results = [future.result(timeout=60) for future in futures]
+    finally:
+        engine.close()
+    assert all(result.transpiled_code == sql.replace("nvl(", "COALESCE(") for result in results)
+
+
+def test_server_exit_fails_the_request_and_restarts_the_server(lsp_engine):
+    lsp_engine.transpile("snowflake", "databricks", "SELECT 1", Path("query.sql"))
+    first_pids = _server_pids(lsp_engine)
+    # the file is sent again to the restarted server, which exits again, until the attempts are exhausted
+    with pytest.raises(ConnectionError):
+        lsp_engine.transpile("snowflake", "databricks", "CRASH", Path("query.sql"))
+    result = lsp_engine.transpile("snowflake", "databricks", "SELECT nvl(a, 0)", Path("query.sql"))
+    assert result.transpiled_code == "SELECT COALESCE(a, 0)"
+    assert _server_pids(lsp_engine).isdisjoint(first_pids)
+
+
+def test_transpiles_a_directory_through_the_server(lsp_engine, mock_workspace_client, tmp_path):
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for i in range(20):
+        (input_dir / f"query{i}.sql").write_text(f"SELECT nvl(col{i}, 0) FROM t{i}")
+    config = TranspileConfig(
+        transpiler_config_path=path_to_resource("lsp_transpiler", "lsp_config.yml"),
+        input_source=str(input_dir),
+        output_folder=None,
+        source_dialect="snowflake",
+        skip_validation=True,
+    )
+    status = transpile(mock_workspace_client, lsp_engine, config)
+    Path(status[0]["error_log_file"]).unlink(missing_ok=True)
+    assert status[0]["total_files_processed"] == 20
+    assert status[0]["total_queries_processed"] == 20
+    assert status[0]["no_of_sql_failed_while_parsing"] == 0
+    for i in range(20):
+        assert (input_dir / "transpiled" / f"query{i}.sql").read_text() == f"SELECT COALESCE(col{i}, 0) FROM t{i}\n;\n"
+
+
+def test_applies_text_edits_from_the_last_one():
+    edits = [
+        {"range": {"start": {"line": 0, "character": 7}, "end": {"line": 0, "character": 10}}, "newText": "COALESCE"},
+        {"range": {"start": {"line": 1, "character": 5}, "end": {"line": 1, "character": 6}}, "newText": "tbl"},
+    ]
+    assert apply_text_edits("SELECT nvl(a, b)\nFROM t", edits) == "SELECT COALESCE(a, b)\nFROM tbl"
+
+
+@pytest.fixture
+def pool_engine(tmp_path):
+    engines = []
+
+    def _engine(pool_size: int, request_timeout: float = 300, transpile_range: bool = True) -> LSPEngine:
+        engine = LSPEngine.from_config_path(_pool_config(tmp_path, pool_size, request_timeout, transpile_range))
+        engines.append(engine)
+        return engine
+
+    yield _engine
+    for engine in engines:
+        engine.close()
+
+
+def test_load_engine_configures_the_pool(tmp_path):
+    engine = TranspileEngine.load_engine(_pool_config(tmp_path, 3, 60))
+    assert isinstance(engine, LSPEngine)
+    assert engine.config.pool_size == 3
+    assert engine.config.request_timeout == 60.0
+    assert engine.max_in_flight == 48
+
+
+def test_pool_spreads_files_across_servers(pool_engine):
+    engine = pool_engine(2)
+    futures = [
+        engine.submit("snowflake", "databricks", f"SELECT nvl(col{i}, 0)", Path(f"query{i}.sql")) for i in range(40)
+    ]
+    results = [future.result(timeout=30) for future in futures]
+    assert [result.transpiled_code for result in results] == [f"SELECT COALESCE(col{i}, 0)" for i in range(40)]
+    assert len(_server_pids(engine)) == 2
+
+
+def test_pool_sends_the_files_of_a_crashed_server_again(pool_engine, tmp_path):
+    engine = pool_engine(2)
+    crash = f"SELECT nvl(a, 0) -- CRASH ONCE {tmp_path / 'crashed'}"
+    futures = [engine.submit("snowflake", "databricks", crash, Path("crash.sql"))]
+    futures += [engine.submit("snowflake", "databricks", f"SELECT nvl(col{i}, 0)", Path("q.sql")) for i in range(9)]
+    results = [future.result(timeout=30) for future in futures]
+    assert results[0].transpiled_code.startswith("SELECT COALESCE(a, 0)")
+    assert [result.transpiled_code for result in results[1:]] == [f"SELECT COALESCE(col{i}, 0)" for i in range(9)]
+
+
+def test_pool_restarts_a_hung_server(pool_engine, tmp_path):
+    engine = pool_engine(1, request_timeout=0.5)
+    engine.transpile("snowflake", "databricks", "SELECT 1", Path("query.sql"))
+    first_pids = _server_pids(engine)
+    hang = f"SELECT nvl(a, 0) -- HANG ONCE {tmp_path / 'hung'}"
+    futures = [engine.submit("snowflake", "databricks", hang, Path("hang.sql"))]
+    futures += [engine.submit("snowflake", "databricks", f"SELECT nvl(col{i}, 0)", Path("q.sql")) for i in range(5)]
+    results = [future.result(timeout=30) for future in futures]
+    assert results[0].transpiled_code.startswith("SELECT COALESCE(a, 0)")
+    assert [result.transpiled_code for result in results[1:]] == [f"SELECT COALESCE(col{i}, 0)" for i in range(5)]
+    assert _server_pids(engine).isdisjoint(first_pids)
+
+
+def test_table_lineage_of_a_hung_server_times_out(pool_engine):
+    engine = pool_engine(1, request_timeout=0.5)
+    sql = "INSERT INTO target SELECT * FROM source -- HANG"
+    # without the watchdog killing hung servers, only the timeout of the request ends the wait
+    with patch.object(LSPEngine, "_watch_servers"), pytest.raises(concurrent.futures.TimeoutError):
+        list(engine.analyse_table_lineage("snowflake", sql, Path("q.sql")))
+
+
+def _procedure(statements: int, edited: int | None = None) -> str:
+    lines = []
+    for i in range(statements):
+        value = "edited" if i == edited else f"value{i}"
+        lines.extend([f"INSERT INTO target{i}", f"SELECT nvl(col{i}, '{value}')", f"FROM source{i}", "WHERE 1 = 1;"])
+    return "\n".join(lines) + "\n"
+
+
+def test_transpiles_only_the_changed_statement_again(lsp_engine):
+    lsp_engine.transpile("snowflake", "databricks", _procedure(1250), Path("procedure.sql"))
+    edited = _procedure(1250, edited=700)
+    with (
+        patch.object(LSPConnection, "request", autospec=True, side_effect=LSPConnection.request) as request,
+        patch.object(LSPConnection, "notify", autospec=True, side_effect=LSPConnection.notify) as notify,
+    ):
+        result = lsp_engine.transpile("snowflake", "databricks", edited, Path("procedure.sql"))
+    assert result.transpiled_code == re.sub("nvl\\(", "COALESCE(", edited)
+    [(_, method, params)] = [call.args for call in request.call_args_list]
+    assert method == "document/transpileToDatabricks"
+    assert params["range"] == {"start": {"line": 2799, "character": 12}, "end": {"line": 2803, "character": 12}}
+    [(_, method, params)] = [call.args for call in notify.call_args_list]
+    assert method == "textDocument/didChange"
+    assert params["contentChanges"] == [
+        {"range": {"start": {"line": 2801, "character": 20}, "end": {"line": 2801, "character": 28}}, "text": "edited"}
+    ]
+
+
+def test_transpiles_the_whole_document_again_without_range_capability(pool_engine):
+    engine = pool_engine(1, transpile_range=False)
+    engine.transpile("snowflake", "databricks", _procedure(10), Path("procedure.sql"))
+    edited = _procedure(10, edited=7)
+    with patch.object(LSPConnection, "request", autospec=True, side_effect=LSPConnection.request) as request:
+        result = engine.transpile("snowflake", "databricks", edited, Path("procedure.sql"))
+    assert result.transpiled_code == re.sub("nvl\\(", "COALESCE(", edited)
+    [(_, method, params)] = [call.args for call in request.call_args_list]
+    assert method == "document/transpileToDatabricks"
+    assert "range" not in params
+
+
+def test_transpiles_an_unchanged_document_without_request(lsp_engine):
+    lsp_engine.transpile("snowflake", "databricks", _procedure(10), Path("procedure.sql"))
+    with patch.object(LSPConnection, "request", autospec=True, side_effect=LSPConnection.request) as request:
+        result = lsp_engine.transpile("snowflake", "databricks", _procedure(10), Path("procedure.sql"))
+    assert result.transpiled_code == re.sub("nvl\\(", "COALESCE(", _procedure(10))
+    request.assert_not_called()
+
+
+def test_reused_statements_report_their_errors_where_they_moved(lsp_engine):
+    lsp_engine.transpile("snowflake", "databricks", "SELECT 1;\nSELECT 2;\nSELECT !!;\nSELECT 4;", Path("q.sql"))
+    moved = "SELECT 1;\n\n\nSELECT 2;\nSELECT !!;\nSELECT 4;"
+    result = lsp_engine.transpile("snowflake", "databricks", moved, Path("q.sql"))
+    assert result.error_list == [ParserError(Path("q.sql"), "Unsupported syntax (line 5, column 8)")]
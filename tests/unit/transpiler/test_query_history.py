@@ -0,0 +1,149 @@
+import csv
+import json
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+import pytest
+
+from databricks.labs.remorph import cli
+from databricks.labs.remorph.config import TranspileConfig
+from databricks.labs.remorph.transpiler.query_history import (
+    RESULT_COLUMNS,
+    read_query_history,
+    transpile_query_history,
+)
+
+QUERIES = [
+    ("q1", "SELECT IFF(a > 0, 1, 0)\nFROM t"),
+    ("q2", "SELECT FROM WHERE"),
+    ("q3", None),
+    ("q4", "SELECT nvl(b, 'x;y') FROM u"),
+    ("q5", "SELECT 5"),
+]
+
+
+@pytest.fixture
+def config():
+    return TranspileConfig(transpiler_config_path="sqlglot", source_dialect="snowflake")
+
+
+def _write(path, queries):
+    if path.suffix == ".parquet":
+        ids, sqls = zip(*queries)
+        pq.write_table(pa.table({"QUERY_ID": list(ids), "QUERY_TEXT": list(sqls), "USER_NAME": ["u"] * len(ids)}), path)
+    elif path.suffix == ".csv":
+        with path.open("w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["QUERY_ID", "USER_NAME", "QUERY_TEXT"])
+            writer.writerows((query_id, "u", sql) for query_id, sql in queries)
+    else:
+        with path.open("w", encoding="utf-8") as f:
+            for query_id, sql in queries:
+                f.write(json.dumps({"QUERY_ID": query_id, "USER_NAME": "u", "QUERY_TEXT": sql}) + "\n\n")
+    return path
+
+
+def _read(path) -> list[dict]:
+    if path.suffix == ".parquet":
+        return pq.read_table(path).to_pylist()
+    if path.suffix == ".csv":
+        with path.open(encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+    with path.open(encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".parquet"])
+def test_reads_batches_of_the_id_and_sql_columns(tmp_path, extension):
+    path = _write(tmp_path / f"history{extension}", QUERIES)
+    batches = list(read_query_history(path, "query_id", "query_text", batch_size=2))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    assert batches[0].schema.names == ["QUERY_ID", "QUERY_TEXT"]
+    assert [row for batch in batches for row in zip(*(column.to_pylist() for column in batch.columns))] == [
+        (query_id, "" if sql is None and extension == ".csv" else sql) for query_id, sql in QUERIES
+    ]
+
+
+def test_rejects_missing_columns_and_unsupported_formats(tmp_path):
+    path = _write(tmp_path / "history.parquet", QUERIES)
+    with pytest.raises(ValueError, match="Column 'statement' not found"):
+        next(read_query_history(path, "query_id", "statement"))
+    with pytest.raises(ValueError, match="Unsupported query history format"):
+        read_query_history(tmp_path / "history.xlsx", "query_id", "query_text")
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl", ".parquet"])
+def test_transpiles_a_query_history_to_the_same_format(tmp_path, config, extension):
+    input_file = _write(tmp_path / f"history{extension}", QUERIES)
+    output_file = tmp_path / "out" / f"transpiled{extension}"
+    status = transpile_query_history(config, input_file, output_file, "query_id", "query_text", batch_size=2)
+    assert status == {
+        "total_queries_processed": 5,
+        "no_of_sql_failed_while_parsing": 1,
+        "no_of_sql_failed_while_validating": 0,
+        "no_of_sql_over_resource_limits": 0,
+        "statements_collapsed": 0,
+        "output_file": str(output_file),
+    }
+    rows = _read(output_file)
+    assert list(rows[0]) == ["QUERY_ID", *RESULT_COLUMNS]
+    assert [row["QUERY_ID"] for row in rows] == ["q1", "q2", "q3", "q4", "q5"]
+    assert rows[0]["transpiled_sql"] == "SELECT\n  IF(a > 0, 1, 0)\nFROM t"
+    assert rows[1]["error_type"] == "ParserError"
+    assert rows[3]["transpiled_sql"] == "SELECT\n  COALESCE(b, 'x;y')\nFROM u"
+    assert not rows[4]["error_type"]
+
+
+def test_transpiles_ids_of_mixed_types_across_batches(tmp_path, config):
+    input_file = _write(tmp_path / "history.jsonl", [(1, "SELECT 1"), ("abc", "SELECT 2"), (None, "SELECT 3")])
+    output_file = tmp_path / "transpiled.parquet"
+    transpile_query_history(config, input_file, output_file, "query_id", "query_text", batch_size=1)
+    assert [row["QUERY_ID"] for row in _read(output_file)] == ["1", "abc", None]
+
+
+def test_transpiles_an_empty_query_history(tmp_path, config):
+    input_file = tmp_path / "history.jsonl"
+    input_file.write_text("", encoding="utf-8")
+    output_file = tmp_path / "transpiled.parquet"
+    status = transpile_query_history(config, input_file, output_file, "query_id", "query_text")
+    assert status["total_queries_processed"] == 0
+    assert pq.read_table(output_file).column_names == ["query_id", *RESULT_COLUMNS]
+
+
+def test_transpiles_batches_across_workers(tmp_path):
+    queries = [(f"q{i}", f"SELECT nvl(c{i}, {i}) FROM t") for i in range(50)]
+    input_file = _write(tmp_path / "history.parquet", queries)
+    output_file = tmp_path / "transpiled.parquet"
+    pool_config = TranspileConfig(transpiler_config_path="sqlglot", source_dialect="snowflake", workers=2)
+    transpile_query_history(pool_config, input_file, output_file, "query_id", "query_text", batch_size=7)
+    rows = _read(output_file)
+    assert [row["QUERY_ID"] for row in rows] == [query_id for query_id, _ in queries]
+    assert rows[49]["transpiled_sql"] == "SELECT\n  COALESCE(c49, 49)\nFROM t"
+
+
+def test_transpiles_queries_differing_in_literals_once_with_statement_templates(tmp_path):
+    queries = [(f"q{i}", f"SELECT nvl(c, {i}00) FROM t WHERE d = 'day {i}'") for i in range(1, 10)]
+    input_file = _write(tmp_path / "history.parquet", queries)
+    output_file = tmp_path / "transpiled.parquet"
+    templates_config = TranspileConfig(
+        transpiler_config_path="sqlglot", source_dialect="snowflake", statement_templates=10
+    )
+    status = transpile_query_history(templates_config, input_file, output_file, "query_id", "query_text")
+    # the first query is transpiled, the second one derives the template
+    assert status["statements_collapsed"] == 8
+    rows = _read(output_file)
+    assert rows[8]["transpiled_sql"] == "SELECT\n  COALESCE(c, 900)\nFROM t\nWHERE\n  d = 'day 9'"
+
+
+def test_cli_transpile_query_history(tmp_path, capsys):
+    input_file = _write(tmp_path / "history.csv", QUERIES)
+    cli.transpile_query_history("snowflake", str(input_file), batch_size="2")
+    status = json.loads(capsys.readouterr().out)
+    assert status["output_file"] == str(tmp_path / "history_transpiled.csv")
+    assert len(_read(tmp_path / "history_transpiled.csv")) == 5
+    with pytest.raises(ValueError, match="input-source"):
+        cli.transpile_query_history("snowflake", str(tmp_path / "missing.csv"))
+    with pytest.raises(ValueError, match="batch-size"):
+        cli.transpile_query_history("snowflake", str(input_file), batch_size="0")
+    with pytest.raises(ValueError, match="statement-templates"):
+        cli.transpile_query_history("snowflake", str(input_file), statement_templates="-1")
@@ -2,6 +2,10 @@
     Test Cases to validate source Snowflake dialect
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
+from databricks.labs.remorph.transpiler.sqlglot.parsers.snowflake import Snowflake
+
 
 def test_parse_parameter(dialect_context):
     """
@@ -69,3 +73,22 @@ def test_decimal_keyword(dialect_context):
         },
         pretty=True,
     )
+
+
+def test_tokenizer_is_thread_safe():
+    sqls = [
+        "CREATE OR REPLACE PROCEDURE p() RETURNS STRING LANGUAGE JAVASCRIPT AS $$ var x = y; return x; $$",
+        "SELECT a, dec FROM t AS dec WHERE b = 'c' // comment",
+        "SELECT &var, $1 FROM t",
+    ]
+    keywords = dict(Snowflake.Tokenizer.KEYWORDS)
+    expected = [[(token.token_type, token.text) for token in Snowflake().tokenize(sql)] for sql in sqls]
+
+    def tokenize(index: int):
+        return [(token.token_type, token.text) for token in Snowflake().tokenize(sqls[index % len(sqls)])]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(tokenize, range(300)))
+
+    assert results == [expected[index % len(sqls)] for index in range(300)]
+    assert Snowflake.Tokenizer.KEYWORDS == keywords
@@ -0,0 +1,84 @@
+import shutil
+
+import pyarrow as pa  # type: ignore[import-untyped]
+import pytest
+from pyspark.sql import SparkSession
+
+from databricks.labs.remorph.helpers.watchdog import Budget
+from databricks.labs.remorph.transpiler import spark_transpile
+from databricks.labs.remorph.transpiler.spark_transpile import (
+    RESULT_SCHEMA,
+    transpile_batches,
+    transpile_dataframe,
+    transpile_rows,
+)
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+
+ROWS = [
+    (1, "snowflake", "SELECT IFF(a > 0, 1, 0) FROM t"),
+    (2, "snowflake", "SELECT FROM WHERE"),
+    (3, "cobol", "SELECT 1"),
+    (4, "tsql", None),
+]
+
+
+@pytest.fixture(scope="module")
+def local_spark():
+    if shutil.which("java") is None:
+        pytest.skip("a local SparkSession needs Java")
+    spark = SparkSession.builder.master("local[2]").appName("remorph-spark-transpile-test").getOrCreate()
+    yield spark
+    spark.stop()
+
+
+def test_transpile_rows_reports_the_errors_of_each_row():
+    results = {row[0]: row[1:] for row in transpile_rows(SqlglotEngine(), "databricks", ROWS)}
+    assert results[1][:3] == ("SELECT\n  IF(a > 0, 1, 0)\nFROM t", None, None)
+    assert results[2][1] == "ParserError"
+    assert results[3][:3] == (None, "ParserError", "Unsupported source dialect: cobol")
+    assert results[4][:3] == (None, None, None)
+    assert all(duration >= 0 for *_, duration in results.values())
+
+
+def test_transpile_rows_reports_exceptions_as_errors(monkeypatch):
+    def transpile(*_):
+        raise RecursionError("too deep")
+
+    engine = SqlglotEngine()
+    monkeypatch.setattr(engine, "transpile", transpile)
+    assert next(transpile_rows(engine, "databricks", ROWS[:1]))[1:4] == (None, "RecursionError", "too deep")
+
+
+def test_transpile_batches_keeps_the_ids_and_their_type(monkeypatch):
+    monkeypatch.setattr(spark_transpile, "_executor_engine", None)
+    ids, dialects, sqls = zip(*ROWS)
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array(ids, pa.int32()), pa.array(dialects), pa.array(sqls, pa.string())],
+        names=["query_id", "dialect", "query_text"],
+    )
+    empty = batch.slice(0, 0)
+    outputs = list(transpile_batches("databricks", "query_id", "dialect", "query_text", None, [batch, empty]))
+    assert len(outputs) == 1
+    assert outputs[0].schema.names == ["query_id", *RESULT_SCHEMA.names]
+    assert outputs[0].column("query_id").type == pa.int32()
+    assert outputs[0].column("query_id").to_pylist() == [1, 2, 3, 4]
+    assert outputs[0].column("error_type").to_pylist() == [None, "ParserError", "ParserError", None]
+
+
+def test_transpile_batches_share_one_engine_per_process(monkeypatch):
+    # pylint: disable=protected-access
+    monkeypatch.setattr(spark_transpile, "_executor_engine", None)
+    batch = pa.RecordBatch.from_pydict({"id": [1], "dialect": ["snowflake"], "sql": ["SELECT 1"]})
+    list(transpile_batches("databricks", "id", "dialect", "sql", None, [batch]))
+    engine = spark_transpile._executor_engine
+    list(transpile_batches("databricks", "id", "dialect", "sql", Budget(statement_seconds=60), [batch]))
+    assert engine is not None and spark_transpile._executor_engine is engine
+
+
+def test_transpile_dataframe(local_spark):
+    df = local_spark.createDataFrame(ROWS, "id long, dialect string, sql string").repartition(2)
+    transpiled = transpile_dataframe(df)
+    assert transpiled.columns == ["id", *RESULT_SCHEMA.names]
+    results = {row.id: row for row in transpiled.collect()}
+    assert results[1].transpiled_sql == "SELECT\n  IF(a > 0, 1, 0)\nFROM t"
+    assert (results[2].error_type, results[3].error_type, results[4].error_type) == ("ParserError", "ParserError", None)
@@ -1,10 +1,15 @@
+import pickle
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from sqlglot import expressions
 
+from databricks.labs.remorph.helpers.watchdog import Budget
 from databricks.labs.remorph.transpiler.sqlglot import local_expression
+from databricks.labs.remorph.transpiler.sqlglot.parsers.snowflake import Snowflake
 from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.transpile_status import ResourceLimitError
 from tests.unit.conftest import get_dialect
 
 
@@ -13,6 +18,11 @@ def transpiler():
     return SqlglotEngine()
 
 
+@pytest.fixture
+def templating():
+    return SqlglotEngine(max_templates=10)
+
+
 def test_transpile_snowflake(transpiler, transpile_config):
     transpiler_result = transpiler.transpile(
         "snowflake", transpile_config.target_dialect, "SELECT CURRENT_TIMESTAMP(0)", Path("file.sql")
@@ -142,3 +152,132 @@ def test_safe_parse_with_semicolon(transpiler, transpile_config):
             assert repr(exp.parsed_expression.args["from"]) == repr(expected_from_result)
             assert repr(exp.parsed_expression.args["where"]) == repr(expected_where_result)
     assert len(error) == 0
+
+
+def test_transpile_tokenizes_and_parses_once(transpiler, transpile_config):
+    tokenize = Snowflake.Tokenizer.tokenize
+    with patch.object(Snowflake.Tokenizer, "tokenize", autospec=True, side_effect=tokenize) as mock_tokenize:
+        transpiler_result = transpiler.transpile(
+            "snowflake",
+            transpile_config.target_dialect,
+            "SELECT a AS b FROM t WHERE a > 1; SELEC x FRM y; SELECT 2",
+            Path("file.sql"),
+        )
+    assert mock_tokenize.call_count == 1
+    assert transpiler_result.transpiled_code == "SELECT\n  a AS b\nFROM t\nWHERE\n  a > 1\nSELECT\n  2"
+    assert len(transpiler_result.error_list) == 1
+    assert "PARSING ERROR" in transpiler_result.error_list[0].error_msg
+
+
+def test_transpile_partial_keeps_command_text(transpiler, transpile_config):
+    transpiler_result = transpiler.transpile(
+        "snowflake",
+        "experimental",
+        "SELEC x FRM y; CREATE STREAM s AS SELECT * FROM t;",
+        Path("file.sql"),
+    )
+    assert transpiler_result.transpiled_code == "CREATE STREAM s AS SELECT * FROM t"
+    assert len(transpiler_result.error_list) == 1
+
+
+def test_transpile_lca_error_on_parsed_statements(transpiler, transpile_config):
+    transpiler_result = transpiler.transpile(
+        "snowflake", transpile_config.target_dialect, "SELECT a AS b FROM t WHERE b > 1", Path("file.sql")
+    )
+    assert len(transpiler_result.error_list) == 1
+    assert "Lateral column aliases `b` found in where clause." in transpiler_result.error_list[0].error_msg
+
+
+def test_transpile_empty_statements(transpiler, transpile_config):
+    transpiler_result = transpiler.transpile("snowflake", transpile_config.target_dialect, "", Path("file.sql"))
+    assert transpiler_result.transpiled_code == ""
+    assert transpiler_result.success_count == 1
+    assert transpiler_result.error_list == []
+
+
+def test_make_chunks_slices_original_sql(transpiler, transpile_config):
+    source_code = "SELECT 'a;b'  AS x -- first\nFROM t;\n\n/* second */ SELECT\n  \"y\" FROM u"
+    tokens = get_dialect(transpile_config.source_dialect).tokenize(source_code)
+    # pylint: disable=protected-access
+    chunks = transpiler._make_chunks(tokens, source_code)
+    assert [sql for sql, _ in chunks] == ["SELECT 'a;b'  AS x -- first\nFROM t;", 'SELECT\n  "y" FROM u']
+    assert [len(chunk_tokens) for _, chunk_tokens in chunks] == [7, 4]
+
+
+def test_transpile_collapses_statements_differing_in_literals(templating, transpiler, transpile_config):
+    statements = [f"SELECT nvl(a, {n}0) FROM t WHERE d = 'day {n}' AND b IN (1{n}, 2{n});" for n in range(1, 6)]
+    results = [
+        templating.transpile("snowflake", transpile_config.target_dialect, sql, Path("q.sql")) for sql in statements
+    ]
+    expected = [
+        transpiler.transpile("snowflake", transpile_config.target_dialect, sql, Path("q.sql")) for sql in statements
+    ]
+    assert [result.transpiled_code for result in results] == [result.transpiled_code for result in expected]
+    # the first statement is transpiled, the second one derives the template
+    assert [result.statements_collapsed for result in results] == [0, 1, 1, 1, 1]
+    assert all(result.statements_collapsed == 0 for result in expected)
+
+
+def test_transpile_does_not_collapse_literals_read_by_functions(templating, transpile_config):
+    statements = ["SELECT TO_DATE(x, 'MM') FROM t", "SELECT TO_DATE(x, 'MM') FROM t", "SELECT TO_DATE(x, 'MI') FROM t"]
+    results = [
+        templating.transpile("snowflake", transpile_config.target_dialect, sql, Path("q.sql")) for sql in statements
+    ]
+    assert results[2].transpiled_code == "SELECT\n  TO_DATE(x, 'mm')\nFROM t"
+    assert sum(result.statements_collapsed for result in results) == 0
+
+
+def test_transpile_collapses_statements_within_a_file(templating, transpile_config):
+    source_code = "\n".join(f"INSERT INTO audit VALUES ({n}00, 'event {n}');" for n in range(1, 10))
+    result = templating.transpile("snowflake", transpile_config.target_dialect, source_code, Path("q.sql"))
+    assert result.success_count == 9
+    # the first statement is transpiled on its own beforehand, all of them are then filled in from the template
+    assert result.statements_collapsed == 9
+    assert result.transpiled_code.endswith("INSERT INTO audit\nVALUES\n  (900, 'event 9')")
+
+
+def test_transpiler_pickles_without_its_templates(templating, transpile_config):
+    for sql in ("SELECT 10", "SELECT 20"):
+        templating.transpile("snowflake", transpile_config.target_dialect, sql, Path("q.sql"))
+    copy = pickle.loads(pickle.dumps(templating))
+    assert (
+        copy.transpile("snowflake", transpile_config.target_dialect, "SELECT 30", Path("q.sql")).statements_collapsed
+        == 0
+    )
+
+
+LARGE_INSERT = "INSERT INTO t VALUES " + ", ".join(f"({n}, 'value {n}')" for n in range(10000))
+
+
+def test_transpile_interrupts_statements_over_budget(transpile_config):
+    # parsing the large insert takes about half a second, the other statements a few milliseconds
+    budgeted = SqlglotEngine(budget=Budget(statement_seconds=0.15))
+    source_code = f"SELECT nvl(a, 0) FROM t; {LARGE_INSERT}; SELECT 2"
+    result = budgeted.transpile("snowflake", transpile_config.target_dialect, source_code, Path("big.sql"))
+    assert result.transpiled_code == "SELECT\n  COALESCE(a, 0)\nFROM t\nSELECT\n  2"
+    [error] = result.error_list
+    assert isinstance(error, ResourceLimitError)
+    # the statement is sized with its semicolon
+    assert (error.phase, error.resource) == ("parse", "time")
+    assert (error.sql_chars, error.sql_tokens) == (len(LARGE_INSERT) + 1, 60004)
+    assert error.elapsed_seconds >= 0.15
+    assert "Exceeded the time budget of 0.15s" in error.error_msg
+    assert len(error.error_msg) < 2000
+
+
+def test_transpile_interrupts_files_over_budget(transpile_config):
+    budgeted = SqlglotEngine(budget=Budget(file_seconds=0.15))
+    result = budgeted.transpile("snowflake", transpile_config.target_dialect, LARGE_INSERT, Path("big.sql"))
+    assert result.transpiled_code == ""
+    [error] = result.error_list
+    assert isinstance(error, ResourceLimitError)
+    assert error.phase == "file"
+    # the engine goes on with the next file
+    result = budgeted.transpile("snowflake", transpile_config.target_dialect, "SELECT 1", Path("small.sql"))
+    assert (result.transpiled_code, result.error_list) == ("SELECT\n  1", [])
+
+
+def test_transpiler_pickles_with_its_budgets(transpile_config):
+    budgeted = pickle.loads(pickle.dumps(SqlglotEngine(budget=Budget(statement_seconds=0.05))))
+    result = budgeted.transpile("snowflake", transpile_config.target_dialect, LARGE_INSERT, Path("big.sql"))
+    assert isinstance(result.error_list[0], ResourceLimitError)
@@ -0,0 +1,62 @@
+import io
+
+import pytest
+
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.statement_splitter import split_statements
+
+SQL = """select 'a;b', "c;d", `e;f` -- x;y
+from t /* ; */;
+create procedure p() returns string language javascript as $$ var a = 1; return a; $$;
+BEGIN
+  LET x := CASE WHEN a THEN 1 ELSE 2 END;
+  IF (x > 1) THEN RETURN 1; END IF;
+  CASE WHEN x = 1 THEN RETURN 2; END CASE;
+END;
+begin transaction;
+select 'it''s; here', 'back\\'slash;';
+commit
+"""
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 65, 1 << 20])
+def test_split_statements(chunk_size):
+    statements = list(split_statements(io.StringIO(SQL), chunk_size=chunk_size))
+    assert "".join(statements) == SQL
+    assert [statement.strip().split()[0].lower() for statement in statements] == [
+        "select",
+        "create",
+        "begin",
+        "begin",
+        "select",
+        "commit",
+    ]
+
+
+def test_split_statements_without_backslash_escapes():
+    sql = "select 'C:\\temp\\'; select 'a''b;';"
+    assert list(split_statements(io.StringIO(sql), DIALECTS.get("oracle"))) == [
+        "select 'C:\\temp\\';",
+        " select 'a''b;';",
+    ]
+    # with backslash escapes, the first string literal only ends in the second statement
+    assert "select 'a'" in next(split_statements(io.StringIO(sql), DIALECTS.get("snowflake")))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_split_statements_skips_the_comments_of_the_dialect(chunk_size):
+    sql = "select 1; // it's a comment; with a quote\nselect 2;"
+    statements = list(split_statements(io.StringIO(sql), DIALECTS.get("snowflake"), chunk_size=chunk_size))
+    assert statements == ["select 1;", " // it's a comment; with a quote\nselect 2;"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_split_statements_skips_the_quoted_identifiers_of_the_dialect(chunk_size):
+    sql = "select [it's;a]]col] from t; select 'b';"
+    statements = list(split_statements(io.StringIO(sql), DIALECTS.get("tsql"), chunk_size=chunk_size))
+    assert statements == ["select [it's;a]]col] from t;", " select 'b';"]
+
+
+def test_split_statements_drops_trailing_whitespace():
+    assert list(split_statements(io.StringIO("select 1;\n\n"))) == ["select 1;"]
+    assert not list(split_statements(io.StringIO("")))
@@ -0,0 +1,77 @@
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+from databricks.labs.remorph.config import TranspileResult
+from databricks.labs.remorph.transpiler.lsp.lsp_engine import LSPEngine
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.transpile_cache import TranspileCache
+from databricks.labs.remorph.transpiler.transpile_status import ParserError, ValidationError
+from tests.unit.conftest import path_to_resource
+
+
+def test_key_depends_on_content_dialects_path_transpiler_and_versions(tmp_path):
+    cache = TranspileCache(tmp_path, "sqlglot")
+    key = cache.key("snowflake", "databricks", "SELECT 1", Path("a.sql"))
+    assert key == cache.key("snowflake", "databricks", "SELECT 1", Path("a.sql"))
+    assert key != cache.key("snowflake", "databricks", "SELECT 2", Path("a.sql"))
+    assert key != cache.key("tsql", "databricks", "SELECT 1", Path("a.sql"))
+    assert key != cache.key("snowflake", "experimental", "SELECT 1", Path("a.sql"))
+    assert key != cache.key("snowflake", "databricks", "SELECT 1", Path("b.sql"))
+    assert key != TranspileCache(tmp_path, "lsp").key("snowflake", "databricks", "SELECT 1", Path("a.sql"))
+    with patch("databricks.labs.remorph.transpiler.transpile_cache.__version__", "0.0.0"):
+        assert key != cache.key("snowflake", "databricks", "SELECT 1", Path("a.sql"))
+
+
+def test_transpiler_id_depends_on_the_engine_and_its_config(tmp_path):
+    config_path = tmp_path / "lsp_config.yml"
+    shutil.copy(path_to_resource("lsp_transpiler", "lsp_config.yml"), config_path)
+    lsp_engine = LSPEngine.from_config_path(config_path)
+    lsp_id = TranspileCache.transpiler_id(lsp_engine, str(config_path))
+    assert lsp_id != TranspileCache.transpiler_id(SqlglotEngine(), "sqlglot")
+    assert lsp_id == TranspileCache.transpiler_id(lsp_engine, str(config_path))
+    with config_path.open("a", encoding="utf-8") as config:
+        config.write("# edited\n")
+    assert lsp_id != TranspileCache.transpiler_id(lsp_engine, str(config_path))
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = TranspileCache(tmp_path, "sqlglot")
+    result = TranspileResult(
+        "SELECT\n  1",
+        2,
+        [ParserError(Path("a.sql"), "bad statement"), ValidationError(Path("a.sql"), "lca found")],
+        statements_collapsed=1,
+    )
+    assert cache.get("abc") is None
+    cache.put("abc", result)
+    assert cache.get("abc") == result
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = TranspileCache(tmp_path, "sqlglot")
+    (tmp_path / "entries").mkdir()
+    (tmp_path / "entries" / "abc.json").write_text("{not json")
+    assert cache.get("abc") is None
+
+
+def test_evict_stale(tmp_path):
+    cache = TranspileCache(tmp_path / "cache", "sqlglot")
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    other_file = tmp_path / "other.sql"
+    result = TranspileResult("SELECT\n  1", 1, [])
+    cache.put("other", result)
+    cache.evict_stale(other_file, {other_file: "other"})
+    cache.put("old", result)
+    cache.put("removed", result)
+    cache.evict_stale(input_dir, {input_dir / "a.sql": "old", input_dir / "b.sql": "removed"})
+    cache.put("new", result)
+
+    evicted = cache.evict_stale(input_dir, {input_dir / "a.sql": "new"})
+
+    assert evicted == 2
+    assert cache.get("new") == result
+    assert cache.get("other") == result
+    assert cache.get("old") is None
+    assert cache.get("removed") is None
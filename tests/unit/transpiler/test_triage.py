@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+import pytest
+
+from databricks.labs.remorph import cli
+from databricks.labs.remorph.transpiler.sqlglot.dialect_utils import DIALECTS
+from databricks.labs.remorph.transpiler.sqlglot.sqlglot_engine import SqlglotEngine
+from databricks.labs.remorph.transpiler.statement_splitter import split_statements
+from databricks.labs.remorph.transpiler.triage import FileTriage, TriageScanner, triage
+
+FUNCTIONAL = Path(__file__).parent.parent.parent / "resources" / "functional"
+
+
+@pytest.fixture(scope="module")
+def snowflake():
+    return TriageScanner("snowflake")
+
+
+def test_counts_statements_outside_quotes_and_comments(snowflake):
+    sql = """
+    -- a comment; with a semicolon
+    SELECT 'a;b', "c;d" FROM t /* ; */;
+    SELECT $$ ; $$, 'it''s; \\' ;' FROM u;
+    ;
+    """
+    result = snowflake.scan(sql, "q.sql")
+    assert (result.statements, result.lines, result.scan_error, result.risk) == (2, 6, "", "low")
+
+
+@pytest.mark.parametrize("dialect", ["snowflake", "tsql", "postgresql", "bigquery", "mysql"])
+def test_counts_the_statements_the_splitter_splits(dialect):
+    sql = "SELECT $$ ; $$ FROM t;\nSELECT 'a;b', \"c;d\", `e;f` FROM u; -- g;\n/* h; */ SELECT 'it''s; \\' ;' FROM v"
+    statements = list(split_statements(io.StringIO(sql), DIALECTS.get(dialect)))
+    assert TriageScanner(dialect).scan(sql, "q.sql").statements == len(statements)
+
+
+def test_counts_procedural_constructs_and_dynamic_sql():
+    sql = """CREATE PROCEDURE p AS
+    BEGIN
+      DECLARE @sql NVARCHAR(100) = 'SELECT 1';
+      IF @x > 1 BEGIN SET @y = IIF(@x > 2, 1, 0) END;
+      EXEC sp_executesql @sql;
+      EXEC (@sql);
+      BEGIN TRANSACTION;
+      IF OBJECT_ID('t') IS NOT NULL DROP TABLE IF EXISTS t;
+    END"""
+    result = TriageScanner("tsql").scan(sql, "p.sql")
+    assert (result.procedural, result.dynamic_sql, result.risk) == (6, 2, "high")
+
+
+def test_counts_functions_specific_to_the_source_dialect():
+    sql = "SELECT ISNULL(a, 0), GETDATE(), CHARINDEX('x', b), COALESCE(a, 0), my_udf(a), [GETDATE] FROM t"
+    result = TriageScanner("tsql").scan(sql, "q.sql")
+    assert (result.dialect_functions, result.risk) == (3, "medium")
+
+
+@pytest.mark.parametrize(
+    "sql, suspects",
+    [
+        ("SELECT a + 1 AS b, b * 2 AS c FROM t", 1),
+        ("SELECT a + 1 AS b FROM t WHERE b > 0", 1),
+        ("SELECT a AS b, ROW_NUMBER() OVER (ORDER BY b) AS n FROM t", 1),
+        ("SELECT a + 1 AS b FROM t ORDER BY b", 0),
+        ("SELECT a + 1 AS b FROM t GROUP BY b", 0),
+        ("SELECT t.a AS a FROM t WHERE a > 0", 0),
+        ("SELECT CAST(a AS INT) AS i FROM t AS x WHERE x.a > 0", 0),
+        ("WITH x AS (SELECT a AS b FROM t) SELECT b FROM x", 0),
+        ("SELECT a AS b FROM t UNION ALL SELECT b AS b FROM u", 0),
+    ],
+)
+def test_counts_lateral_column_alias_suspects(snowflake, sql, suspects):
+    assert snowflake.scan(sql, "q.sql").lca_suspects == suspects
+
+
+def test_reports_unterminated_quotes(snowflake):
+    result = snowflake.scan("SELECT 'open FROM t", "q.sql")
+    assert (result.scan_error, result.risk) == ("unterminated quote or comment", "high")
+    # a long unterminated quote full of escapes fails without backtracking over it
+    start = time.perf_counter()
+    result = snowflake.scan("SELECT 'open" + " it''s \\' a" * 20_000, "q.sql")
+    assert result.scan_error == "unterminated quote or comment"
+    assert time.perf_counter() - start < 1
+
+
+def test_rejects_unsupported_dialects():
+    with pytest.raises(ValueError, match="Unsupported source dialect"):
+        TriageScanner("cobol")
+
+
+def test_writes_a_row_per_sql_file(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.sql").write_text("SELECT IFF(a, 1, 0) FROM t;", encoding="utf-8")
+    (tmp_path / "sub" / "b.sql").write_text("SELECT 1;\nSELECT 2;", encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("SELECT 3", encoding="utf-8")
+    output_file = tmp_path / "out" / "triage.csv"
+    status = triage("snowflake", tmp_path, output_file)
+    assert status == {
+        "total_files_processed": 2,
+        "low_risk_files": 1,
+        "medium_risk_files": 1,
+        "high_risk_files": 0,
+        "output_file": str(output_file),
+    }
+    with output_file.open(encoding="utf-8", newline="") as f:
+        rows = {Path(row["file_path"]).name: row for row in csv.DictReader(f)}
+    assert list(rows["a.sql"]) == FileTriage.columns()
+    assert rows["a.sql"]["dialect_functions"] == "1"
+    assert rows["b.sql"]["statements"] == "2"
+
+
+def test_cli_triage(tmp_path, capsys):
+    input_file = tmp_path / "q.sql"
+    input_file.write_text("SELECT 1", encoding="utf-8")
+    cli.triage("snowflake", str(input_file), str(tmp_path / "triage.csv"))
+    assert json.loads(capsys.readouterr().out)["low_risk_files"] == 1
+    with pytest.raises(ValueError, match="input-source"):
+        cli.triage("snowflake", str(tmp_path / "missing.sql"), str(tmp_path / "triage.csv"))
+
+
+def _best_seconds(run: Callable[[str, Path], object], files: list[tuple[Path, str]]) -> float:
+    # the best of a few rounds, so that the load of the machine does not decide the comparison
+    rounds = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for file, sql in files:
+            run(sql, file)
+        rounds.append(time.perf_counter() - start)
+    return min(rounds)
+
+
+def test_is_ten_times_faster_than_a_full_transpile(snowflake):
+    files = [(file, file.read_text(encoding="utf-8")) for file in sorted((FUNCTIONAL / "snowflake").rglob("*.sql"))]
+    engine = SqlglotEngine(0)
+    transpile_seconds = _best_seconds(partial(engine.transpile, "snowflake", "databricks"), files)
+    triage_seconds = _best_seconds(snowflake.scan, files)
+    assert triage_seconds * 10 < transpile_seconds